@@ -1,25 +1,110 @@
 import os
-from flask import Flask, jsonify, request, send_from_directory
+import json
+import click
+from flask import Blueprint, Flask, Response, current_app, jsonify, request, send_from_directory, stream_with_context
 from flask_cors import CORS
+from flask_migrate import Migrate
+from werkzeug.exceptions import RequestEntityTooLarge
 from sqlalchemy import or_, and_
+from sqlalchemy.orm import joinedload
 # Use fixed models file to avoid parsing issues in original models.py
-from models_fixed import db, User, Candidate, Employer, Job, Skill, Resume, Application, PipelineStage, PipelineNote
+from models_fixed import db, User, Candidate, CandidateSkill, Employer, Job, JobAlert, JobAlertDigest, JobRequiredSkill, Skill, Resume, Application, PipelineStage, PipelineNote, CrawlTask, ScrapeTask
 import firecrawl_utils
-from firecrawl_utils import scrape_job_page, crawl_job_site, get_crawl_results
+from firecrawl_utils import scrape_job_page, scrape_job_pages, crawl_job_site, get_crawl_results
+from scrape_cache import scrape_cache
+import crawl_worker
+import async_firecrawl
+import metrics
+import skill_matching
+import readiness
+import semantic_index
+import pipeline_board
+import stage_transitions
+import job_stats
+import job_alerts
+import resume_pipeline
+from job_import import bulk_import_jobs, jobs_present
+from search_index import ensure_job_search_index, apply_job_search
+from job_dedup import ensure_job_dedup_schema
+from pagination import Page, PaginationError, paginate, page_response, parse_id_list, stream_response, wants_stream
+from response_cache import response_cache
+from db_settings import engine_options
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
-app = Flask(__name__, static_folder=BASE_DIR, static_url_path='')
-CORS(app)
+# Routes live on a blueprint so create_app() can build configured app instances
+bp = Blueprint('pathai', __name__, cli_group=None)
+migrate = Migrate()
 
-# Config: use SQLite database file in backend folder by default
-db_path = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(os.path.dirname(__file__), 'app.db')
-app.config['SQLALCHEMY_DATABASE_URI'] = db_path
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+def create_app(config=None):
+    """
+    Application factory
+
+    Args:
+        config: Optional dict of Flask config overrides (e.g. for tests)
+
+    Returns:
+        Configured Flask app with the API and frontend routes registered
+    """
+    app = Flask(__name__, static_folder=BASE_DIR, static_url_path='')
+    CORS(app)
+
+    # Config: use SQLite database file in backend folder by default
+    db_path = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(os.path.dirname(__file__), 'app.db')
+    app.config['SQLALCHEMY_DATABASE_URI'] = db_path
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Background worker threads (off for tests and one-off CLI processes)
+    app.config['BACKGROUND_WORKERS'] = os.environ.get('BACKGROUND_WORKERS', '1') != '0'
+    app.config.update(config or {})
+    # Pool and SQLite settings (WAL, busy timeout) for the configured database
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+
+    db.init_app(app)
+    migrate.init_app(app, db)
+    metrics.init_app(app)
+    app.register_blueprint(bp)
+    return app
+
+@bp.before_app_request
+def start_background_workers():
+    # Resumes unfinished crawl tasks after a restart; no-op once running
+    app = current_app._get_current_object()
+    if not app.config['BACKGROUND_WORKERS']:
+        return
+    crawl_worker.crawl_worker.ensure_started(app)
+    readiness.readiness_worker.ensure_started(app)
+    semantic_index.semantic_indexer.ensure_started(app)
+    job_stats.job_stats.ensure_started(app)
+    resume_pipeline.resume_parser_worker.ensure_started(app)
+
+@bp.cli.command('readiness-rebuild')
+def readiness_rebuild():
+    """Queue every candidate/job pair for readiness recomputation"""
+    print(f'{readiness.mark_all_dirty()} pairs queued')
+
+@bp.cli.command('job-stats-rebuild')
+def job_stats_rebuild():
+    """Recount job view and application counters from job_views and applications"""
+    print(f'{job_stats.rebuild_stats()} jobs counted')
+
+@bp.cli.command('resumes-reparse')
+@click.option('--failed-only', is_flag=True, help='Only resumes whose last parse failed')
+def resumes_reparse(failed_only):
+    """Queue stored resume files for background re-parsing"""
+    queued = resume_pipeline.request_reparse(failed_only=failed_only)
+    db.session.commit()
+    print(f'{queued} resumes queued')
+
+@bp.app_errorhandler(PaginationError)
+def pagination_error(e):
+    return jsonify({'success': False, 'error': str(e)}), 400
 
-db.init_app(app)
+@bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request latency, per-request SQL and Firecrawl metrics in Prometheus text format"""
+    return metrics.metrics_response()
 
-@app.route('/api/debug/demo-mode', methods=['GET'])
+@bp.route('/api/debug/demo-mode', methods=['GET'])
 def debug_demo_mode():
     """Debug endpoint to check demo mode status"""
     # Force reload environment variables
@@ -41,54 +126,64 @@ def debug_demo_mode():
         'env_file_exists': os.path.exists(_env_path)
     })
 
-@app.route('/api/users', methods=['GET','POST'])
+@bp.route('/api/users', methods=['GET','POST'])
 def users():
     if request.method == 'GET':
-        users = User.query.all()
-        return jsonify([u.to_dict() for u in users])
+        return page_response(paginate(User.query, User))
     data = request.json or {}
     u = User(email=data.get('email'), role=data.get('role','candidate'))
     db.session.add(u)
     db.session.commit()
     return jsonify(u.to_dict()), 201
 
-@app.route('/api/candidates', methods=['GET','POST'])
+@bp.route('/api/candidates', methods=['GET','POST'])
 def candidates():
     if request.method == 'GET':
-        cs = Candidate.query.all()
-        return jsonify([c.to_dict() for c in cs])
+        if wants_stream():
+            return stream_response(Candidate.query, Candidate)
+        return page_response(paginate(Candidate.query, Candidate))
     data = request.json or {}
     c = Candidate(user_id=data.get('user_id'), headline=data.get('headline'), summary=data.get('summary'))
     db.session.add(c)
     db.session.commit()
     return jsonify(c.to_dict()), 201
 
-@app.route('/api/jobs', methods=['GET','POST'])
+@bp.route('/api/jobs', methods=['GET','POST'])
+# Stats come from the write-behind counters, which change on every flush
+@response_cache.cached('jobs', unless=lambda: request.args.get('expand') == 'stats')
 def jobs():
     if request.method == 'GET':
-        # Support filtering
-        query = Job.query.filter_by(is_active=True)
+        # Batch lookup by id (e.g. ?ids=1,2,3), including inactive postings
+        ids = request.args.get('ids')
+        if ids:
+            query = Job.query.filter(Job.job_id.in_(parse_id_list(ids)))
+        else:
+            # Support filtering
+            query = Job.query.filter_by(is_active=True)
         
         # Filter by location
         location = request.args.get('location')
         if location:
             query = query.filter(Job.location.contains(location))
         
-        # Filter by keywords in title or description
+        # Full-text search over title and description, ranked by relevance
         keywords = request.args.get('keywords')
         if keywords:
-            query = query.filter(or_(
-                Job.title.contains(keywords),
-                Job.description.contains(keywords)
-            ))
+            query = apply_job_search(query, db, Job, keywords)
         
         # Filter by salary range
         salary_min = request.args.get('salary_min')
         if salary_min:
             query = query.filter(Job.salary_min >= float(salary_min))
         
-        js = query.all()
-        return jsonify([j.to_dict() for j in js])
+        # ?expand=stats embeds each job's view and application counters
+        embed = None
+        if request.args.get('expand') == 'stats':
+            query = query.options(joinedload(Job.stats))
+            embed = {'stats': job_stats.stats_dict}
+        if wants_stream():
+            return stream_response(query, Job, embed=embed)
+        return page_response(paginate(query, Job, ranked=bool(keywords)), embed=embed)
     
     data = request.json or {}
     j = Job(
@@ -104,29 +199,241 @@ def jobs():
     db.session.commit()
     return jsonify(j.to_dict()), 201
 
-@app.route('/api/skills', methods=['GET','POST'])
+@bp.route('/api/jobs/<int:job_id>', methods=['GET'])
+def job_detail(job_id):
+    """A job with its counters; counts as a view (by ?viewer_id= when given)"""
+    job = Job.query.get_or_404(job_id)
+    viewer_id = request.args.get('viewer_id')
+    job_stats.job_stats.record_view(job_id, int(viewer_id) if viewer_id and viewer_id.isdigit() else None)
+    return jsonify(dict(job.to_dict(), stats=job_stats.stats_dict(job)))
+
+@bp.route('/api/skills', methods=['GET','POST'])
 def skills():
     if request.method == 'GET':
-        s = Skill.query.all()
-        return jsonify([x.to_dict() for x in s])
+        return page_response(paginate(Skill.query, Skill))
     data = request.json or {}
     sk = Skill(name=data.get('name'))
     db.session.add(sk)
     db.session.commit()
     return jsonify(sk.to_dict()), 201
 
-@app.route('/api/resumes', methods=['GET','POST'])
+def _replace_skill_rows(model, owner_field, owner_id, level_field, items):
+    """Replace an owner's skill rows with [{'skill_id', level_field}] from a request body"""
+    # Row-by-row deletes (not a bulk delete) so the readiness flush hook sees them
+    for row in model.query.filter_by(**{owner_field: owner_id}):
+        db.session.delete(row)
+    rows = [
+        model(**{owner_field: owner_id, 'skill_id': int(item['skill_id']), level_field: item.get(level_field)})
+        for item in items
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    return rows
+
+@bp.route('/api/candidates/<int:candidate_id>/skills', methods=['GET','PUT'])
+def candidate_skills(candidate_id):
+    Candidate.query.get_or_404(candidate_id)
+    if request.method == 'PUT':
+        rows = _replace_skill_rows(CandidateSkill, 'candidate_id', candidate_id, 'proficiency', request.json or [])
+        return jsonify([r.to_dict() for r in rows])
+    return jsonify([r.to_dict() for r in CandidateSkill.query.filter_by(candidate_id=candidate_id)])
+
+@bp.route('/api/jobs/<int:job_id>/required-skills', methods=['GET','PUT'])
+def job_required_skills(job_id):
+    Job.query.get_or_404(job_id)
+    if request.method == 'PUT':
+        rows = _replace_skill_rows(JobRequiredSkill, 'job_id', job_id, 'required_proficiency', request.json or [])
+        return jsonify([r.to_dict() for r in rows])
+    return jsonify([r.to_dict() for r in JobRequiredSkill.query.filter_by(job_id=job_id)])
+
+@bp.route('/api/jobs/<int:job_id>/candidate-matches', methods=['GET'])
+def job_candidate_matches(job_id):
+    """
+    Top-k candidates for a job by skill readiness
+
+    Reads the scores kept up to date by the readiness worker; ?fresh=true
+    scores every candidate on demand instead (and stores the top k).
+    """
+    Job.query.get_or_404(job_id)
+    try:
+        k = skill_matching.parse_top_k(request.args.get('top_k'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if request.args.get('fresh', 'false').lower() == 'true':
+        persist = request.args.get('persist', 'true').lower() != 'false'
+        matches = skill_matching.match_candidates_for_job(job_id, k=k, persist=persist)
+    else:
+        matches = readiness.top_candidates_for_job(job_id, k)
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'matches': matches,
+        'pending_recompute': readiness.pending_count(job_id=job_id)
+    })
+
+@bp.route('/api/candidates/<int:candidate_id>/job-matches', methods=['GET'])
+def candidate_job_matches(candidate_id):
+    """Top-k active jobs for a candidate by skill readiness, with Matched/Gap/Surplus details"""
+    Candidate.query.get_or_404(candidate_id)
+    try:
+        k = skill_matching.parse_top_k(request.args.get('top_k'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if request.args.get('fresh', 'false').lower() == 'true':
+        persist = request.args.get('persist', 'true').lower() != 'false'
+        matches = skill_matching.match_jobs_for_candidate(candidate_id, k=k, persist=persist)
+    else:
+        matches = readiness.top_jobs_for_candidate(candidate_id, k)
+    return jsonify({
+        'success': True,
+        'candidate_id': candidate_id,
+        'matches': matches,
+        'pending_recompute': readiness.pending_count(candidate_id=candidate_id)
+    })
+
+@bp.route('/api/jobs/similar', methods=['GET'])
+def similar_jobs():
+    """Top-k active jobs most similar in title and description to ?job_id="""
+    if not request.args.get('job_id', '').isdigit():
+        return jsonify({'success': False, 'error': 'job_id must be an integer'}), 400
+    job_id = int(request.args['job_id'])
+    try:
+        k = semantic_index.parse_top_k(request.args.get('top_k'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    job = Job.query.get_or_404(job_id)
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'jobs': semantic_index.similar_jobs(job, k)
+    })
+
+@bp.route('/api/candidates/<int:candidate_id>/recommended-jobs', methods=['GET'])
+def candidate_recommended_jobs(candidate_id):
+    """Top-k active jobs semantically closest to a candidate's headline, summary and resumes"""
+    candidate = Candidate.query.get_or_404(candidate_id)
+    try:
+        k = semantic_index.parse_top_k(request.args.get('top_k'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({
+        'success': True,
+        'candidate_id': candidate_id,
+        'jobs': semantic_index.recommended_jobs(candidate, k)
+    })
+
+@bp.route('/api/job-alerts', methods=['GET','POST'])
+def job_alert_list():
+    """Saved job searches (?candidate_id= to filter); matched against every job import"""
+    if request.method == 'GET':
+        query = JobAlert.query
+        candidate_id = request.args.get('candidate_id')
+        if candidate_id:
+            query = query.filter_by(candidate_id=candidate_id)
+        return page_response(paginate(query, JobAlert))
+    
+    data = request.json or {}
+    if not data.get('candidate_id'):
+        return jsonify({'success': False, 'error': 'candidate_id is required'}), 400
+    error = job_alerts.validate_alert(data)
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    alert = JobAlert(
+        candidate_id=data['candidate_id'],
+        job_tags=data.get('job_tags') or [],
+        location=data.get('location'),
+        remote_type=job_alerts.normalize_remote_type(data.get('remote_type'))
+    )
+    db.session.add(alert)
+    db.session.commit()
+    return jsonify(alert.to_dict()), 201
+
+@bp.route('/api/job-alerts/<int:alert_id>', methods=['DELETE'])
+def job_alert_delete(alert_id):
+    alert = JobAlert.query.get_or_404(alert_id)
+    db.session.delete(alert)
+    db.session.commit()
+    return jsonify({'success': True})
+
+@bp.route('/api/candidates/<int:candidate_id>/alert-digests', methods=['GET'])
+def candidate_alert_digests(candidate_id):
+    """Digests of newly imported jobs matching the candidate's alerts, oldest first"""
+    Candidate.query.get_or_404(candidate_id)
+    return page_response(paginate(JobAlertDigest.query.filter_by(candidate_id=candidate_id), JobAlertDigest))
+
+@bp.route('/api/resumes', methods=['GET','POST'])
 def resumes():
     if request.method == 'GET':
-        r = Resume.query.all()
-        return jsonify([x.to_dict() for x in r])
+        return page_response(paginate(Resume.query, Resume))
+    if request.mimetype == 'multipart/form-data':
+        return resume_upload()
     data = request.json or {}
     r = Resume(candidate_id=data.get('candidate_id'), file_name=data.get('file_name'), file_type=data.get('file_type'))
     db.session.add(r)
     db.session.commit()
     return jsonify(r.to_dict()), 201
 
-@app.route('/api/applications', methods=['GET','POST'])
+def resume_upload():
+    """Store a multipart resume upload (fields: candidate_id, file) and queue it for parsing"""
+    try:
+        form, upload = resume_pipeline.receive_upload(request.environ)
+    except resume_pipeline.UploadError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except RequestEntityTooLarge:
+        return jsonify({'success': False, 'error': f'Upload exceeds {resume_pipeline.RESUME_MAX_BYTES} bytes'}), 413
+    try:
+        candidate_id = int(form.get('candidate_id', ''))
+    except ValueError:
+        upload.discard()
+        return jsonify({'success': False, 'error': 'candidate_id is required'}), 400
+    if db.session.get(Candidate, candidate_id) is None:
+        upload.discard()
+        return jsonify({'success': False, 'error': 'Candidate not found'}), 404
+    try:
+        r = resume_pipeline.store_resume(candidate_id, upload)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        upload.discard()
+        raise
+    resume_pipeline.resume_parser_worker.wake()
+    return jsonify(r.to_dict()), 201
+
+@bp.route('/api/resumes/<int:resume_id>', methods=['GET'])
+def resume_detail(resume_id):
+    """A resume with its parse_status and, once parsed, the extracted fields"""
+    return jsonify(Resume.query.get_or_404(resume_id).to_dict())
+
+@bp.route('/api/resumes/reparse', methods=['POST'])
+def resumes_reparse_request():
+    """
+    Queue stored resumes for background re-parsing; returns immediately.
+
+    Request JSON (all optional; an empty body queues every stored resume):
+    {
+        "resume_ids": [1, 2, 3],
+        "candidate_id": 7,
+        "failed_only": true     // Only resumes whose last parse failed
+    }
+    """
+    data = request.json or {}
+    resume_ids = data.get('resume_ids')
+    if resume_ids is not None and (not isinstance(resume_ids, list) or not all(isinstance(i, int) for i in resume_ids)):
+        return jsonify({'success': False, 'error': 'resume_ids must be a list of integers'}), 400
+    queued = resume_pipeline.request_reparse(resume_ids=resume_ids, candidate_id=data.get('candidate_id'),
+                                             failed_only=bool(data.get('failed_only')))
+    db.session.commit()
+    if queued:
+        resume_pipeline.resume_parser_worker.wake()
+    return jsonify({'success': True, 'queued': queued})
+
+@bp.route('/api/resumes/parse-status', methods=['GET'])
+def resumes_parse_status():
+    """Number of stored resumes per parse_status"""
+    return jsonify({'success': True, 'counts': resume_pipeline.status_counts()})
+
+@bp.route('/api/applications', methods=['GET','POST'])
+@response_cache.cached('applications', 'jobs')
 def applications():
     if request.method == 'GET':
         # Support filtering by candidate_id or job_id
@@ -137,8 +444,17 @@ def applications():
             query = query.filter_by(candidate_id=candidate_id)
         if job_id:
             query = query.filter_by(job_id=job_id)
-        apps = query.all()
-        return jsonify([a.to_dict() for a in apps])
+        
+        # ?expand=job embeds each application's job, loaded in the same query
+        if request.args.get('expand') == 'job':
+            query = query.options(joinedload(Application.job))
+            embed = {'job': lambda a: a.job.to_dict() if a.job else None}
+            if wants_stream():
+                return stream_response(query, Application, embed=embed)
+            return page_response(paginate(query, Application), embed=embed)
+        if wants_stream():
+            return stream_response(query, Application)
+        return page_response(paginate(query, Application))
     
     data = request.json or {}
     app = Application(
@@ -148,47 +464,86 @@ def applications():
     )
     db.session.add(app)
     db.session.commit()
+    job_stats.job_stats.record_application(app.job_id)
     return jsonify(app.to_dict()), 201
 
-@app.route('/api/applications/<int:app_id>', methods=['GET','PUT','PATCH'])
+@bp.route('/api/applications/<int:app_id>', methods=['GET','PUT','PATCH'])
 def application_detail(app_id):
     app = Application.query.get_or_404(app_id)
     if request.method == 'GET':
         return jsonify(app.to_dict())
     
     data = request.json or {}
-    if 'current_status' in data:
+    if 'current_status' in data and data['current_status'] != app.current_status:
         app.current_status = data['current_status']
+        # Keep the board's stage history in step when the status names a stage
+        stage = stage_transitions.find_stage(name=app.current_status)
+        if stage is not None:
+            stage_transitions.record_stage([app.application_id], stage)
     db.session.commit()
     return jsonify(app.to_dict())
 
-@app.route('/api/pipeline/stages', methods=['GET','POST'])
+@bp.route('/api/applications/transition', methods=['POST'])
+def transition_applications():
+    """
+    Move many applications to a pipeline stage in one transaction.
+
+    Request JSON:
+    {
+        "application_ids": [1, 2, 3],   // and/or
+        "filter": {"job_id": 5, "current_status": "Screening"},
+        "stage_id": 4,                  // or "stage": "Rejected"
+        "from_status": "Screening"      // Optional: only move applications in this status
+    }
+    """
+    data = request.json or {}
+    ids = data.get('application_ids')
+    if ids is not None and (not isinstance(ids, list) or not all(isinstance(i, int) for i in ids)):
+        return jsonify({'success': False, 'error': 'application_ids must be a list of integers'}), 400
+    filters = data.get('filter')
+    if filters is not None and not isinstance(filters, dict):
+        return jsonify({'success': False, 'error': 'filter must be an object'}), 400
+    if data.get('stage_id') is None and not data.get('stage'):
+        return jsonify({'success': False, 'error': 'stage_id or stage is required'}), 400
+    try:
+        stage = stage_transitions.find_stage(data.get('stage_id'), data.get('stage'))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'stage_id must be an integer'}), 400
+    if stage is None:
+        return jsonify({'success': False, 'error': 'Unknown pipeline stage'}), 404
+    try:
+        result = stage_transitions.transition_applications(
+            stage, application_ids=ids, filters=filters, from_status=data.get('from_status')
+        )
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    db.session.commit()
+    return jsonify({'success': True, 'stage': stage.to_dict(), **result})
+
+@bp.route('/api/pipeline/stages', methods=['GET','POST'])
+@response_cache.cached('pipeline_stages')
 def pipeline_stages():
     if request.method == 'GET':
         stages = PipelineStage.query.all()
-        return jsonify([{'stage_id': s.stage_id, 'name': s.name} for s in stages])
+        return jsonify([s.to_dict() for s in stages])
     
     data = request.json or {}
     stage = PipelineStage(name=data.get('name'))
     db.session.add(stage)
     db.session.commit()
-    return jsonify({'stage_id': stage.stage_id, 'name': stage.name}), 201
+    return jsonify(stage.to_dict()), 201
 
-@app.route('/api/pipeline/notes', methods=['GET','POST'])
+@bp.route('/api/pipeline/notes', methods=['GET','POST'])
 def pipeline_notes():
     if request.method == 'GET':
         query = PipelineNote.query
         application_id = request.args.get('application_id')
         if application_id:
             query = query.filter_by(application_id=application_id)
-        notes = query.all()
-        return jsonify([{
-            'note_id': n.note_id,
-            'application_id': n.application_id,
-            'author_id': n.author_id,
-            'note_text': n.note_text,
-            'created_at': n.created_at.isoformat() if n.created_at else None
-        } for n in notes])
+        if wants_stream():
+            return stream_response(query, PipelineNote)
+        return page_response(paginate(query, PipelineNote))
     
     data = request.json or {}
     note = PipelineNote(
@@ -198,19 +553,32 @@ def pipeline_notes():
     )
     db.session.add(note)
     db.session.commit()
+    return jsonify(note.to_dict()), 201
+
+@bp.route('/api/jobs/<int:job_id>/pipeline', methods=['GET'])
+@response_cache.cached('applications', 'application_pipeline', 'pipeline_stages', 'pipeline_notes')
+def job_pipeline_board(job_id):
+    """Kanban board for a job: every stage with its count and first ?cards= cards"""
+    Job.query.get_or_404(job_id)
+    cards = pipeline_board.parse_cards_per_stage(request.args.get('cards'))
     return jsonify({
-        'note_id': note.note_id,
-        'application_id': note.application_id,
-        'author_id': note.author_id,
-        'note_text': note.note_text,
-        'created_at': note.created_at.isoformat() if note.created_at else None
-    }), 201
+        'success': True,
+        'job_id': job_id,
+        'stages': pipeline_board.board(job_id, cards)
+    })
+
+@bp.route('/api/jobs/<int:job_id>/pipeline/stages/<int:stage_id>/cards', methods=['GET'])
+@response_cache.cached('applications', 'application_pipeline', 'pipeline_stages', 'pipeline_notes')
+def job_pipeline_stage_cards(job_id, stage_id):
+    """Next cards of one board column (?cursor= from the board's next_cursor)"""
+    cards, next_cursor = pipeline_board.stage_cards(job_id, stage_id, request.args)
+    return page_response(Page(cards, next_cursor, None), serialize=lambda card: card)
 
 # ============================================================================
 # Firecrawl Integration Endpoints
 # ============================================================================
 
-@app.route('/api/scrape-job', methods=['POST'])
+@bp.route('/api/scrape-job', methods=['POST'])
 def scrape_job():
     """
     Scrape a single job page and extract job information.
@@ -218,45 +586,153 @@ def scrape_job():
     Request JSON:
     {
         "url": "https://example.com/job-listing",
-        "auto_add": false  // Optional: automatically add jobs to database
+        "auto_add": false,  // Optional: automatically add jobs to database
+        "refresh": false,   // Optional: bypass the scrape cache
+        "skip_near_duplicates": false  // Optional: skip near-duplicate postings
     }
     """
     try:
         data = request.json or {}
         url = data.get('url')
-        auto_add = data.get('auto_add', False)
         
         if not url:
             return jsonify({'success': False, 'error': 'URL is required'}), 400
         
         # Scrape the page
-        result = scrape_job_page(url)
-        
-        # Optionally add jobs to database
-        if auto_add and result.get('success') and result.get('jobs'):
-            for job_data in result['jobs']:
-                job = Job(
-                    employer_id=data.get('employer_id', 1),
-                    title=job_data.get('title'),
-                    description=job_data.get('description'),
-                    location=job_data.get('location', 'Remote'),
-                    remote_type=job_data.get('remote_type', 'hybrid'),
-                    is_active=True
-                )
-                db.session.add(job)
+        result = scrape_job_page(url, use_cache=not data.get('refresh', False))
+        body, status = _finish_scrape_job(result, url, data)
+        return jsonify(body), status
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def _already_imported(result, employer_id):
+    """True if this page content was imported for the employer and its jobs are still there"""
+    return employer_id in result.get('imported_by', ()) and jobs_present(result.get('jobs', []), employer_id)
+
+def _finish_scrape_job(result, url, data):
+    """/api/scrape-job response for a scrape result, importing the jobs when auto_add is set"""
+    employer_id = data.get('employer_id', 1)
+    # Optionally add jobs to database (skipped if this page content was already imported)
+    if (data.get('auto_add', False) and result.get('success') and result.get('jobs')
+            and not _already_imported(result, employer_id)):
+        imported = bulk_import_jobs(result['jobs'], employer_id=employer_id,
+                                    skip_near_duplicates=data.get('skip_near_duplicates'))
+        result.update((k, v) for k, v in imported.items() if k != 'jobs')
+        db.session.commit()
+        scrape_cache.mark_imported(url, employer_id)
+    return result, 200
+
+
+@bp.route('/api/scrape-batch', methods=['POST'])
+def scrape_batch():
+    """
+    Scrape many job pages concurrently and return per-URL results.
+    
+    Request JSON:
+    {
+        "urls": ["https://example.com/job-1", "https://other.com/job-2"],
+        "auto_add": false,      // Optional: add extracted jobs to database
+        "stream": false,        // Optional: stream NDJSON progress lines
+        "max_workers": 16,      // Optional: worker pool size
+        "per_host_limit": 2,    // Optional: concurrent scrapes per host
+        "refresh": false,       // Optional: bypass the scrape cache
+        "skip_near_duplicates": false  // Optional: skip near-duplicate postings
+    }
+    
+    With "stream": true (or ?stream=1) the response is application/x-ndjson,
+    one line per finished URL: {"completed", "total", "result"}, followed by
+    a final {"done": true, ...} summary line.
+    """
+    data = request.json or {}
+    urls = data.get('urls') or []
+    auto_add = data.get('auto_add', False)
+    employer_id = data.get('employer_id', 1)
+    stream = data.get('stream', False) or request.args.get('stream') == '1'
+    
+    if not isinstance(urls, list) or not urls:
+        return jsonify({'success': False, 'error': 'urls must be a non-empty list'}), 400
+    if len(urls) > firecrawl_utils.BATCH_MAX_URLS:
+        return jsonify({
+            'success': False,
+            'error': f'At most {firecrawl_utils.BATCH_MAX_URLS} URLs per batch'
+        }), 400
+    
+    try:
+        max_workers = min(int(data.get('max_workers', firecrawl_utils.BATCH_MAX_WORKERS)),
+                          firecrawl_utils.BATCH_MAX_WORKERS)
+        per_host_limit = max(1, int(data.get('per_host_limit', firecrawl_utils.BATCH_PER_HOST_LIMIT)))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'max_workers and per_host_limit must be integers'}), 400
+    
+    use_cache = not data.get('refresh', False)
+    summary = {'jobs_added': 0, 'jobs_updated': 0}
+    
+    def results():
+        imported_urls = []
+        for result in scrape_job_pages(urls, max_workers=max_workers, per_host_limit=per_host_limit,
+                                       use_cache=use_cache):
+            if auto_add and result.get('success') and not _already_imported(result, employer_id):
+                imported_urls.append(result.get('url'))
+                imported = bulk_import_jobs(result.get('jobs', []), employer_id=employer_id,
+                                            skip_near_duplicates=data.get('skip_near_duplicates'))
+                summary['jobs_added'] += imported['jobs_added']
+                summary['jobs_updated'] += imported['jobs_updated']
+            yield result
+        if imported_urls:
             db.session.commit()
-        
-        return jsonify(result), 200
+        for imported_url in imported_urls:
+            scrape_cache.mark_imported(imported_url, employer_id)
+    
+    if stream:
+        def generate():
+            total = len(set(u for u in urls if u))
+            succeeded = 0
+            try:
+                for i, result in enumerate(results(), 1):
+                    succeeded += bool(result.get('success'))
+                    yield json.dumps({'completed': i, 'total': total, 'result': result}) + '\n'
+                yield json.dumps({
+                    'done': True,
+                    'total': total,
+                    'succeeded': succeeded,
+                    'failed': total - succeeded,
+                    'jobs_added': summary['jobs_added'],
+                    'jobs_updated': summary['jobs_updated']
+                }) + '\n'
+            except Exception as e:
+                db.session.rollback()
+                yield json.dumps({'done': True, 'success': False, 'error': str(e)}) + '\n'
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
     
+    try:
+        per_url = list(results())
     except Exception as e:
+        db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
+    
+    # Report in request order regardless of completion order
+    by_url = {r.get('url'): r for r in per_url}
+    ordered = [by_url[u] for u in dict.fromkeys(u for u in urls if u) if u in by_url]
+    succeeded = sum(1 for r in ordered if r.get('success'))
+    return jsonify({
+        'success': True,
+        'total': len(ordered),
+        'succeeded': succeeded,
+        'failed': len(ordered) - succeeded,
+        'jobs_added': summary['jobs_added'],
+        'jobs_updated': summary['jobs_updated'],
+        'results': ordered
+    }), 200
 
 
-@app.route('/api/crawl-site', methods=['POST'])
+@bp.route('/api/crawl-site', methods=['POST'])
 def crawl_site():
     """
     Crawl a job site and extract multiple job listings.
-    This starts an async crawl job.
+    This starts an async crawl job, tracked by a background crawl task that
+    imports the results once (when auto_add is set). Follow it through
+    /api/crawl-tasks/<taskId> (long-poll) or /api/crawl-tasks/<taskId>/events (SSE).
     
     Request JSON:
     {
@@ -269,25 +745,36 @@ def crawl_site():
         data = request.json or {}
         url = data.get('url')
         limit = data.get('limit', 10)
-        auto_add = data.get('auto_add', False)
         
         if not url:
             return jsonify({'success': False, 'error': 'URL is required'}), 400
         
         # Start crawl
         result = crawl_job_site(url, limit=limit)
-        
-        # Store auto_add preference for later retrieval
-        if auto_add:
-            result['auto_add'] = True
-        
-        return jsonify(result), 200
+        body, status = _finish_crawl_site(result, url, data)
+        return jsonify(body), status
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/crawl-status/<job_id>', methods=['GET'])
+def _finish_crawl_site(result, url, data):
+    """/api/crawl-site response for a started crawl, handing it to the crawl worker"""
+    auto_add = data.get('auto_add', False)
+    
+    # Store auto_add preference for later retrieval
+    if auto_add:
+        result['auto_add'] = True
+    
+    # Hand the crawl to the background worker
+    if result.get('success') and result.get('jobId'):
+        task = crawl_worker.create_task(result['jobId'], url, data.get('employer_id'), bool(auto_add))
+        crawl_worker.crawl_worker.wake()
+        result['taskId'] = task.task_id
+    
+    return result, 200
+
+@bp.route('/api/crawl-status/<job_id>', methods=['GET'])
 def crawl_status(job_id):
     """
     Check the status and results of an async crawl job.
@@ -297,6 +784,9 @@ def crawl_status(job_id):
     
     Query parameters:
         auto_add: true to automatically add jobs to database when complete
+                  (also once for a crawl started without auto_add that the
+                  background worker already completed)
+        employer_id: Employer for the added jobs
     """
     try:
         auto_add = request.args.get('auto_add', 'false').lower() == 'true'
@@ -304,29 +794,19 @@ def crawl_status(job_id):
         # Get crawl status
         result = get_crawl_results(job_id)
         
-        # If crawl is complete and auto_add is enabled, add jobs to database
-        if auto_add and result.get('success') and result.get('status') == 'completed':
-            jobs_data = result.get('data', [])
-            added_count = 0
-            
-            for item in jobs_data:
-                # Jobs are already extracted in the crawl result
-                # Add them to the database
-                for job_info in item.get('jobs', []):
-                    job = Job(
-                        employer_id=request.args.get('employer_id', 1),
-                        title=job_info.get('title'),
-                        description=job_info.get('description'),
-                        location=job_info.get('location', 'Remote'),
-                        remote_type=job_info.get('remote_type', 'hybrid'),
-                        is_active=True
-                    )
-                    db.session.add(job)
-                    added_count += 1
-            
-            if added_count > 0:
-                db.session.commit()
-                result['jobs_added'] = added_count
+        # If crawl is complete and auto_add is enabled, add jobs to database.
+        # The import goes through the crawl task so concurrent polls (and the
+        # background worker) import it exactly once.
+        if auto_add and result.get('success', True) and result.get('status') == 'completed':
+            employer_id = request.args.get('employer_id', type=int)
+            task = crawl_worker.create_task(job_id, None, employer_id, True)
+            crawl_worker.import_crawl_results(task, result, auto_add=True, employer_id=employer_id)
+            db.session.refresh(task)
+            result['taskId'] = task.task_id
+            if task.jobs_added:
+                result['jobs_added'] = task.jobs_added
+            if task.status == 'failed':
+                result['import_error'] = task.error
         
         return jsonify(result), 200
     
@@ -334,7 +814,37 @@ def crawl_status(job_id):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/scrape-and-import', methods=['POST'])
+@bp.route('/api/crawl-tasks/<int:task_id>', methods=['GET'])
+def crawl_task_status(task_id):
+    """
+    Get a background crawl task's status.
+    
+    Query parameters:
+        wait: Optional long-poll timeout in seconds (max 60)
+        since: updated_at from the previous response; with wait, the request
+               blocks until the task changes or finishes
+    """
+    wait = min(request.args.get('wait', 0, type=float), 60)
+    if wait > 0:
+        task = crawl_worker.wait_for_task(task_id, request.args.get('since'), wait)
+    else:
+        task = db.session.get(CrawlTask, task_id)
+    if task is None:
+        return jsonify({'success': False, 'error': 'Task not found'}), 404
+    return jsonify(dict(task.to_dict(), success=True))
+
+
+@bp.route('/api/crawl-tasks/<int:task_id>/events', methods=['GET'])
+def crawl_task_events(task_id):
+    """Stream a crawl task's status changes as server-sent events until it finishes"""
+    return Response(
+        stream_with_context(crawl_worker.task_events(task_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@bp.route('/api/scrape-and-import', methods=['POST'])
 def scrape_and_import():
     """
     Scrape a job page, parse jobs, and automatically import them.
@@ -343,62 +853,135 @@ def scrape_and_import():
     {
         "url": "https://example.com/job-listing",
         "employer_id": 1,
-        "job_title": "Optional override for parsed title"
+        "job_title": "Optional override for parsed title",
+        "refresh": false,  // Optional: bypass the scrape cache
+        "skip_near_duplicates": false  // Optional: skip near-duplicate postings
     }
     """
     try:
         data = request.json or {}
         url = data.get('url')
-        employer_id = data.get('employer_id', 1)
         
         if not url:
             return jsonify({'success': False, 'error': 'URL is required'}), 400
         
         # Scrape the page
-        scrape_result = scrape_job_page(url)
-        
-        if not scrape_result.get('success'):
-            return jsonify(scrape_result), 400
-        
-        # Import jobs to database
-        imported_jobs = []
-        for job_data in scrape_result.get('jobs', []):
-            job = Job(
-                employer_id=employer_id,
-                title=job_data.get('title'),
-                description=job_data.get('description'),
-                location=job_data.get('location', 'Remote'),
-                remote_type=job_data.get('remote_type', 'hybrid'),
-                is_active=True
-            )
-            db.session.add(job)
-            db.session.flush()  # Flush to get the ID
-            imported_jobs.append(job.to_dict())
-        
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'message': f'Successfully imported {len(imported_jobs)} jobs',
-            'jobs': imported_jobs,
-            'imported_at': result.get('scraped_at')
-        }), 201
+        scrape_result = scrape_job_page(url, use_cache=not data.get('refresh', False))
+        body, status = _finish_scrape_and_import(scrape_result, url, data)
+        return jsonify(body), status
     
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _finish_scrape_and_import(scrape_result, url, data):
+    """/api/scrape-and-import response for a scrape result: imports its jobs in bulk"""
+    employer_id = data.get('employer_id', 1)
+    
+    if not scrape_result.get('success'):
+        return scrape_result, 400
+    
+    # Page content unchanged since it was last imported: nothing new to add
+    if _already_imported(scrape_result, employer_id):
+        return {
+            'success': True,
+            'message': 'Page unchanged since last import; no jobs imported',
+            'jobs': [],
+            'unchanged': True,
+            'imported_at': scrape_result.get('scraped_at')
+        }, 200
+    
+    # Import jobs to database in bulk, reading back IDs via RETURNING
+    # (re-imported postings are updated in place, not duplicated)
+    imported = bulk_import_jobs(scrape_result.get('jobs', []), employer_id=employer_id,
+                                collect_jobs=True,
+                                skip_near_duplicates=data.get('skip_near_duplicates'))
+    imported_jobs = imported['jobs']
+    db.session.commit()
+    scrape_cache.mark_imported(url, employer_id)
+    
+    return {
+        'success': True,
+        'message': f'Successfully imported {len(imported_jobs)} jobs',
+        'jobs': imported_jobs,
+        'jobs_added': imported['jobs_added'],
+        'jobs_updated': imported['jobs_updated'],
+        'duplicates_skipped': imported['duplicates_skipped'],
+        'alert_digests': imported['alert_digests'],
+        'imported_at': scrape_result.get('scraped_at')
+    }, 201
+
+# Async variants: the Firecrawl call runs on the shared event loop instead of
+# holding this worker thread; poll /api/async/tasks/<task_id> for the result
+def _submit_async(kind, fetch, finish):
+    data = request.json or {}
+    url = data.get('url')
+    if not url:
+        return jsonify({'success': False, 'error': 'URL is required'}), 400
+    task = async_firecrawl.submit_task(
+        current_app._get_current_object(), kind, url,
+        lambda: fetch(url, data),
+        lambda result: finish(result, url, data)
+    )
+    return jsonify({
+        'success': True,
+        'task_id': task.task_id,
+        'status': task.status,
+        'status_url': f'/api/async/tasks/{task.task_id}'
+    }), 202
+
+@bp.route('/api/async/scrape-job', methods=['POST'])
+def scrape_job_async():
+    """Asynchronous /api/scrape-job (same request JSON)"""
+    return _submit_async(
+        'scrape-job',
+        lambda url, data: async_firecrawl.scrape_job_page_async(url, use_cache=not data.get('refresh', False)),
+        _finish_scrape_job
+    )
+
+@bp.route('/api/async/scrape-and-import', methods=['POST'])
+def scrape_and_import_async():
+    """Asynchronous /api/scrape-and-import (same request JSON)"""
+    return _submit_async(
+        'scrape-and-import',
+        lambda url, data: async_firecrawl.scrape_job_page_async(url, use_cache=not data.get('refresh', False)),
+        _finish_scrape_and_import
+    )
+
+@bp.route('/api/async/crawl-site', methods=['POST'])
+def crawl_site_async():
+    """Asynchronous /api/crawl-site (same request JSON); the result carries the crawl taskId"""
+    return _submit_async(
+        'crawl-site',
+        lambda url, data: async_firecrawl.crawl_job_site_async(url, limit=data.get('limit', 10)),
+        _finish_crawl_site
+    )
+
+@bp.route('/api/async/tasks/<task_id>', methods=['GET'])
+def async_task_status(task_id):
+    """Status of an async scrape task; 'result' and 'http_status' are what the sync endpoint returns"""
+    task = ScrapeTask.query.get_or_404(task_id)
+    if task.status == 'pending' and async_firecrawl.expire_tasks([task_id]):
+        db.session.commit()
+        db.session.refresh(task)
+    return jsonify(task.to_dict())
+
 # Serve existing frontend files from workspace root
-@app.route('/', defaults={'path': 'Landing page.html'})
-@app.route('/<path:path>')
+@bp.route('/', defaults={'path': 'Landing page.html'})
+@bp.route('/<path:path>')
 def static_proxy(path):
     # Serve a file from the workspace root
-    root = app.static_folder
+    root = current_app.static_folder
     if os.path.exists(os.path.join(root, path)):
         return send_from_directory(root, path)
     return send_from_directory(root, 'Landing page.html')
 
+app = create_app()
+
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        ensure_job_dedup_schema(db)
+        ensure_job_search_index(db)
+    # Development server only; see serve.py for production serving
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,340 @@
+"""
+Asyncio Firecrawl client and the event loop that multiplexes async scrapes.
+AsyncFirecrawlClient mirrors FirecrawlClient on a pooled httpx.AsyncClient,
+with the same jittered retry policy. Every async scrape in a process runs on
+one background event loop thread, so thousands can wait on slow sites without
+holding a WSGI thread each. The /api/async/* routes submit work here and
+return 202 with a task id. The outcome is written to scrape_tasks, so any
+worker process can answer the poll. A task still pending after
+SCRAPE_TASK_DEADLINE seconds (its process exited) is marked failed. Parsing and
+database work run on the loop's small thread pool.
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import httpx
+from sqlalchemy import delete, update
+from models_fixed import db, ScrapeTask
+from metrics import observe_firecrawl
+from firecrawl_utils import (FIRECRAWL_API_KEY, FIRECRAWL_API_URL, HTTP_BACKOFF_FACTOR, HTTP_MAX_RETRIES,
+                             RETRY_STATUS_CODES, build_crawl_result, build_scrape_result, cached_scrape,
+                             demo_crawl, demo_crawl_status, demo_scrape, is_demo_mode)
+
+# Concurrent connections to the Firecrawl API; further requests queue for one
+ASYNC_MAX_CONNECTIONS = int(os.getenv('FIRECRAWL_ASYNC_MAX_CONNECTIONS', '100'))
+# Threads for parsing and database work started from the loop
+ASYNC_THREADS = int(os.getenv('FIRECRAWL_ASYNC_THREADS', '4'))
+# Seconds finished tasks are kept for polling
+SCRAPE_TASK_TTL = int(os.getenv('SCRAPE_TASK_TTL', '3600'))
+# Seconds after which a task still pending is failed: the process running it
+# exited (a restart or worker recycling) or it hung
+SCRAPE_TASK_DEADLINE = int(os.getenv('SCRAPE_TASK_DEADLINE', '900'))
+
+
+def build_async_client(max_connections: int = ASYNC_MAX_CONNECTIONS) -> httpx.AsyncClient:
+    """Keep-alive httpx.AsyncClient for the Firecrawl API"""
+    return httpx.AsyncClient(limits=httpx.Limits(max_connections=max_connections,
+                                                 max_keepalive_connections=max_connections))
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return max(0.0, float(response.headers.get('Retry-After', '')))
+    except ValueError:
+        return None
+
+
+class AsyncFirecrawlClient:
+    """Asyncio counterpart of FirecrawlClient (use from a single event loop)"""
+
+    def __init__(self, api_key: Optional[str] = None, client: Optional[httpx.AsyncClient] = None,
+                 max_retries: int = HTTP_MAX_RETRIES, backoff_factor: float = HTTP_BACKOFF_FACTOR):
+        self.api_key = api_key or FIRECRAWL_API_KEY
+        self.demo_mode = is_demo_mode()
+        if not self.demo_mode and not self.api_key:
+            raise ValueError("FIRECRAWL_API_KEY environment variable not set")
+        self.base_url = FIRECRAWL_API_URL
+        self.headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        self.client = client or build_async_client()
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+    async def _request(self, operation: str, method: str, path: str, timeout: float,
+                       idempotent: bool = True, **kwargs) -> Dict:
+        with observe_firecrawl(operation, client='async'):
+            return await self._send(method, path, timeout, idempotent, **kwargs)
+
+    async def _send(self, method: str, path: str, timeout: float, idempotent: bool = True, **kwargs) -> Dict:
+        """
+        Send a request, retrying connection errors and 429/5xx responses
+
+        Backoff is full-jitter exponential like the sync client's JitteredRetry;
+        a Retry-After header takes precedence. Waiting for a free pooled
+        connection does not count against the timeout. Non-idempotent calls
+        (starting a crawl) are retried on connection errors only, as in
+        firecrawl_utils.build_session.
+        """
+        for attempt in range(self.max_retries + 1):
+            delay = None
+            try:
+                response = await self.client.request(
+                    method, f'{self.base_url}{path}', headers=self.headers,
+                    timeout=httpx.Timeout(timeout, pool=None), **kwargs
+                )
+            except httpx.TransportError as e:
+                connect_error = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if attempt == self.max_retries or not (idempotent or connect_error):
+                    raise
+            else:
+                if (not idempotent or response.status_code not in RETRY_STATUS_CODES
+                        or attempt == self.max_retries):
+                    response.raise_for_status()
+                    return response.json()
+                delay = _retry_after(response)
+            if delay is None:
+                delay = random.uniform(0, self.backoff_factor * (2 ** attempt))
+            await asyncio.sleep(delay)
+
+    async def scrape_page(self, url: str, markdown: bool = True) -> Dict:
+        """Scrape a single page (see FirecrawlClient.scrape_page)"""
+        if self.demo_mode:
+            return demo_scrape(url)
+        try:
+            return await self._request('scrape', 'POST', '/scrape', 30,
+                                       json={'url': url, 'markdown': markdown, 'waitForSelector': None})
+        except (httpx.HTTPError, ValueError) as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'url': url
+            }
+
+    async def crawl_site(self, url: str, limit: int = 5, max_depth: int = 2) -> Dict:
+        """Start crawling a site (see FirecrawlClient.crawl_site)"""
+        if self.demo_mode:
+            return demo_crawl(url, limit)
+        try:
+            result = await self._request('crawl', 'POST', '/crawl', 60, idempotent=False, json={
+                'url': url,
+                'limit': limit,
+                'maxDepth': max_depth,
+                'markdown': True,
+                'waitForSelector': None
+            })
+        except (httpx.HTTPError, ValueError) as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'url': url
+            }
+        if 'jobId' in result:
+            return {
+                'success': True,
+                'jobId': result['jobId'],
+                'status': 'processing'
+            }
+        return result
+
+    async def get_crawl_status(self, job_id: str) -> Dict:
+        """Get status of a crawl job"""
+        if self.demo_mode:
+            return demo_crawl_status(job_id)
+        try:
+            return await self._request('crawl_status', 'GET', f'/crawl/{job_id}', 10)
+        except (httpx.HTTPError, ValueError) as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'jobId': job_id
+            }
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class AsyncScrapeRunner:
+    """Daemon thread running the event loop shared by all async scrapes"""
+
+    def __init__(self, threads: int = ASYNC_THREADS):
+        self.app = None
+        self.threads = threads
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._client: Optional[AsyncFirecrawlClient] = None
+        self._client_key: Optional[tuple] = None
+
+    def ensure_started(self, app=None) -> None:
+        """Start the loop thread if it is not running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self.app = app or self.app
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(ready,), name='scrape-async', daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def _run(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        loop.set_default_executor(ThreadPoolExecutor(self.threads, thread_name_prefix='scrape-async-io'))
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        ready.set()
+        loop.run_forever()
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Schedule a coroutine on the loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def client(self) -> AsyncFirecrawlClient:
+        """The loop's shared client, rebuilt if the API key / demo mode changes (call on the loop)"""
+        key = (os.getenv('FIRECRAWL_API_KEY', FIRECRAWL_API_KEY), is_demo_mode())
+        if self._client is None or self._client_key != key:
+            if self._client is not None:
+                self._loop.create_task(self._client.aclose())
+            self._client = AsyncFirecrawlClient(api_key=key[0])
+            self._client_key = key
+        return self._client
+
+    async def run_in_thread(self, fn: Callable, *args):
+        """Run blocking work (parsing, cache I/O) on the loop's thread pool"""
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def run_in_app(self, fn: Callable, *args):
+        """Run database work on the thread pool inside the Flask app context"""
+        def call():
+            with self.app.app_context():
+                try:
+                    return fn(*args)
+                except Exception:
+                    db.session.rollback()
+                    raise
+                finally:
+                    db.session.remove()
+        return await self.run_in_thread(call)
+
+
+# Process-wide runner used by the /api/async/* routes
+async_runner = AsyncScrapeRunner()
+
+
+async def scrape_job_page_async(url: str, use_cache: bool = True) -> Dict:
+    """Asyncio version of firecrawl_utils.scrape_job_page (same result and caching)"""
+    try:
+        cached, hit = await async_runner.run_in_thread(cached_scrape, url, use_cache)
+        if hit is not None:
+            return hit
+        result = await async_runner.client().scrape_page(url)
+        return await async_runner.run_in_thread(build_scrape_result, url, result, cached)
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e),
+            'url': url
+        }
+
+
+async def crawl_job_site_async(url: str, limit: int = 10) -> Dict:
+    """Asyncio version of firecrawl_utils.crawl_job_site"""
+    try:
+        result = await async_runner.client().crawl_site(url, limit=limit)
+        return await async_runner.run_in_thread(build_crawl_result, url, result)
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e),
+            'url': url
+        }
+
+
+def expire_tasks(task_ids: Optional[List[str]] = None) -> int:
+    """
+    Fail tasks pending for longer than SCRAPE_TASK_DEADLINE and drop finished
+    tasks older than SCRAPE_TASK_TTL (caller commits)
+
+    Only the event loop of the process that accepted a task finishes it, so
+    without this a task outliving its process would stay pending forever.
+
+    Args:
+        task_ids: Only consider these tasks (a poll); None sweeps every task
+
+    Returns:
+        Number of tasks failed
+    """
+    now = datetime.utcnow()
+    overdue = update(ScrapeTask).where(
+        ScrapeTask.status == 'pending',
+        ScrapeTask.created_at < now - timedelta(seconds=SCRAPE_TASK_DEADLINE)
+    )
+    if task_ids is not None:
+        overdue = overdue.where(ScrapeTask.task_id.in_(task_ids))
+    error = f'Task did not finish within {SCRAPE_TASK_DEADLINE} seconds; the process running it may have exited'
+    failed = db.session.execute(
+        overdue.values(status='failed', result=json.dumps({'success': False, 'error': error}),
+                       http_status=504, completed_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if task_ids is None:
+        db.session.execute(delete(ScrapeTask).where(ScrapeTask.completed_at < now - timedelta(seconds=SCRAPE_TASK_TTL)))
+    return failed
+
+
+def _complete_task(task_id: str, body: Dict, http_status: int) -> None:
+    # A task already failed by the deadline keeps that answer
+    db.session.execute(
+        update(ScrapeTask).where(ScrapeTask.task_id == task_id, ScrapeTask.status == 'pending').values(
+            status='completed' if body.get('success') else 'failed',
+            result=json.dumps(body, default=str),
+            http_status=http_status,
+            completed_at=datetime.utcnow()
+        )
+    )
+    expire_tasks()
+    db.session.commit()
+
+
+async def _run_task(task_id: str, fetch: Callable[[], Awaitable[Dict]],
+                    finish: Callable[[Dict], Tuple[Dict, int]]) -> None:
+    try:
+        body, http_status = await async_runner.run_in_app(finish, await fetch())
+    except Exception as e:
+        body, http_status = {'success': False, 'error': str(e)}, 500
+    await async_runner.run_in_app(_complete_task, task_id, body, http_status)
+
+
+def submit_task(app, kind: str, url: str, fetch: Callable[[], Awaitable[Dict]],
+                finish: Callable[[Dict], Tuple[Dict, int]]) -> ScrapeTask:
+    """
+    Record a pending task and run it on the event loop
+
+    Args:
+        app: Flask app whose context finish() runs in
+        kind: Task kind shown when polling (e.g. 'scrape-job')
+        url: Target URL
+        fetch: Coroutine function doing the Firecrawl I/O
+        finish: Blocking function turning fetch()'s result into the
+            (JSON body, HTTP status) the synchronous endpoint would return;
+            runs on the thread pool with database access
+
+    Returns:
+        The committed ScrapeTask row
+    """
+    task = ScrapeTask(task_id=uuid.uuid4().hex, kind=kind, url=url, status='pending')
+    db.session.add(task)
+    db.session.commit()
+    async_runner.ensure_started(app)
+    async_runner.submit(_run_task(task.task_id, fetch, finish))
+    return task
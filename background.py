@@ -0,0 +1,151 @@
+"""
+Base class for the in-process background workers (crawl polling, readiness
+recompute, semantic indexing, job stats flushing, resume parsing).
+Each worker is a daemon thread that calls run_once() inside the Flask app
+context until it reports no work, then sleeps until woken or the idle timer
+expires.
+
+Under gunicorn every worker process imports the app, but the shared queues
+only need one consumer. Workers with singleton = True therefore run only in
+the process holding an exclusive file lock (one lock per database); the other
+processes retry the lock every BACKGROUND_LEADER_RETRY seconds and take over
+when the holder exits. A wake() in a non-leader process is a no-op, so work
+queued there waits for the leader's idle timer. Workers with per-process state
+(the job stats buffer) set singleton = False and run everywhere.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+from models_fixed import db
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows, served by single-process waitress
+    fcntl = None
+
+BACKGROUND_LOCK_DIR = os.getenv('BACKGROUND_LOCK_DIR', tempfile.gettempdir())
+# Seconds between a non-leader process's attempts to take the lock
+BACKGROUND_LEADER_RETRY = float(os.getenv('BACKGROUND_LEADER_RETRY', '10'))
+
+
+class LeaderLock:
+    """Non-blocking exclusive file lock, held until the process exits"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._next_attempt = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def acquire(self) -> bool:
+        """True if this process holds the lock (retried at most every BACKGROUND_LEADER_RETRY seconds)"""
+        if self._file is not None:
+            return True
+        if fcntl is None:
+            return True
+        with self._lock:
+            if self._file is not None:
+                return True
+            now = time.monotonic()
+            if now < self._next_attempt:
+                return False
+            self._next_attempt = now + BACKGROUND_LEADER_RETRY
+            f = open(self.path, 'a+')
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                f.close()
+                return False
+            self._file = f
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._next_attempt = 0.0
+
+
+_leader_locks: Dict[str, LeaderLock] = {}
+_leader_locks_lock = threading.Lock()
+
+
+def leader_lock(app) -> LeaderLock:
+    """The process-wide leader lock for the app's database"""
+    uri = str(app.config.get('SQLALCHEMY_DATABASE_URI', ''))
+    name = f"pathai-background-{hashlib.sha1(uri.encode('utf-8')).hexdigest()[:12]}.lock"
+    path = os.path.join(BACKGROUND_LOCK_DIR, name)
+    with _leader_locks_lock:
+        lock = _leader_locks.get(path)
+        if lock is None:
+            lock = _leader_locks[path] = LeaderLock(path)
+        return lock
+
+
+class BackgroundWorker:
+    """Daemon thread running run_once() inside the Flask app context"""
+
+    name = 'background-worker'
+    # Seconds between polls when there is no work and nobody calls wake()
+    idle_sleep = 1.0
+    # Run in one process per database rather than in every process
+    singleton = True
+
+    def __init__(self, app=None):
+        self.app = app
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def ensure_started(self, app=None) -> None:
+        """Start the worker thread if it is not running (cheap to call per request)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            app = app or self.app
+            if self.singleton and not leader_lock(app).acquire():
+                return
+            self.app = app
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def wake(self) -> None:
+        """Run immediately instead of waiting for the idle timer"""
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def run_once(self) -> bool:
+        """Do one unit of work; return False when there was nothing to do"""
+        raise NotImplementedError
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            worked = False
+            try:
+                with self.app.app_context():
+                    try:
+                        worked = self.run_once()
+                    finally:
+                        db.session.remove()
+            except Exception:
+                # Keep the worker alive through transient DB errors
+                time.sleep(self.idle_sleep)
+            if not worked:
+                self._wake.wait(self.idle_sleep)
+                self._wake.clear()
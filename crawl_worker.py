@@ -0,0 +1,293 @@
+"""
+Background worker that follows Firecrawl crawl jobs to completion.
+Each crawl started through /api/crawl-site is recorded as a CrawlTask row. A
+daemon thread polls Firecrawl on a backoff schedule and imports the results
+exactly once. Clients wait for status changes via long-poll or server-sent
+events instead of polling Firecrawl themselves.
+"""
+
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional
+from sqlalchemy import and_, bindparam, or_, update
+from models_fixed import db, CrawlTask
+from firecrawl_utils import get_crawl_results, iter_jobs_from_crawl
+from job_import import bulk_import_jobs
+from background import BackgroundWorker
+
+# Poll schedule: exponential backoff between POLL_BASE_DELAY and POLL_MAX_DELAY
+POLL_BASE_DELAY = 2
+POLL_MAX_DELAY = 60
+# How long a worker owns a task it is polling/importing before others may take over
+TASK_LEASE = 120
+# Give up on crawls that have not finished after this long
+TASK_TIMEOUT = 30 * 60
+# Consecutive Firecrawl errors tolerated before a task is marked failed
+MAX_POLL_ERRORS = 5
+WORKER_IDLE_SLEEP = 1.0
+
+ACTIVE_STATUSES = ('pending', 'crawling')
+FINAL_STATUSES = ('completed', 'failed')
+
+# In-process change notification for long-poll / SSE waiters
+_changed = threading.Condition()
+_version = 0
+
+
+def notify_change() -> None:
+    """Wake every request waiting on a task status change"""
+    global _version
+    with _changed:
+        _version += 1
+        _changed.notify_all()
+
+
+def current_version() -> int:
+    with _changed:
+        return _version
+
+
+def wait_for_change(version: int, timeout: float) -> bool:
+    """
+    Block until a task changes in this process or the timeout expires
+
+    Changes made by other processes are not signalled here, so callers re-read
+    the database after every wake-up or timeout.
+    """
+    with _changed:
+        return _changed.wait_for(lambda: _version != version, timeout=timeout)
+
+
+def next_poll_delay(attempts: int) -> float:
+    """Seconds until the next poll, exponential with jitter"""
+    delay = min(POLL_MAX_DELAY, POLL_BASE_DELAY * (2 ** attempts))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def create_task(firecrawl_job_id: str, url: str, employer_id=None, auto_add: bool = False) -> CrawlTask:
+    """Record a started crawl so the worker follows it (idempotent per Firecrawl job ID)"""
+    task = CrawlTask.query.filter_by(firecrawl_job_id=firecrawl_job_id).first()
+    if task is None:
+        task = CrawlTask(
+            firecrawl_job_id=firecrawl_job_id,
+            url=url,
+            employer_id=employer_id,
+            auto_add=auto_add,
+            status='crawling',
+            next_poll_at=datetime.utcnow()
+        )
+        db.session.add(task)
+        db.session.commit()
+        notify_change()
+    return task
+
+
+def _claim_import(task_id: int, auto_add: bool = False, employer_id=None) -> bool:
+    """
+    Atomically move a task to 'importing'; only one caller can win
+
+    With auto_add, a task the worker already completed without importing
+    (auto_add off) can be claimed once more, and is switched to auto_add.
+    """
+    claimable = CrawlTask.status.in_(ACTIVE_STATUSES)
+    values = {'status': 'importing', 'updated_at': datetime.utcnow()}
+    if auto_add:
+        claimable = or_(claimable, and_(CrawlTask.status == 'completed', CrawlTask.auto_add.isnot(True)))
+        values['auto_add'] = True
+        if employer_id is not None:
+            values['employer_id'] = employer_id
+    result = db.session.execute(
+        update(CrawlTask).where(CrawlTask.task_id == task_id, claimable).values(**values)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def import_crawl_results(task: CrawlTask, result: Dict, auto_add: bool = False, employer_id=None) -> bool:
+    """
+    Import a completed crawl's jobs, at most once per task
+
+    The jobs and the 'completed' status are committed in one transaction, so a
+    crash mid-import leaves no partial import behind and the task is retried.
+
+    Args:
+        task: The crawl's task
+        result: Its completed get_crawl_results() response
+        auto_add: Add the jobs even if the task was started without auto_add,
+            including once after the worker completed it without adding them
+        employer_id: Employer for those jobs (defaults to the task's)
+
+    Returns:
+        True if this call performed the import, False if another caller did
+    """
+    if not _claim_import(task.task_id, auto_add, employer_id):
+        return False
+
+    try:
+        data = result.get('data', [])
+        # Parsed jobs stream from the parsing pool straight into the chunked import
+        found = 0
+
+        def counted(jobs):
+            nonlocal found
+            for job in jobs:
+                found += 1
+                yield job
+
+        jobs = counted(iter_jobs_from_crawl(data, task.url))
+        added = 0
+        if task.auto_add:
+            added = bulk_import_jobs(jobs, employer_id=task.employer_id or 1)['jobs_added']
+        else:
+            # Still parse every page to report jobs_found
+            for _ in jobs:
+                pass
+        task.status = 'completed'
+        task.pages_crawled = len(data)
+        task.jobs_found = found
+        task.jobs_added = added
+        task.error = None
+        task.completed_at = datetime.utcnow()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        task.status = 'failed'
+        task.error = f'Import failed: {e}'
+        db.session.commit()
+    finally:
+        notify_change()
+    return True
+
+
+def poll_task(task: CrawlTask) -> None:
+    """Poll Firecrawl once for a task and advance its state"""
+    result = get_crawl_results(task.firecrawl_job_id)
+    status = result.get('status')
+
+    if result.get('success', True) and status == 'completed':
+        import_crawl_results(task, result)
+        return
+
+    now = datetime.utcnow()
+    if status == 'failed' or (task.created_at and now - task.created_at > timedelta(seconds=TASK_TIMEOUT)):
+        task.status = 'failed'
+        task.error = result.get('error') or ('Crawl failed' if status == 'failed' else 'Crawl timed out')
+    elif not result.get('success', True) or 'error' in result:
+        task.attempts += 1
+        task.error = result.get('error')
+        if task.attempts >= MAX_POLL_ERRORS:
+            task.status = 'failed'
+        else:
+            task.next_poll_at = now + timedelta(seconds=next_poll_delay(task.attempts))
+    else:
+        task.attempts += 1
+        task.status = 'crawling'
+        task.error = None
+        task.next_poll_at = now + timedelta(seconds=next_poll_delay(task.attempts))
+    db.session.commit()
+    notify_change()
+
+
+def _claim_due_task() -> Optional[CrawlTask]:
+    """Lease the most overdue active task, or return None if nothing is due"""
+    now = datetime.utcnow()
+
+    # Recover tasks whose importer died: the import never committed, so retry it
+    db.session.execute(
+        update(CrawlTask)
+        .where(CrawlTask.status == 'importing',
+               CrawlTask.updated_at < now - timedelta(seconds=TASK_LEASE))
+        .values(status='crawling', next_poll_at=now)
+    )
+    db.session.commit()
+
+    # Statuses rendered inline: SQLite only uses the partial ix_crawl_tasks_due
+    # index when the query repeats its literal predicate
+    active = bindparam('active_statuses', list(ACTIVE_STATUSES), expanding=True, literal_execute=True)
+    task = (CrawlTask.query
+            .filter(CrawlTask.status.in_(active), CrawlTask.next_poll_at <= now)
+            .order_by(CrawlTask.next_poll_at)
+            .first())
+    if task is None:
+        return None
+
+    # Lease it by pushing next_poll_at forward; a concurrent worker that read the
+    # same row sees its conditional UPDATE match nothing
+    leased = db.session.execute(
+        update(CrawlTask)
+        .where(CrawlTask.task_id == task.task_id, CrawlTask.next_poll_at == task.next_poll_at)
+        .values(next_poll_at=now + timedelta(seconds=TASK_LEASE))
+    )
+    db.session.commit()
+    if leased.rowcount != 1:
+        return None
+    db.session.refresh(task)
+    return task
+
+
+class CrawlWorker(BackgroundWorker):
+    """Daemon thread that polls due crawl tasks inside the Flask app context"""
+
+    name = 'crawl-worker'
+    idle_sleep = WORKER_IDLE_SLEEP
+
+    def run_once(self) -> bool:
+        """Process one due task; returns False when nothing was due"""
+        task = _claim_due_task()
+        if task is None:
+            return False
+        poll_task(task)
+        return True
+
+
+crawl_worker = CrawlWorker()
+
+
+def _load_task(task_id: int) -> Optional[CrawlTask]:
+    db.session.expire_all()
+    return db.session.get(CrawlTask, task_id)
+
+
+def wait_for_task(task_id: int, since: Optional[str], timeout: float) -> Optional[CrawlTask]:
+    """
+    Long-poll: return the task once its updated_at differs from `since`, it has
+    finished, or the timeout expires
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        version = current_version()
+        task = _load_task(task_id)
+        if task is None or task.status in FINAL_STATUSES:
+            return task
+        updated = task.updated_at.isoformat() if task.updated_at else None
+        remaining = deadline - time.monotonic()
+        if since is None or updated != since or remaining <= 0:
+            return task
+        wait_for_change(version, min(remaining, WORKER_IDLE_SLEEP * 2))
+
+
+def task_events(task_id: int, max_duration: float = 600, heartbeat: float = 15) -> Iterator[str]:
+    """Server-sent event stream of a task's status until it finishes"""
+    deadline = time.monotonic() + max_duration
+    last_payload = None
+    last_sent = time.monotonic()
+    while time.monotonic() < deadline:
+        version = current_version()
+        task = _load_task(task_id)
+        if task is None:
+            yield f"event: error\ndata: {json.dumps({'error': 'Task not found'})}\n\n"
+            return
+        payload = task.to_dict()
+        if payload != last_payload:
+            yield f"event: status\ndata: {json.dumps(payload)}\n\n"
+            last_payload = payload
+            last_sent = time.monotonic()
+        if task.status in FINAL_STATUSES:
+            return
+        if time.monotonic() - last_sent >= heartbeat:
+            yield ': keep-alive\n\n'
+            last_sent = time.monotonic()
+        wait_for_change(version, WORKER_IDLE_SLEEP * 2)
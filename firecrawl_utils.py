@@ -5,11 +5,22 @@ Helps automatically populate the job database with data from various job boards.
 
 import os
 import json
+import random
 import re
+import threading
+from bisect import bisect_right
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
+from scrape_cache import scrape_cache, content_hash
+from parse_pool import iter_parsed
+from metrics import observe_firecrawl
 
 # Ensure we load the .env located next to this module (backend/.env)
 _env_path = os.path.join(os.path.dirname(__file__), '.env')
@@ -18,6 +29,20 @@ load_dotenv(_env_path, override=True)
 FIRECRAWL_API_KEY = os.getenv('FIRECRAWL_API_KEY', 'demo_key')
 FIRECRAWL_API_URL = 'https://api.firecrawl.dev/v0'
 
+# Bulk scraping limits
+BATCH_MAX_WORKERS = int(os.getenv('SCRAPE_BATCH_MAX_WORKERS', '16'))
+BATCH_PER_HOST_LIMIT = int(os.getenv('SCRAPE_BATCH_PER_HOST_LIMIT', '2'))
+BATCH_MAX_URLS = 500
+
+# HTTP connection pool / retry tuning for the Firecrawl API
+HTTP_POOL_SIZE = int(os.getenv('FIRECRAWL_POOL_SIZE', str(BATCH_MAX_WORKERS)))
+HTTP_MAX_RETRIES = int(os.getenv('FIRECRAWL_MAX_RETRIES', '3'))
+HTTP_BACKOFF_FACTOR = float(os.getenv('FIRECRAWL_BACKOFF_FACTOR', '0.5'))
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Crawl page fields used by parse_crawl_page
+_CRAWL_PAGE_FIELDS = ('jobs', 'markdown', 'content', 'url')
+
 def is_demo_mode() -> bool:
     """Check if demo mode is enabled (called at runtime, not import time)"""
     api_key = os.getenv('FIRECRAWL_API_KEY', 'demo_key')
@@ -53,11 +78,98 @@ DEMO_JOBS = [
 ]
 
 
+def demo_scrape(url: str) -> Dict:
+    """Mock Firecrawl scrape response used in demo mode"""
+    job = random.choice(DEMO_JOBS)
+    return {
+        'success': True,
+        'markdown': f"# {job['title']}\n\n{job['description']}",
+        'pageTitle': job['title'],
+        'metadata': {'url': url}
+    }
+
+
+def demo_crawl(url: str, limit: int) -> Dict:
+    """Mock Firecrawl crawl response used in demo mode"""
+    return {
+        'success': True,
+        'jobId': f'demo_crawl_{int(datetime.now().timestamp())}',
+        'status': 'completed',
+        'data': [
+            {'url': f'{url}?page={i+1}', 'markdown': f"# Job {i+1}\n\n{job['description']}", 'jobs': [job]}
+            for i, job in enumerate(DEMO_JOBS[:limit])
+        ]
+    }
+
+
+def demo_crawl_status(job_id: str) -> Dict:
+    """Mock Firecrawl crawl status used in demo mode: demo crawls complete immediately"""
+    return {
+        'success': True,
+        'jobId': job_id,
+        'status': 'completed',
+        'data': [
+            {'url': f'demo://{job_id}?page={i+1}', 'markdown': f"# {job['title']}\n\n{job['description']}", 'jobs': [job]}
+            for i, job in enumerate(DEMO_JOBS)
+        ]
+    }
+
+
+class JitteredRetry(Retry):
+    """urllib3 Retry with "full jitter" exponential backoff"""
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff > 0 else 0
+
+
+def _retry_policy(max_retries: int, backoff_factor: float, status_methods: Iterable[str]) -> JitteredRetry:
+    # urllib3 retries connect errors for any method; read errors and
+    # status_forcelist responses only for status_methods
+    return JitteredRetry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(status_methods),
+        backoff_factor=backoff_factor,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+
+
+def build_session(pool_size: int = HTTP_POOL_SIZE,
+                  max_retries: int = HTTP_MAX_RETRIES,
+                  backoff_factor: float = HTTP_BACKOFF_FACTOR,
+                  base_url: str = FIRECRAWL_API_URL) -> requests.Session:
+    """
+    Build a keep-alive requests.Session for the Firecrawl API
+
+    Connections are pooled (up to pool_size per host) so repeat calls skip the
+    TCP+TLS handshake. Connection errors are retried with jittered exponential
+    backoff. Read errors and 429/5xx responses (honouring Retry-After) are
+    retried only for idempotent calls: GETs and POST /scrape. POST /crawl
+    starts a crawl job, so a 5xx or a timeout after the request went out is
+    not retried; the server may have started the crawl already.
+    """
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                          max_retries=_retry_policy(max_retries, backoff_factor, ['GET', 'POST']))
+    # Also serves GET /crawl/<id> (longest prefix wins), so GETs keep their retries
+    crawl_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                                max_retries=_retry_policy(max_retries, backoff_factor, ['GET']))
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.mount(f'{base_url}/crawl', crawl_adapter)
+    return session
+
+
 class FirecrawlClient:
     """Client for interacting with Firecrawl API"""
     
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize Firecrawl client with API key"""
+    def __init__(self, api_key: Optional[str] = None, session: Optional[requests.Session] = None):
+        """Initialize Firecrawl client with API key and a pooled HTTP session"""
         self.api_key = api_key or FIRECRAWL_API_KEY
         self.demo_mode = is_demo_mode()  # Check at runtime, not import time
         if not self.demo_mode and not self.api_key:
@@ -67,6 +179,7 @@ class FirecrawlClient:
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json'
         }
+        self.session = session or build_session(base_url=self.base_url)
     
     def scrape_page(self, url: str, markdown: bool = True) -> Dict:
         """
@@ -81,14 +194,7 @@ class FirecrawlClient:
         """
         # Demo mode: return mock data
         if self.demo_mode:
-            import random
-            job = random.choice(DEMO_JOBS)
-            return {
-                'success': True,
-                'markdown': f"# {job['title']}\n\n{job['description']}",
-                'pageTitle': job['title'],
-                'metadata': {'url': url}
-            }
+            return demo_scrape(url)
         
         try:
             endpoint = f'{self.base_url}/scrape'
@@ -98,14 +204,14 @@ class FirecrawlClient:
                 'waitForSelector': None
             }
             
-            response = requests.post(
-                endpoint,
-                headers=self.headers,
-                json=payload,
-                timeout=30
-            )
-            
-            response.raise_for_status()
+            with observe_firecrawl('scrape'):
+                response = self.session.post(
+                    endpoint,
+                    headers=self.headers,
+                    json=payload,
+                    timeout=30
+                )
+                response.raise_for_status()
             return response.json()
             
         except requests.exceptions.RequestException as e:
@@ -129,15 +235,7 @@ class FirecrawlClient:
         """
         # Demo mode: return mock data
         if self.demo_mode:
-            return {
-                'success': True,
-                'jobId': f'demo_crawl_{int(datetime.now().timestamp())}',
-                'status': 'completed',
-                'data': [
-                    {'url': f'{url}?page={i+1}', 'markdown': f"# Job {i+1}\n\n{job['description']}", 'jobs': [job]}
-                    for i, job in enumerate(DEMO_JOBS[:limit])
-                ]
-            }
+            return demo_crawl(url, limit)
         
         try:
             endpoint = f'{self.base_url}/crawl'
@@ -149,14 +247,14 @@ class FirecrawlClient:
                 'waitForSelector': None
             }
             
-            response = requests.post(
-                endpoint,
-                headers=self.headers,
-                json=payload,
-                timeout=60
-            )
-            
-            response.raise_for_status()
+            with observe_firecrawl('crawl'):
+                response = self.session.post(
+                    endpoint,
+                    headers=self.headers,
+                    json=payload,
+                    timeout=60
+                )
+                response.raise_for_status()
             result = response.json()
             
             # For async crawling, return the job ID
@@ -178,14 +276,19 @@ class FirecrawlClient:
     
     def get_crawl_status(self, job_id: str) -> Dict:
         """Get status of a crawl job"""
+        # Demo mode: demo crawls complete immediately
+        if self.demo_mode:
+            return demo_crawl_status(job_id)
+        
         try:
             endpoint = f'{self.base_url}/crawl/{job_id}'
-            response = requests.get(
-                endpoint,
-                headers=self.headers,
-                timeout=10
-            )
-            response.raise_for_status()
+            with observe_firecrawl('crawl_status'):
+                response = self.session.get(
+                    endpoint,
+                    headers=self.headers,
+                    timeout=10
+                )
+                response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             return {
@@ -195,6 +298,175 @@ class FirecrawlClient:
             }
 
 
+_client: Optional[FirecrawlClient] = None
+_client_key: Optional[tuple] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> FirecrawlClient:
+    """
+    Return the shared FirecrawlClient, creating it on first use
+
+    The client (and its connection pool) is reused across requests and threads.
+    It is rebuilt only if the API key / demo mode changes at runtime.
+    """
+    global _client, _client_key
+    key = (os.getenv('FIRECRAWL_API_KEY', FIRECRAWL_API_KEY), is_demo_mode())
+    with _client_lock:
+        if _client is None or _client_key != key:
+            _client = FirecrawlClient(api_key=key[0])
+            _client_key = key
+        return _client
+
+
+# JobParser patterns, compiled once per process
+_SECTION_SPLIT_RE = re.compile(r'\n#{1,3}\s+|\n-{3,}|\n\*{3,}')
+_SALARY_RE = re.compile(r'\$[\d,]+\s*-\s*\$[\d,]+')
+_LOCATION_LABEL_RE = re.compile(r'(location|city|where)[:*\-]*', re.IGNORECASE)
+
+# What a keyword found on a line means for that line
+_TITLE, _LOCATION, _REMOTE, _FULLY_REMOTE, _HYBRID, _ON_SITE, _NOT_DESCRIPTION = 1, 2, 4, 8, 16, 32, 64
+_KEYWORD_FLAGS = {
+    'job title': _TITLE | _NOT_DESCRIPTION,
+    'position': _TITLE | _NOT_DESCRIPTION,
+    'role:': _TITLE | _NOT_DESCRIPTION,
+    'role': _NOT_DESCRIPTION,
+    'location': _LOCATION | _NOT_DESCRIPTION,
+    'city': _LOCATION,
+    'salary': _NOT_DESCRIPTION,
+    'remote': _REMOTE | _NOT_DESCRIPTION,
+    'work': _REMOTE,
+    'fully remote': _FULLY_REMOTE | _REMOTE | _NOT_DESCRIPTION,
+    'work from anywhere': _FULLY_REMOTE | _REMOTE,
+    'hybrid': _HYBRID,
+    'on-site': _ON_SITE,
+    'office': _ON_SITE,
+    # Keywords that overlap in the text ("position-site" holds both "position"
+    # and "on-site"); a single non-overlapping scan needs them spelled out
+    'position-site': _TITLE | _NOT_DESCRIPTION | _ON_SITE,
+    'location-site': _LOCATION | _NOT_DESCRIPTION | _ON_SITE,
+    'work from anywheremote': _FULLY_REMOTE | _REMOTE | _NOT_DESCRIPTION,
+}
+# Every keyword in one pattern, grouped by first letter so the scan rejects most
+# positions on one character; each branch prefers its longest spelling
+_KEYWORD_RE = re.compile(
+    r'city|fully remote|hybrid|job title|location(?:-site)?|o(?:n-site|ffice)|'
+    r'position(?:-site)?|r(?:ole:?|emote)|salary|work(?: from anywhere(?:mote)?)?'
+)
+
+
+def _line_flags(text: str, line_count: int) -> List[int]:
+    """Keyword flags per line, from a single scan of the lowercased section"""
+    lower = text.lower()
+    flags = [0] * line_count
+    matches = _KEYWORD_RE.finditer(lower)
+    if line_count == 1:
+        for match in matches:
+            flags[0] |= _KEYWORD_FLAGS[match.group()]
+        return flags
+    # Line offsets come from the lowercased text: lower() can change lengths
+    starts = []
+    offset = 0
+    for line in lower.split('\n'):
+        starts.append(offset)
+        offset += len(line) + 1
+    for match in matches:
+        flags[bisect_right(starts, match.start()) - 1] |= _KEYWORD_FLAGS[match.group()]
+    return flags
+
+
+def _clean_title(line: str) -> str:
+    return line.replace('Job Title:', '').replace('Position:', '').replace('Role:', '').strip()
+
+
+def parse_job_section(section: str, source_url: str, scraped_at: Optional[str] = None) -> Optional[Dict]:
+    """Parse a single job section, or return None if it does not look like a job"""
+    text = section.strip()
+    lines = text.split('\n')
+    flags = _line_flags(text, len(lines))
+
+    # Try to extract title (first line or line with job title keywords)
+    title = None
+    description_lines = []
+    location = None
+    salary_range = None
+    remote_type = None
+
+    for i, line in enumerate(lines):
+        line_flags = flags[i]
+
+        # Extract title
+        if not title and (line_flags & _TITLE or (i == 0 and 5 < len(line) < 200)):
+            title = _clean_title(line)
+
+        # Extract salary
+        if '$' in line:
+            salary_match = _SALARY_RE.search(line)
+            if salary_match:
+                salary_range = salary_match.group(0)
+
+        if not line_flags:
+            description_lines.append(line)
+            continue
+
+        # Extract location
+        if line_flags & _LOCATION:
+            location = _LOCATION_LABEL_RE.sub('', line).strip()
+
+        # Extract remote type
+        if line_flags & _REMOTE:
+            if line_flags & _FULLY_REMOTE:
+                remote_type = 'fully_remote'
+            elif line_flags & _HYBRID:
+                remote_type = 'hybrid'
+            elif line_flags & _ON_SITE:
+                remote_type = 'on_site'
+
+        # Collect description lines
+        if not line_flags & _NOT_DESCRIPTION:
+            description_lines.append(line)
+
+    description = '\n'.join(description_lines).strip()[:500]
+
+    # Only return if we have meaningful content
+    if title and (description or location):
+        return {
+            'title': title[:100],
+            'description': description,
+            'location': location or 'Remote',
+            'remote_type': remote_type or 'hybrid',
+            'salary_range': salary_range,
+            'source_url': source_url,
+            'scraped_at': scraped_at or datetime.now().isoformat()
+        }
+
+    return None
+
+
+def parse_job_page(content: str, url: str) -> List[Dict]:
+    """
+    Extract job listings from scraped page content
+    
+    A pure function of its arguments (no client, cache or app state), so it can
+    run in worker processes as well as inline.
+    
+    Args:
+        content: The scraped page content (markdown or HTML)
+        url: The source URL
+        
+    Returns:
+        List of extracted job dictionaries
+    """
+    scraped_at = datetime.now().isoformat()
+    jobs = []
+    for section in _SECTION_SPLIT_RE.split(content or ''):
+        if len(section.strip()) > 50:  # Minimum content length
+            job = parse_job_section(section, url, scraped_at)
+            if job:
+                jobs.append(job)
+    return jobs
+
+
 class JobParser:
     """Parse and extract job information from scraped content"""
     
@@ -202,7 +474,7 @@ class JobParser:
     def extract_jobs_from_page(content: str, url: str) -> List[Dict]:
         """
         Extract job listings from scraped page content
-        Uses pattern matching to identify job-like entries
+        Uses pattern matching to identify job-like entries (see parse_job_page)
         
         Args:
             content: The scraped page content (markdown or HTML)
@@ -211,127 +483,186 @@ class JobParser:
         Returns:
             List of extracted job dictionaries
         """
-        jobs = []
-        
-        # Split by common job separators
-        job_sections = re.split(r'\n#{1,3}\s+|\n-{3,}|\n\*{3,}', content)
-        
-        for section in job_sections:
-            if len(section.strip()) > 50:  # Minimum content length
-                job = JobParser._parse_job_section(section, url)
-                if job:
-                    jobs.append(job)
-        
-        return jobs
+        return parse_job_page(content, url)
     
     @staticmethod
     def _parse_job_section(section: str, source_url: str) -> Optional[Dict]:
         """Parse a single job section"""
-        lines = section.strip().split('\n')
-        
-        # Try to extract title (first line or line with job title keywords)
-        title = None
-        description_lines = []
-        location = None
-        salary_range = None
-        remote_type = None
-        
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            
-            # Extract title
-            if not title and (
-                'job title' in line_lower or 
-                'position' in line_lower or 
-                'role:' in line_lower or
-                (i == 0 and len(line) > 5 and len(line) < 200)
-            ):
-                title = line.replace('Job Title:', '').replace('Position:', '').replace('Role:', '').strip()
-            
-            # Extract location
-            if 'location' in line_lower or 'city' in line_lower:
-                location = re.sub(r'(location|city|where)[:*\-]*', '', line, flags=re.IGNORECASE).strip()
-            
-            # Extract remote type
-            if 'remote' in line_lower or 'work' in line_lower:
-                if 'fully remote' in line_lower or 'work from anywhere' in line_lower:
-                    remote_type = 'fully_remote'
-                elif 'hybrid' in line_lower:
-                    remote_type = 'hybrid'
-                elif 'on-site' in line_lower or 'office' in line_lower:
-                    remote_type = 'on_site'
-            
-            # Extract salary
-            salary_pattern = r'\$[\d,]+\s*-\s*\$[\d,]+'
-            salary_match = re.search(salary_pattern, line)
-            if salary_match:
-                salary_range = salary_match.group(0)
-            
-            # Collect description lines
-            if not any(keyword in line_lower for keyword in ['location', 'salary', 'remote', 'job title', 'position', 'role']):
-                description_lines.append(line)
-        
-        description = '\n'.join(description_lines).strip()[:500]
-        
-        # Only return if we have meaningful content
-        if title and (description or location):
-            return {
-                'title': title[:100],
-                'description': description,
-                'location': location or 'Remote',
-                'remote_type': remote_type or 'hybrid',
-                'salary_range': salary_range,
-                'source_url': source_url,
-                'scraped_at': datetime.now().isoformat()
-            }
-        
-        return None
+        return parse_job_section(section, source_url)
+
+
+def cached_scrape(url: str, use_cache: bool = True) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """
+    Look a URL up in the scrape cache
+
+    Returns:
+        (cache entry or None, response to return without scraping when the
+        entry is fresh, else None)
+    """
+    cached = scrape_cache.lookup(url) if use_cache and not is_demo_mode() else None
+    if cached and cached['fresh']:
+        # The entry may have been stored under another spelling of the URL
+        return cached, dict(cached['result'], url=url, cached=True, imported_by=cached['imported_by'])
+    return cached, None
+
+
+def build_scrape_result(url: str, result: Dict, cached: Optional[Dict]) -> Dict:
+    """
+    Turn a Firecrawl scrape response into the scrape_job_page() result
+
+    Parses the page's jobs (unless its content hash matches the stale cache
+    entry) and refreshes the cache.
+    """
+    if not result.get('success', False):
+        return {
+            'success': False,
+            'error': result.get('error', 'Unknown error'),
+            'url': url
+        }
+    
+    # In demo mode, return demo jobs directly
+    if is_demo_mode():
+        jobs = [random.choice(DEMO_JOBS)]
+        return {
+            'success': True,
+            'url': url,
+            'jobs': jobs,
+            'job_count': len(jobs),
+            'page_title': result.get('pageTitle', 'Unknown'),
+            'scraped_at': datetime.now().isoformat(),
+            'cached': False,
+            'imported_by': []
+        }
+    
+    content = result.get('markdown', result.get('content', ''))
+    page_hash = content_hash(content)
+    
+    # Page unchanged since the last scrape: reuse the parsed jobs
+    if cached and cached['content_hash'] == page_hash:
+        response = dict(cached['result'], url=url, scraped_at=datetime.now().isoformat())
+        scrape_cache.put(url, page_hash, response, imported_by=cached['imported_by'])
+        return dict(response, cached=False, unchanged=True, imported_by=cached['imported_by'])
+    
+    jobs = JobParser.extract_jobs_from_page(content, url)
+    response = {
+        'success': True,
+        'url': url,
+        'jobs': jobs,
+        'job_count': len(jobs),
+        'page_title': result.get('pageTitle', 'Unknown'),
+        'scraped_at': datetime.now().isoformat()
+    }
+    scrape_cache.put(url, page_hash, response)
+    return dict(response, cached=False, imported_by=[])
 
 
-def scrape_job_page(url: str) -> Dict:
+def scrape_job_page(url: str, use_cache: bool = True) -> Dict:
     """
     Scrape a single job page and extract job information
     
+    Results are cached per normalized URL (see scrape_cache). A fresh cache hit
+    skips the Firecrawl call entirely; a stale entry whose page content hash is
+    unchanged skips re-parsing. 'imported_by' lists the employers this exact
+    page content was imported for before, so import paths can skip it.
+    
     Args:
         url: The URL to scrape
+        use_cache: Set to False to force a new scrape
         
     Returns:
         Dictionary with scrape results and extracted jobs
     """
     try:
-        client = FirecrawlClient()
-        result = client.scrape_page(url)
-        
-        if not result.get('success', False):
-            return {
-                'success': False,
-                'error': result.get('error', 'Unknown error'),
-                'url': url
-            }
+        cached, hit = cached_scrape(url, use_cache)
+        if hit is not None:
+            return hit
         
-        # In demo mode, return demo jobs directly
-        if is_demo_mode():
-            import random
-            jobs = [random.choice(DEMO_JOBS)]
-        else:
-            content = result.get('markdown', result.get('content', ''))
-            jobs = JobParser.extract_jobs_from_page(content, url)
+        client = get_client()
+        return build_scrape_result(url, client.scrape_page(url), cached)
         
+    except Exception as e:
         return {
-            'success': True,
-            'url': url,
-            'jobs': jobs,
-            'job_count': len(jobs),
-            'page_title': result.get('pageTitle', 'Unknown'),
-            'scraped_at': datetime.now().isoformat()
+            'success': False,
+            'error': str(e),
+            'url': url
         }
+
+
+def parse_crawl_page(page: Dict, url: str) -> List[Dict]:
+    """Jobs of one crawled page (runs in parse_pool worker processes)"""
+    # Demo crawls carry pre-extracted jobs
+    if page.get('jobs'):
+        return list(page['jobs'])
+    content = page.get('markdown', page.get('content', ''))
+    return parse_job_page(content, page.get('url', url))
+
+
+def iter_jobs_from_crawl(data: Iterable[Dict], url: str) -> Iterator[Dict]:
+    """
+    Stream the job listings of a crawl result's pages
+    
+    Large crawls are parsed in worker processes (see parse_pool); only the
+    fields the parser needs are sent to them.
+    
+    Args:
+        data: The crawl result's 'data' pages (one dict per crawled page)
+        url: Fallback source URL for pages without their own
         
-    except Exception as e:
+    Yields:
+        Extracted job dictionaries, in page order
+    """
+    pages = (
+        ({key: item[key] for key in _CRAWL_PAGE_FIELDS if key in item}, url)
+        for item in data
+    )
+    return iter_parsed(pages, parse_crawl_page)
+
+
+def extract_jobs_from_crawl(data: List[Dict], url: str) -> List[Dict]:
+    """
+    Extract job listings from the pages of a crawl result
+    
+    Args:
+        data: The crawl result's 'data' list (one dict per crawled page)
+        url: Fallback source URL for pages without their own
+        
+    Returns:
+        List of extracted job dictionaries
+    """
+    return list(iter_jobs_from_crawl(data, url))
+
+
+def build_crawl_result(url: str, result: Dict) -> Dict:
+    """Turn a Firecrawl crawl response into the crawl_job_site() result"""
+    if not result.get('success', False):
         return {
             'success': False,
-            'error': str(e),
+            'error': result.get('error', 'Unknown error'),
             'url': url
         }
+    
+    # Async job - return job ID for polling
+    if 'jobId' in result:
+        return {
+            'success': True,
+            'status': 'crawling',
+            'jobId': result['jobId'],
+            'url': url,
+            'message': 'Crawl started. Use jobId to check status.'
+        }
+    
+    # Process results if available
+    data = result.get('data', [])
+    jobs = extract_jobs_from_crawl(data, url)
+    
+    return {
+        'success': True,
+        'url': url,
+        'jobs': jobs,
+        'job_count': len(jobs),
+        'pages_crawled': len(data),
+        'crawled_at': datetime.now().isoformat()
+    }
 
 
 def crawl_job_site(url: str, limit: int = 10) -> Dict:
@@ -346,43 +677,8 @@ def crawl_job_site(url: str, limit: int = 10) -> Dict:
         Dictionary with crawl results
     """
     try:
-        client = FirecrawlClient()
-        result = client.crawl_site(url, limit=limit)
-        
-        if not result.get('success', False):
-            return {
-                'success': False,
-                'error': result.get('error', 'Unknown error'),
-                'url': url
-            }
-        
-        # Async job - return job ID for polling
-        if 'jobId' in result:
-            return {
-                'success': True,
-                'status': 'crawling',
-                'jobId': result['jobId'],
-                'url': url,
-                'message': 'Crawl started. Use jobId to check status.'
-            }
-        
-        # Process results if available
-        jobs = []
-        data = result.get('data', [])
-        
-        for item in data:
-            content = item.get('markdown', item.get('content', ''))
-            extracted = JobParser.extract_jobs_from_page(content, item.get('url', url))
-            jobs.extend(extracted)
-        
-        return {
-            'success': True,
-            'url': url,
-            'jobs': jobs,
-            'job_count': len(jobs),
-            'pages_crawled': len(data),
-            'crawled_at': datetime.now().isoformat()
-        }
+        client = get_client()
+        return build_crawl_result(url, client.crawl_site(url, limit=limit))
         
     except Exception as e:
         return {
@@ -395,7 +691,7 @@ def crawl_job_site(url: str, limit: int = 10) -> Dict:
 def get_crawl_results(job_id: str) -> Dict:
     """Check the status and results of an async crawl job"""
     try:
-        client = FirecrawlClient()
+        client = get_client()
         return client.get_crawl_status(job_id)
     except Exception as e:
         return {
@@ -403,3 +699,79 @@ def get_crawl_results(job_id: str) -> Dict:
             'error': str(e),
             'jobId': job_id
         }
+
+
+def scrape_job_pages(urls: Iterable[str],
+                     max_workers: int = BATCH_MAX_WORKERS,
+                     per_host_limit: int = BATCH_PER_HOST_LIMIT,
+                     use_cache: bool = True) -> Iterator[Dict]:
+    """
+    Scrape many job pages concurrently on a bounded thread pool
+
+    Results are yielded as each URL finishes (not in input order), so callers
+    can stream progress. At most max_workers scrapes run at once overall and
+    at most per_host_limit at once against any single host.
+
+    URLs wait in a queue per host and are only handed to the pool when their
+    host has a free slot, so a batch dominated by one host never parks pool
+    threads while other hosts have work. Hosts take turns for free threads.
+
+    Args:
+        urls: The URLs to scrape
+        max_workers: Size of the worker pool
+        per_host_limit: Maximum concurrent scrapes per host
+        use_cache: Set to False to force new scrapes
+
+    Yields:
+        The scrape_job_page() result for each URL
+    """
+    urls = list(dict.fromkeys(u for u in urls if u))
+    if not urls:
+        return
+
+    queues: Dict[str, deque] = {}
+    for url in urls:
+        queues.setdefault(urlparse(url).netloc.lower(), deque()).append(url)
+    per_host_limit = max(1, per_host_limit)
+    running: Counter = Counter()
+    # Hosts with queued URLs and a free slot, in turn order
+    ready = deque(queues)
+
+    workers = max(1, min(max_workers, len(urls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scrape') as pool:
+        futures: Dict = {}
+
+        def submit_ready():
+            while ready and len(futures) < workers:
+                host = ready.popleft()
+                url = queues[host].popleft()
+                futures[pool.submit(scrape_job_page, url, use_cache=use_cache)] = (url, host)
+                running[host] += 1
+                if queues[host] and running[host] < per_host_limit:
+                    ready.append(host)
+
+        try:
+            submit_ready()
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                finished = []
+                for future in done:
+                    url, host = futures.pop(future)
+                    finished.append((future, url))
+                    running[host] -= 1
+                    if queues[host] and host not in ready:
+                        ready.append(host)
+                submit_ready()
+                for future, url in finished:
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        yield {
+                            'success': False,
+                            'error': str(e),
+                            'url': url
+                        }
+        finally:
+            # Caller stopped early (e.g. client disconnected): drop queued work
+            for future in futures:
+                future.cancel()
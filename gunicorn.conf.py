@@ -0,0 +1,34 @@
+"""
+Gunicorn settings for production serving (Linux/macOS).
+Run with `gunicorn -c gunicorn.conf.py app:app`, or `python serve.py`.
+
+Each worker process serves requests on a thread pool. A slow Firecrawl scrape
+ties up one thread rather than the whole process. Every setting can be
+overridden through the environment.
+
+Background workers (crawl polling, readiness, semantic indexing, resume
+parsing) run in only one of the worker processes, see background.py. The
+response cache is shared only through RESPONSE_CACHE_URL (Redis); without it
+the cache is off whenever more than one worker runs.
+"""
+
+import multiprocessing
+import os
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+bind = os.getenv('BIND', f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5000')}")
+workers = int(os.getenv('WEB_CONCURRENCY', str(min(multiprocessing.cpu_count() * 2 + 1, 8))))
+# Read by response_cache (workers inherit the master's environment): with
+# several processes the response cache needs RESPONSE_CACHE_URL or stays off
+os.environ['WEB_CONCURRENCY'] = str(workers)
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', '8'))
+# Scrape and crawl-import requests can legitimately take a while
+timeout = int(os.getenv('WEB_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '2000'))
+max_requests_jitter = 200
+accesslog = '-'
+errorlog = '-'
@@ -1,7 +1,11 @@
 from app import app
 from models_fixed import db
+from search_index import ensure_job_search_index
+from job_dedup import ensure_job_dedup_schema
 
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        ensure_job_dedup_schema(db)
+        ensure_job_search_index(db)
         print('Database created (if not existing).')
@@ -0,0 +1,255 @@
+"""
+Saved-search job alerts.
+Alerts are kept in an in-memory inverted index. Each criterion an alert sets
+is a posting under its key:
+- a tag, matched against the words and two-word phrases of a job's title and
+  description
+- a location, matched against the whole job location or one of its
+  comma-separated parts
+- a remote_type, compared after normalize_remote_type() (imported jobs say
+  'fully_remote' and 'on_site' where backend.sql says 'remote' and 'on-site')
+A job's keys are looked up in that index, and an alert matches once it has hit
+on every criterion it sets (any one of its tags is enough). Matching a batch of
+jobs therefore costs one pass over the jobs, independent of how many alerts
+exist. Alerts that set no criteria never match.
+
+bulk_import_jobs() matches the postings it adds (not refreshed ones) in the
+import transaction. It writes one job_alert_digests row per candidate and
+sets last_sent on the alerts that fired. The index is rebuilt after alerts
+change in this process, and at least every JOB_ALERT_INDEX_TTL seconds to pick
+up changes made by other processes.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+from models_fixed import db, JobAlert, JobAlertDigest
+
+JOB_ALERT_INDEX_TTL = float(os.getenv('JOB_ALERT_INDEX_TTL', '60'))
+# Job IDs listed in one digest (job_count has the full number)
+JOB_ALERT_DIGEST_MAX_JOBS = int(os.getenv('JOB_ALERT_DIGEST_MAX_JOBS', '50'))
+REMOTE_TYPES = ('remote', 'hybrid', 'on-site')
+# Spellings used by the scraper, the job form and backend.sql, keyed without separators
+_REMOTE_TYPE_ALIASES = {
+    'remote': 'remote', 'fullyremote': 'remote',
+    'hybrid': 'hybrid',
+    'onsite': 'on-site', 'inoffice': 'on-site', 'office': 'on-site'
+}
+
+_CHANGED_KEY = 'job_alerts_changed'
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#.]*')
+
+
+def _tokens(text: Optional[str]) -> List[str]:
+    # Keep 'c++', 'c#' and 'node.js' whole, but not a sentence's final period
+    return [t.rstrip('.') for t in _TOKEN_RE.findall((text or '').lower())]
+
+
+def normalize_tag(tag: str) -> str:
+    return ' '.join(_tokens(tag))
+
+
+def normalize_location(location: Optional[str]) -> str:
+    return ' '.join((location or '').lower().split())
+
+
+def normalize_remote_type(remote_type: Optional[str]) -> Optional[str]:
+    """One of REMOTE_TYPES for any known spelling ('fully_remote', 'On-site', ...), else None"""
+    key = re.sub(r'[\s_-]+', '', (remote_type or '').lower())
+    return _REMOTE_TYPE_ALIASES.get(key)
+
+
+def _location_keys(location: Optional[str]) -> Set[str]:
+    whole = normalize_location(location)
+    if not whole:
+        return set()
+    return {whole} | {part for part in (normalize_location(p) for p in whole.split(',')) if part}
+
+
+class AlertIndex:
+    """Inverted index of alerts by tag, location and remote_type"""
+
+    TAG, LOCATION, REMOTE_TYPE = 1, 2, 4
+
+    def __init__(self, alerts: Iterable[JobAlert] = ()):
+        # key -> alert IDs, one dict per criterion
+        self.tags: Dict[str, List[int]] = defaultdict(list)
+        self.locations: Dict[str, List[int]] = defaultdict(list)
+        self.remote_types: Dict[str, List[int]] = defaultdict(list)
+        # Tags of 3+ words, posted under their first two: key -> [(alert_id, phrase)]
+        self.phrases: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+        # alert_id -> bitmask of the criteria it sets
+        self.required: Dict[int, int] = {}
+        self.candidates: Dict[int, int] = {}
+        for alert in alerts:
+            self.add(alert.alert_id, alert.candidate_id, alert.job_tags, alert.location, alert.remote_type)
+
+    def __len__(self) -> int:
+        return len(self.required)
+
+    def add(self, alert_id: int, candidate_id: int, tags: Optional[List[str]],
+            location: Optional[str], remote_type: Optional[str]) -> None:
+        required = 0
+        tags = [t for t in (normalize_tag(str(tag)) for tag in (tags or [])) if t]
+        for tag in tags:
+            words = tag.split(' ')
+            if len(words) > 2:
+                self.phrases[' '.join(words[:2])].append((alert_id, tag))
+            else:
+                self.tags[tag].append(alert_id)
+            required |= self.TAG
+        if normalize_location(location):
+            self.locations[normalize_location(location)].append(alert_id)
+            required |= self.LOCATION
+        if remote_type:
+            # Unknown spellings still become a criterion, one no job satisfies
+            self.remote_types[normalize_remote_type(remote_type) or remote_type].append(alert_id)
+            required |= self.REMOTE_TYPE
+        if required and candidate_id is not None:
+            self.required[alert_id] = required
+            self.candidates[alert_id] = candidate_id
+
+    def match(self, job: Dict) -> List[int]:
+        """IDs of the alerts a job dict (title, description, location, remote_type) satisfies"""
+        words = _tokens(f"{job.get('title') or ''}\n{job.get('description') or ''}")
+        terms = set(words)
+        terms.update(f'{a} {b}' for a, b in zip(words, words[1:]))
+
+        hits: Dict[int, int] = {}
+        get = hits.get
+        for term in terms:
+            for alert_id in self.tags.get(term, ()):
+                hits[alert_id] = get(alert_id, 0) | self.TAG
+        if self.phrases:
+            text = f" {' '.join(words)} "
+            for term in terms:
+                for alert_id, phrase in self.phrases.get(term, ()):
+                    if f' {phrase} ' in text:
+                        hits[alert_id] = get(alert_id, 0) | self.TAG
+        for key in _location_keys(job.get('location')):
+            for alert_id in self.locations.get(key, ()):
+                hits[alert_id] = get(alert_id, 0) | self.LOCATION
+        remote_type = normalize_remote_type(job.get('remote_type'))
+        if remote_type:
+            for alert_id in self.remote_types.get(remote_type, ()):
+                hits[alert_id] = get(alert_id, 0) | self.REMOTE_TYPE
+        required = self.required
+        return [alert_id for alert_id, found in hits.items() if found == required[alert_id]]
+
+
+class AlertIndexCache:
+    """Process-wide AlertIndex, rebuilt when stale"""
+
+    def __init__(self, ttl: float = JOB_ALERT_INDEX_TTL):
+        self.ttl = ttl
+        self._index: Optional[AlertIndex] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> AlertIndex:
+        """The current index (needs an app context when it has to be rebuilt)"""
+        index = self._index
+        if index is not None and time.monotonic() - self._built_at < self.ttl:
+            return index
+        with self._lock:
+            if self._index is None or time.monotonic() - self._built_at >= self.ttl:
+                built_at = time.monotonic()
+                self._index = AlertIndex(db.session.execute(
+                    select(JobAlert.alert_id, JobAlert.candidate_id, JobAlert.job_tags,
+                           JobAlert.location, JobAlert.remote_type)
+                ))
+                self._built_at = built_at
+            return self._index
+
+    def invalidate(self) -> None:
+        self._index = None
+
+
+alert_index = AlertIndexCache()
+
+
+class AlertBatch:
+    """Alert matches collected over one import, written out as per-candidate digests"""
+
+    def __init__(self, index: Optional[AlertIndex] = None):
+        self.index = index if index is not None else alert_index.get()
+        # candidate_id -> (alert IDs, job IDs in match order)
+        self._matches: Dict[int, Tuple[Set[int], List[int]]] = {}
+
+    def __bool__(self) -> bool:
+        return len(self.index) > 0
+
+    def add_jobs(self, jobs: Iterable[Dict]) -> None:
+        """Match newly added job dicts (with job_id) against the index"""
+        for job in jobs:
+            matched: Set[int] = set()
+            for alert_id in self.index.match(job):
+                candidate_id = self.index.candidates[alert_id]
+                alert_ids, job_ids = self._matches.setdefault(candidate_id, (set(), []))
+                alert_ids.add(alert_id)
+                if candidate_id not in matched:
+                    matched.add(candidate_id)
+                    job_ids.append(job['job_id'])
+
+    def finish(self) -> int:
+        """
+        Write the digests and stamp last_sent on the alerts that fired (caller commits)
+
+        Returns:
+            Number of digests written
+        """
+        if not self._matches:
+            return 0
+        now = datetime.utcnow()
+        db.session.execute(insert(JobAlertDigest.__table__), [
+            {
+                'candidate_id': candidate_id,
+                'alert_ids': json.dumps(sorted(alert_ids)),
+                'job_ids': json.dumps(job_ids[:JOB_ALERT_DIGEST_MAX_JOBS]),
+                'job_count': len(job_ids),
+                'created_at': now
+            }
+            for candidate_id, (alert_ids, job_ids) in sorted(self._matches.items())
+        ])
+        fired = sorted(set().union(*(alert_ids for alert_ids, _ in self._matches.values())))
+        db.session.execute(update(JobAlert).where(JobAlert.alert_id.in_(fired)).values(last_sent=now))
+        digests = len(self._matches)
+        self._matches = {}
+        return digests
+
+
+def validate_alert(data: Dict) -> Optional[str]:
+    """Error message for an invalid alert request body, or None"""
+    tags = data.get('job_tags')
+    if tags is not None and (not isinstance(tags, list) or not all(isinstance(t, str) for t in tags)):
+        return 'job_tags must be a list of strings'
+    remote_type = data.get('remote_type')
+    if remote_type is not None and (not isinstance(remote_type, str) or normalize_remote_type(remote_type) is None):
+        return f'remote_type must be one of {", ".join(REMOTE_TYPES)}'
+    if not (tags or data.get('location') or remote_type):
+        return 'Set at least one of job_tags, location or remote_type'
+    return None
+
+
+@event.listens_for(Session, 'before_flush')
+def _note_alert_changes(session, flush_context, instances) -> None:
+    if any(isinstance(obj, JobAlert) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_index(session) -> None:
+    if session.info.pop(_CHANGED_KEY, False):
+        alert_index.invalidate()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_alert_changes(session, previous_transaction) -> None:
+    session.info.pop(_CHANGED_KEY, None)
@@ -0,0 +1,131 @@
+"""
+Deduplication for imported jobs.
+Every imported job gets a stable fingerprint (source URL + normalized title +
+normalized location) backed by a unique index, so re-scraping a page or
+re-polling a crawl updates the existing row instead of inserting a copy.
+A 64-bit SimHash of the description supports optional near-duplicate
+detection across boards (same title, nearly identical text).
+"""
+
+import hashlib
+import re
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import inspect, select, text
+from scrape_cache import normalize_url
+
+# Hamming distance at or below which two descriptions count as near-duplicates.
+# Descriptions are short (<= 500 chars), so a single edited word already flips
+# several bits; unrelated texts sit around 32.
+NEAR_DUPLICATE_DISTANCE = 10
+
+_WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+_SPACE_PATTERN = re.compile(r'\s+')
+
+# Columns added to jobs after the original schema, for databases created before them
+_DEDUP_COLUMNS = [
+    ('source_url', 'VARCHAR'),
+    ('fingerprint', 'VARCHAR'),
+    ('title_key', 'VARCHAR'),
+    ('simhash', 'BIGINT'),
+]
+_DEDUP_INDEXES = [
+    'CREATE UNIQUE INDEX IF NOT EXISTS uq_jobs_fingerprint ON jobs (fingerprint)',
+    'CREATE INDEX IF NOT EXISTS ix_jobs_title_key ON jobs (title_key)',
+]
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    words = _WORD_PATTERN.findall((value or '').lower())
+    return _SPACE_PATTERN.sub(' ', ' '.join(words)).strip()
+
+
+def job_fingerprint(source_url: Optional[str], title: Optional[str], location: Optional[str]) -> str:
+    """Stable identity of an imported posting"""
+    url = normalize_url(source_url) if source_url else ''
+    key = '\x1f'.join((url, normalize_text(title), normalize_text(location)))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def simhash(value: Optional[str], bits: int = 64) -> int:
+    """
+    64-bit SimHash over word bigrams, returned as a signed integer so it fits a
+    BIGINT column
+    """
+    words = _WORD_PATTERN.findall((value or '').lower())
+    shingles = [' '.join(words[i:i + 2]) for i in range(max(1, len(words) - 1))] if words else []
+    if not shingles:
+        return 0
+    weights = [0] * bits
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for i in range(bits):
+            weights[i] += 1 if (h >> i) & 1 else -1
+    value = 0
+    for i in range(bits):
+        if weights[i] > 0:
+            value |= 1 << i
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count('1')
+
+
+def dedup_fields(job_data: Dict) -> Dict:
+    """Dedup columns for one parsed job"""
+    return {
+        'source_url': job_data.get('source_url'),
+        'fingerprint': job_fingerprint(job_data.get('source_url'), job_data.get('title'), job_data.get('location')),
+        'title_key': normalize_text(job_data.get('title'))[:200],
+        'simhash': simhash(job_data.get('description'))
+    }
+
+
+def find_near_duplicates(conn_or_session, job_table, rows: List[Dict],
+                         max_distance: int = NEAR_DUPLICATE_DISTANCE) -> set:
+    """
+    Return the fingerprints of rows that nearly duplicate an existing job
+
+    Candidates are limited to existing jobs with the same normalized title
+    (indexed), so the check costs one query per chunk.
+    """
+    title_keys = {r['title_key'] for r in rows if r.get('title_key')}
+    if not title_keys:
+        return set()
+    existing: Dict[str, List[int]] = {}
+    for title_key, value in conn_or_session.execute(
+        select(job_table.c.title_key, job_table.c.simhash)
+        .where(job_table.c.title_key.in_(title_keys), job_table.c.simhash.isnot(None))
+    ):
+        existing.setdefault(title_key, []).append(value)
+
+    duplicates = set()
+    for row in rows:
+        for other in existing.get(row['title_key'], ()):
+            if hamming_distance(row['simhash'], other) <= max_distance:
+                duplicates.add(row['fingerprint'])
+                break
+    return duplicates
+
+
+def dedupe_rows(rows: Iterable[Dict]) -> List[Dict]:
+    """Drop rows repeating a fingerprint already seen in the same batch (last one wins)"""
+    by_fingerprint: Dict[str, Dict] = {}
+    for row in rows:
+        by_fingerprint[row['fingerprint']] = row
+    return list(by_fingerprint.values())
+
+
+def ensure_job_dedup_schema(db) -> None:
+    """
+    Add the dedup columns and indexes to a jobs table created before they existed.
+    Safe to call on every startup.
+    """
+    existing = {c['name'] for c in inspect(db.engine).get_columns('jobs')}
+    with db.engine.begin() as conn:
+        for name, ddl_type in _DEDUP_COLUMNS:
+            if name not in existing:
+                conn.execute(text(f'ALTER TABLE jobs ADD COLUMN {name} {ddl_type}'))
+        for ddl in _DEDUP_INDEXES:
+            conn.execute(text(ddl))
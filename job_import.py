@@ -0,0 +1,182 @@
+"""
+Bulk import of scraped job listings.
+Parsed JobParser output is inserted in chunks with a single executemany per
+chunk (with RETURNING where the database supports it) instead of one ORM
+object, add() and flush() per job. Only one chunk of rows is held at a time,
+so memory stays bounded however large the crawl is.
+
+Imports are upserts keyed on the job fingerprint (see job_dedup.py): a posting
+seen before is refreshed in place rather than inserted again. Newly added
+postings are matched against saved job alerts (job_alerts.py) in the same
+transaction.
+"""
+
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import func, insert, select
+from models_fixed import db, Job
+from job_dedup import dedup_fields, dedupe_rows, find_near_duplicates
+from job_alerts import AlertBatch
+
+IMPORT_CHUNK_SIZE = int(os.getenv('JOB_IMPORT_CHUNK_SIZE', '500'))
+# Skip postings that nearly duplicate an existing job with the same title
+SKIP_NEAR_DUPLICATES = os.getenv('JOB_IMPORT_SKIP_NEAR_DUPLICATES', 'false').lower() == 'true'
+
+# Columns refreshed when an already-imported posting is seen again
+_UPSERT_UPDATE_COLUMNS = ('description', 'remote_type', 'simhash', 'is_active', 'updated_at')
+
+
+def job_row(job_data: Dict, employer_id=1) -> Dict:
+    """Map one parsed job dict to a jobs table row"""
+    now = datetime.utcnow()
+    row = {
+        'employer_id': employer_id,
+        'title': job_data.get('title'),
+        'description': job_data.get('description'),
+        'location': job_data.get('location', 'Remote'),
+        'remote_type': job_data.get('remote_type', 'hybrid'),
+        'is_active': True,
+        'created_at': now,
+        'updated_at': now
+    }
+    row.update(dedup_fields(dict(job_data, location=row['location'])))
+    return row
+
+
+def jobs_present(parsed_jobs: List[Dict], employer_id=1) -> bool:
+    """True if every parsed job is in the jobs table under the employer"""
+    fingerprints = {job_row(job_data, employer_id)['fingerprint'] for job_data in parsed_jobs}
+    table = Job.__table__
+    found = 0
+    for chunk in _chunks(fingerprints, IMPORT_CHUNK_SIZE):
+        found += db.session.execute(
+            select(func.count()).select_from(table)
+            .where(table.c.fingerprint.in_(chunk), table.c.employer_id == employer_id)
+        ).scalar()
+    return found == len(fingerprints)
+
+
+def _supports_bulk_returning() -> bool:
+    """True if executemany INSERT ... RETURNING is available (SQLAlchemy 2.x)"""
+    dialect = db.session.get_bind().dialect
+    return bool(getattr(dialect, 'use_insertmanyvalues', False) and
+                getattr(dialect, 'insert_executemany_returning', False))
+
+
+def _upsert_statement():
+    """INSERT ... ON CONFLICT (fingerprint) DO UPDATE, or None if the dialect has no upsert"""
+    table = Job.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.fingerprint],
+        set_={name: stmt.excluded[name] for name in _UPSERT_UPDATE_COLUMNS}
+    )
+
+
+def _chunks(items: Iterable, size: int) -> Iterable[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bulk_import_jobs(parsed_jobs: Iterable[Dict], employer_id=1,
+                     chunk_size: int = IMPORT_CHUNK_SIZE,
+                     collect_jobs: bool = False,
+                     skip_near_duplicates: Optional[bool] = None) -> Dict:
+    """
+    Upsert parsed jobs in chunks within the current transaction
+
+    The caller commits (or rolls back), so imports can share a transaction
+    with other bookkeeping such as a crawl task's status.
+
+    Args:
+        parsed_jobs: Iterable of JobParser job dicts (may be a generator)
+        employer_id: Employer to attach new jobs to
+        chunk_size: Rows per executemany
+        collect_jobs: Also return the imported jobs as to_dict()-style dicts
+        skip_near_duplicates: Skip new postings whose description nearly
+            matches an existing job with the same title (defaults to
+            JOB_IMPORT_SKIP_NEAR_DUPLICATES)
+
+    Returns:
+        {'jobs_added', 'jobs_updated', 'duplicates_skipped', 'alert_digests',
+         'jobs' (only when collect_jobs is set)}
+    """
+    if skip_near_duplicates is None:
+        skip_near_duplicates = SKIP_NEAR_DUPLICATES
+    table = Job.__table__
+    upsert = _upsert_statement()
+    alerts = AlertBatch()
+    returning = (collect_jobs or bool(alerts)) and _supports_bulk_returning()
+    added = updated = skipped = 0
+    jobs: List[Dict] = []
+
+    for chunk in _chunks(parsed_jobs, chunk_size):
+        rows = dedupe_rows(job_row(job_data, employer_id) for job_data in chunk)
+        skipped += len(chunk) - len(rows)
+        fingerprints = [r['fingerprint'] for r in rows]
+        existing = set(db.session.execute(
+            select(table.c.fingerprint).where(table.c.fingerprint.in_(fingerprints))
+        ).scalars())
+
+        if skip_near_duplicates:
+            near = find_near_duplicates(db.session, table, [r for r in rows if r['fingerprint'] not in existing])
+            rows = [r for r in rows if r['fingerprint'] not in near]
+            skipped += len(near)
+
+        if upsert is None:
+            # No upsert on this backend: insert only postings not seen before
+            rows = [r for r in rows if r['fingerprint'] not in existing]
+            updated_here = 0
+        else:
+            updated_here = sum(1 for r in rows if r['fingerprint'] in existing)
+        if not rows:
+            continue
+
+        stmt = upsert if upsert is not None else insert(table)
+        if returning:
+            result = db.session.execute(stmt.returning(table.c.job_id, table.c.fingerprint), rows)
+            ids = dict((fp, job_id) for job_id, fp in result)
+        else:
+            db.session.execute(stmt, rows)
+            ids = None
+            if collect_jobs or alerts:
+                ids = dict((fp, job_id) for job_id, fp in db.session.execute(
+                    select(table.c.job_id, table.c.fingerprint)
+                    .where(table.c.fingerprint.in_([r['fingerprint'] for r in rows]))
+                ))
+
+        if collect_jobs:
+            jobs.extend(
+                {
+                    'job_id': ids.get(row['fingerprint']),
+                    'title': row['title'],
+                    'description': row['description'],
+                    'location': row['location'],
+                    'is_active': row['is_active']
+                }
+                for row in rows
+            )
+        if alerts:
+            alerts.add_jobs(dict(row, job_id=ids.get(row['fingerprint'])) for row in rows
+                            if row['fingerprint'] not in existing and ids.get(row['fingerprint']) is not None)
+        updated += updated_here
+        added += len(rows) - updated_here
+
+    result: Dict = {'jobs_added': added, 'jobs_updated': updated, 'duplicates_skipped': skipped,
+                    'alert_digests': alerts.finish()}
+    if collect_jobs:
+        result['jobs'] = jobs
+    return result
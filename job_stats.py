@@ -0,0 +1,219 @@
+"""
+Write-behind recording of job views and applications.
+Request handlers only append to an in-memory buffer, so a job page view never
+waits on an INSERT. A background worker flushes the buffer once
+JOB_STATS_FLUSH_SIZE events have accumulated or every JOB_STATS_FLUSH_INTERVAL
+seconds. Each flush writes the buffered job_views rows with one executemany.
+The per-job increments are merged first, so a flush applies at most one
+job_applications_stats upsert per job. Listings read the counters from that
+table rather than COUNT(*) over views and applications.
+
+The buffer is per process. Events still buffered when a process is killed
+are lost, and `flask job-stats-rebuild` recounts the table from job_views and
+applications.
+"""
+
+import atexit
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, func, insert, select, update
+from models_fixed import db, Application, Job, JobApplicationStats, JobView, User
+from background import BackgroundWorker
+
+# Buffered events that trigger a flush before the interval is up
+JOB_STATS_FLUSH_SIZE = int(os.getenv('JOB_STATS_FLUSH_SIZE', '500'))
+JOB_STATS_FLUSH_INTERVAL = float(os.getenv('JOB_STATS_FLUSH_INTERVAL', '5'))
+# View rows kept while the database is unavailable; counters are always kept
+JOB_STATS_MAX_BUFFER = int(os.getenv('JOB_STATS_MAX_BUFFER', '50000'))
+
+
+def _stats_upsert():
+    """INSERT ... ON CONFLICT (job_id) DO UPDATE adding the increments, or None if the dialect has no upsert"""
+    table = JobApplicationStats.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.job_id],
+        set_={
+            'total_views': func.coalesce(table.c.total_views, 0) + stmt.excluded.total_views,
+            'total_applications': func.coalesce(table.c.total_applications, 0) + stmt.excluded.total_applications
+        }
+    )
+
+
+def _apply_increments(rows: List[Dict]) -> None:
+    """Add {'job_id', 'total_views', 'total_applications'} increments to job_applications_stats"""
+    upsert = _stats_upsert()
+    if upsert is not None:
+        db.session.execute(upsert, rows)
+        return
+    # No upsert: update the existing counters and insert the rest
+    table = JobApplicationStats.__table__
+    existing = set(db.session.scalars(
+        select(table.c.job_id).where(table.c.job_id.in_([r['job_id'] for r in rows]))
+    ))
+    updates = [r for r in rows if r['job_id'] in existing]
+    if updates:
+        db.session.execute(
+            update(table).where(table.c.job_id == bindparam('b_job_id')).values(
+                total_views=func.coalesce(table.c.total_views, 0) + bindparam('b_views'),
+                total_applications=func.coalesce(table.c.total_applications, 0) + bindparam('b_applications')
+            ),
+            [{'b_job_id': r['job_id'], 'b_views': r['total_views'], 'b_applications': r['total_applications']}
+             for r in updates]
+        )
+    inserts = [r for r in rows if r['job_id'] not in existing]
+    if inserts:
+        db.session.execute(insert(table), inserts)
+
+
+class JobStatsRecorder(BackgroundWorker):
+    """Event buffer plus the worker that flushes it"""
+
+    name = 'job-stats'
+    idle_sleep = JOB_STATS_FLUSH_INTERVAL
+    # Every process flushes its own buffer; the counter upserts are additive
+    singleton = False
+
+    def __init__(self, app=None, flush_size: int = JOB_STATS_FLUSH_SIZE):
+        super().__init__(app)
+        self.flush_size = flush_size
+        self._buffer_lock = threading.Lock()
+        self._views: List[Dict] = []
+        # job_id -> [views, applications]
+        self._counts: Dict[int, List[int]] = {}
+        self._events = 0
+        self._exit_flush_registered = False
+
+    def ensure_started(self, app=None) -> None:
+        super().ensure_started(app)
+        if not self._exit_flush_registered:
+            self._exit_flush_registered = True
+            atexit.register(self._flush_at_exit)
+
+    def _add(self, job_id: int, views: int, applications: int) -> None:
+        counts = self._counts.get(job_id)
+        if counts is None:
+            counts = self._counts[job_id] = [0, 0]
+        counts[0] += views
+        counts[1] += applications
+
+    def _record(self, job_id: int, view: Optional[Dict], applications: int) -> None:
+        with self._buffer_lock:
+            if view is not None and len(self._views) < JOB_STATS_MAX_BUFFER:
+                self._views.append(view)
+            self._add(job_id, 1 if view is not None else 0, applications)
+            self._events += 1
+            full = self._events >= self.flush_size
+        if full:
+            self.wake()
+
+    def record_view(self, job_id: int, viewer_id: Optional[int] = None) -> None:
+        """Buffer one view of a job"""
+        self._record(job_id, {'job_id': job_id, 'viewer_id': viewer_id, 'viewed_at': datetime.utcnow()}, 0)
+
+    def record_application(self, job_id: Optional[int]) -> None:
+        """Buffer one new application to a job (call after it is committed)"""
+        if job_id is not None:
+            self._record(job_id, None, 1)
+
+    def pending(self) -> int:
+        """Events buffered since the last flush"""
+        with self._buffer_lock:
+            return self._events
+
+    def flush(self) -> int:
+        """
+        Write the buffered events in one transaction (needs an app context)
+
+        On failure the events go back into the buffer for the next flush.
+
+        Returns:
+            Number of events written
+        """
+        with self._buffer_lock:
+            views, counts, events = self._views, self._counts, self._events
+            self._views, self._counts, self._events = [], {}, 0
+        if not events:
+            return 0
+        try:
+            # Unknown jobs and viewers would fail the foreign keys (and every retry)
+            known = set(db.session.scalars(select(Job.job_id).where(Job.job_id.in_(list(counts)))))
+            if views:
+                rows = [v for v in views if v['job_id'] in known]
+                viewer_ids = {v['viewer_id'] for v in rows if v['viewer_id'] is not None}
+                if viewer_ids:
+                    users = set(db.session.scalars(select(User.user_id).where(User.user_id.in_(viewer_ids))))
+                    rows = [v if v['viewer_id'] in users or v['viewer_id'] is None else dict(v, viewer_id=None)
+                            for v in rows]
+                if rows:
+                    db.session.execute(insert(JobView.__table__), rows)
+            increments = [
+                {'job_id': job_id, 'total_views': v, 'total_applications': a}
+                for job_id, (v, a) in sorted(counts.items()) if job_id in known
+            ]
+            if increments:
+                _apply_increments(increments)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with self._buffer_lock:
+                self._views[:0] = views[:max(0, JOB_STATS_MAX_BUFFER - len(self._views))]
+                for job_id, (v, a) in counts.items():
+                    self._add(job_id, v, a)
+                self._events += events
+            raise
+        return events
+
+    def run_once(self) -> bool:
+        self.flush()
+        # Keep going without sleeping while a burst is still filling the buffer
+        return self.pending() >= self.flush_size
+
+    def _flush_at_exit(self) -> None:
+        if self.app is None or not self.pending():
+            return
+        try:
+            with self.app.app_context():
+                try:
+                    self.flush()
+                finally:
+                    db.session.remove()
+        except Exception:
+            pass
+
+
+# Process-wide recorder used by the job and application routes
+job_stats = JobStatsRecorder()
+
+
+def rebuild_stats() -> int:
+    """Recount job_applications_stats from job_views and applications"""
+    views = dict(db.session.execute(select(JobView.job_id, func.count()).where(JobView.job_id.isnot(None))
+                                    .group_by(JobView.job_id)).all())
+    applications = dict(db.session.execute(select(Application.job_id, func.count())
+                                           .where(Application.job_id.isnot(None))
+                                           .group_by(Application.job_id)).all())
+    known = set(db.session.scalars(select(Job.job_id)))
+    rows = [
+        {'job_id': job_id, 'total_views': views.get(job_id, 0), 'total_applications': applications.get(job_id, 0)}
+        for job_id in sorted((set(views) | set(applications)) & known)
+    ]
+    db.session.execute(JobApplicationStats.__table__.delete())
+    if rows:
+        db.session.execute(insert(JobApplicationStats.__table__), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def stats_dict(job: Job) -> Dict:
+    """A job's stored counters (zero until its first flush)"""
+    return job.stats.to_dict() if job.stats is not None else {'total_applications': 0, 'total_views': 0}
@@ -0,0 +1,261 @@
+"""
+Request, SQL and Firecrawl instrumentation with a Prometheus text endpoint.
+Per-route latency histograms come from Flask request hooks. SQL statement
+counts and time come from SQLAlchemy cursor events, attributed to the request
+running on the current thread. Firecrawl calls are timed by observe_firecrawl()
+around the sync and async clients. Each response carries a Server-Timing
+header with its SQL totals, so N+1 patterns show up in browser dev tools too.
+
+Setting PROFILE_REQUESTS enables opt-in profiling. A request sent with the
+X-Profile header runs under cProfile and is dumped to PROFILE_DIR, or returned
+as text when the header is "text". If PROFILE_TOKEN is set, the header value
+must match it.
+
+Metrics are kept per process. Under gunicorn, each worker exposes its own
+figures and a /metrics scrape reaches whichever worker accepts it, so every
+sample carries a worker label (the process ID). Counters then stay monotonic per
+series, and sum(rate(...)) across the worker label gives the server's totals.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from flask import Response, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROFILE_REQUESTS = os.getenv('PROFILE_REQUESTS', '').lower() in ('1', 'true', 'yes')
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles'))
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self, const: Sequence[Tuple[str, str]] = ()) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f'{self.name}{_format_labels(list(zip(self.labelnames, key)) + list(const))} {value}'
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self, const: Sequence[Tuple[str, str]] = ()) -> Iterator[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in values:
+            labels = list(zip(self.labelnames, key)) + list(const)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                le = bound if bound == '+Inf' else repr(float(bound))
+                yield f'{self.name}_bucket{_format_labels(labels + [("le", le)])} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(labels)} {total}'
+            yield f'{self.name}_count{_format_labels(labels)} {cumulative}'
+
+
+REGISTRY: List = []
+
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Request latency by route',
+                            ('method', 'route', 'status'))
+REQUEST_SQL_QUERIES = Histogram('http_request_sql_queries', 'SQL statements executed per request',
+                                ('method', 'route'), COUNT_BUCKETS)
+REQUEST_SQL_SECONDS = Histogram('http_request_sql_seconds', 'Time spent in SQL per request',
+                                ('method', 'route'))
+SQL_SECONDS = Histogram('db_query_duration_seconds', 'SQL statement latency (requests and background workers)',
+                        ('statement',))
+FIRECRAWL_SECONDS = Histogram('firecrawl_request_duration_seconds', 'Firecrawl API call latency, retries included',
+                              ('operation', 'client', 'outcome'))
+FIRECRAWL_ERRORS = Counter('firecrawl_errors_total', 'Failed Firecrawl API calls by error',
+                           ('operation', 'client', 'error'))
+
+# SQL totals of the request running in this context: [statements, seconds]
+_request_sql: ContextVar[Optional[list]] = ContextVar('request_sql', default=None)
+_STATEMENT_RE = re.compile(r'\s*(\w+)')
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    # Read per call: gunicorn forks the workers after this module is imported
+    const = (('worker', str(os.getpid())),)
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.samples(const))
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_response() -> Response:
+    return Response(render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+# Start times live on the execution context (a single connection slot without
+# one), so statements that raise before after_cursor_execute leave nothing behind
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+    else:
+        conn.info['metrics_start'] = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _end_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        start = getattr(context, '_metrics_start', None)
+    else:
+        start = conn.info.pop('metrics_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    match = _STATEMENT_RE.match(statement)
+    SQL_SECONDS.observe(elapsed, statement=match.group(1).upper() if match else 'OTHER')
+    totals = _request_sql.get()
+    if totals is not None:
+        totals[0] += 1
+        totals[1] += elapsed
+
+
+@contextmanager
+def observe_firecrawl(operation: str, client: str = 'sync'):
+    """Time a Firecrawl API call; exceptions are counted as errors and re-raised"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        status = getattr(getattr(e, 'response', None), 'status_code', None)
+        FIRECRAWL_SECONDS.observe(time.perf_counter() - start, operation=operation, client=client, outcome='error')
+        FIRECRAWL_ERRORS.inc(operation=operation, client=client, error=f'http_{status}' if status else type(e).__name__)
+        raise
+    FIRECRAWL_SECONDS.observe(time.perf_counter() - start, operation=operation, client=client, outcome='ok')
+
+
+def _route() -> str:
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def _profile_requested() -> bool:
+    header = request.headers.get('X-Profile')
+    if not PROFILE_REQUESTS or not header:
+        return False
+    return not PROFILE_TOKEN or header in (PROFILE_TOKEN, f'text:{PROFILE_TOKEN}')
+
+
+def _before_request() -> None:
+    g.metrics_start = time.perf_counter()
+    g.metrics_sql = [0, 0.0]
+    g.metrics_sql_token = _request_sql.set(g.metrics_sql)
+    if _profile_requested():
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+
+def _after_request(response: Response) -> Response:
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    statements, sql_seconds = g.metrics_sql
+    route = _route()
+    REQUEST_SECONDS.observe(elapsed, method=request.method, route=route, status=response.status_code)
+    REQUEST_SQL_QUERIES.observe(statements, method=request.method, route=route)
+    REQUEST_SQL_SECONDS.observe(sql_seconds, method=request.method, route=route)
+    response.headers['Server-Timing'] = (
+        f'db;dur={sql_seconds * 1000:.1f};desc="{statements} queries", app;dur={elapsed * 1000:.1f}'
+    )
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        response = _profile_output(profiler, response, route)
+    return response
+
+
+def _profile_output(profiler: cProfile.Profile, response: Response, route: str) -> Response:
+    """Dump the profile to PROFILE_DIR, or return it as text for X-Profile: text"""
+    if request.headers.get('X-Profile', '').startswith('text'):
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(60)
+        return Response(out.getvalue(), mimetype='text/plain')
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = re.sub(r'[^A-Za-z0-9]+', '_', f'{request.method}{route}').strip('_')
+    path = os.path.join(PROFILE_DIR, f'{time.strftime("%Y%m%d-%H%M%S")}-{name}-{threading.get_ident()}.prof')
+    profiler.dump_stats(path)
+    response.headers['X-Profile-File'] = os.path.basename(path)
+    return response
+
+
+def _teardown_request(exc) -> None:
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+    token = g.pop('metrics_sql_token', None)
+    if token is not None:
+        _request_sql.reset(token)
+
+
+def init_app(app) -> None:
+    """Register the request hooks on a Flask app"""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,60 @@
+"""indexes for list filters
+
+Composite indexes match the list routes' keyset shape (filter column, then
+the primary key they page on), so a filtered page is an index range read with
+no sort. Job.location is not indexed: /api/jobs filters it with a substring
+match (LIKE '%...%'), which a B-tree index cannot serve.
+
+Tables that init_db.py / db.create_all() created after the models declared
+these indexes already have them, so existing indexes are skipped.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 21:15:04.959235
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+ACTIVE_CRAWL_TASKS = "status IN ('pending', 'crawling')"
+
+# (table, index name, columns, partial index predicate per dialect)
+INDEXES = [
+    ('applications', 'ix_applications_candidate_id', ['candidate_id', 'application_id'], None),
+    ('applications', 'ix_applications_job_id', ['job_id', 'application_id'], None),
+    ('pipeline_notes', 'ix_pipeline_notes_application_id', ['application_id', 'note_id'], None),
+    ('jobs', 'ix_jobs_active_salary_min', ['salary_min'],
+     {'sqlite_where': sa.text('is_active = 1'), 'postgresql_where': sa.text('is_active = true')}),
+    ('crawl_tasks', 'ix_crawl_tasks_due', ['next_poll_at'],
+     {'sqlite_where': sa.text(ACTIVE_CRAWL_TASKS), 'postgresql_where': sa.text(ACTIVE_CRAWL_TASKS)}),
+]
+
+
+def _existing_indexes(table):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    for table, name, columns, where in INDEXES:
+        existing = _existing_indexes(table)
+        if existing is None or name in existing:
+            continue
+        op.create_index(name, table, columns, unique=False, **(where or {}))
+
+
+def downgrade():
+    for table, name, columns, where in reversed(INDEXES):
+        existing = _existing_indexes(table)
+        if existing and name in existing:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,81 @@
+"""skill matching tables
+
+Tables from backend.sql used by skill_matching.py. Tables that
+db.create_all() already created are left alone.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 21:17:31.657297
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('ai_job_readiness_scores'):
+        op.create_table('ai_job_readiness_scores',
+        sa.Column('score_id', sa.Integer(), nullable=False),
+        sa.Column('candidate_id', sa.Integer(), nullable=True),
+        sa.Column('job_id', sa.Integer(), nullable=True),
+        sa.Column('readiness_score', sa.Numeric(), nullable=False),
+        sa.Column('recency_score', sa.Numeric(), nullable=True),
+        sa.Column('last_calculated', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['candidate_id'], ['candidates.candidate_id'], ),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.job_id'], ),
+        sa.PrimaryKeyConstraint('score_id')
+        )
+        with op.batch_alter_table('ai_job_readiness_scores', schema=None) as batch_op:
+            batch_op.create_index('ix_readiness_job_score', ['job_id', 'readiness_score'], unique=False)
+            batch_op.create_index('uq_readiness_candidate_job', ['candidate_id', 'job_id'], unique=True)
+
+    if not _has_table('job_required_skills'):
+        op.create_table('job_required_skills',
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('skill_id', sa.Integer(), nullable=False),
+        sa.Column('required_proficiency', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.job_id'], ),
+        sa.ForeignKeyConstraint(['skill_id'], ['skills.skill_id'], ),
+        sa.PrimaryKeyConstraint('job_id', 'skill_id')
+        )
+
+    if not _has_table('ai_skill_match_details'):
+        op.create_table('ai_skill_match_details',
+        sa.Column('detail_id', sa.Integer(), nullable=False),
+        sa.Column('readiness_score_id', sa.Integer(), nullable=True),
+        sa.Column('skill_id', sa.Integer(), nullable=True),
+        sa.Column('match_status', sa.String(), nullable=False),
+        sa.Column('match_percentage', sa.Numeric(), nullable=True),
+        sa.Column('explanation_text', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['readiness_score_id'], ['ai_job_readiness_scores.score_id'], ),
+        sa.ForeignKeyConstraint(['skill_id'], ['skills.skill_id'], ),
+        sa.PrimaryKeyConstraint('detail_id')
+        )
+        with op.batch_alter_table('ai_skill_match_details', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_ai_skill_match_details_readiness_score_id'), ['readiness_score_id'], unique=False)
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('ai_skill_match_details', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ai_skill_match_details_readiness_score_id'))
+
+    op.drop_table('ai_skill_match_details')
+    op.drop_table('job_required_skills')
+    with op.batch_alter_table('ai_job_readiness_scores', schema=None) as batch_op:
+        batch_op.drop_index('uq_readiness_candidate_job')
+        batch_op.drop_index('ix_readiness_job_score')
+
+    op.drop_table('ai_job_readiness_scores')
+    # ### end Alembic commands ###
@@ -0,0 +1,46 @@
+"""jobs listing index
+
+Replaces the partial (salary_min) WHERE is_active index, which the planner
+never chose for /api/jobs: the listing is ordered by job_id with a LIMIT, so
+an ordered table scan beat a salary range read plus a sort. The
+(is_active, job_id, salary_min) index serves the order, the keyset cursor and
+the salary filter at once.
+
+Plain op.create_index/drop_index rather than batch mode, so SQLite does not
+rebuild jobs (and drop the full-text search triggers on it).
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 21:57:11.184796
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def _indexes():
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('jobs')}
+
+
+def upgrade():
+    existing = _indexes()
+    if 'ix_jobs_active_salary_min' in existing:
+        op.drop_index('ix_jobs_active_salary_min', table_name='jobs')
+    if 'ix_jobs_active_listing' not in existing:
+        op.create_index('ix_jobs_active_listing', 'jobs', ['is_active', 'job_id', 'salary_min'], unique=False)
+
+
+def downgrade():
+    existing = _indexes()
+    if 'ix_jobs_active_listing' in existing:
+        op.drop_index('ix_jobs_active_listing', table_name='jobs')
+    if 'ix_jobs_active_salary_min' not in existing:
+        op.create_index('ix_jobs_active_salary_min', 'jobs', ['salary_min'], unique=False,
+                        sqlite_where=sa.text('is_active = 1'), postgresql_where=sa.text('is_active = true'))
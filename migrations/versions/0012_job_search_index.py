@@ -0,0 +1,96 @@
+"""job search index
+
+Full-text index for /api/jobs?keywords= (search_index.py): on SQLite the
+external-content FTS5 table jobs_fts with its sync triggers, backfilled from
+jobs; on Postgres the generated, weighted search_vector column with a GIN
+index. Until now only init_db.py created them, so a database built with
+`flask db upgrade` silently fell back to LIKE scans. Existing objects are
+left alone. An SQLite build without FTS5 keeps the fallback.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17 22:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, description,
+        content='jobs', content_rowid='job_id',
+        tokenize='porter unicode61', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, description)
+        VALUES (new.job_id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description)
+        VALUES ('delete', old.job_id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, description ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description)
+        VALUES ('delete', old.job_id, old.title, old.description);
+        INSERT INTO jobs_fts(rowid, title, description)
+        VALUES (new.job_id, new.title, new.description);
+    END
+    """,
+]
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_jobs_search_vector ON jobs USING GIN (search_vector)",
+]
+
+
+def _sqlite_has_fts5(bind):
+    options = {row[0] for row in bind.exec_driver_sql('PRAGMA compile_options')}
+    return 'ENABLE_FTS5' in options
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        if not _sqlite_has_fts5(bind):
+            return
+        existed = sa.inspect(bind).has_table('jobs_fts')
+        for ddl in SQLITE_DDL:
+            op.execute(ddl)
+        if not existed:
+            op.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+    elif bind.dialect.name == 'postgresql':
+        for ddl in POSTGRES_DDL:
+            op.execute(ddl)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for trigger in ('jobs_fts_ai', 'jobs_fts_ad', 'jobs_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS jobs_fts')
+    elif bind.dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_jobs_search_vector')
+        op.execute('ALTER TABLE jobs DROP COLUMN IF EXISTS search_vector')
@@ -0,0 +1,56 @@
+"""job dedup schema
+
+Dedup columns and the unique fingerprint index bulk_import_jobs() upserts
+against (job_dedup.py). The baseline has them, but a database stamped at 0001
+without running init_db.py (which called ensure_job_dedup_schema) did not,
+and its ON CONFLICT (fingerprint) upserts failed. Missing columns and indexes
+are added; existing ones are left alone.
+
+Plain add_column/create_index rather than batch mode, so SQLite does not
+rebuild jobs (and drop the full-text search triggers on it).
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-17 22:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = [
+    sa.Column('source_url', sa.String(), nullable=True),
+    sa.Column('fingerprint', sa.String(), nullable=True),
+    sa.Column('title_key', sa.String(), nullable=True),
+    sa.Column('simhash', sa.BigInteger(), nullable=True),
+]
+
+# (name, columns, unique)
+INDEXES = [
+    ('uq_jobs_fingerprint', ['fingerprint'], True),
+    ('ix_jobs_title_key', ['title_key'], False),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing = {c['name'] for c in inspector.get_columns('jobs')}
+    for column in COLUMNS:
+        if column.name not in existing:
+            op.add_column('jobs', column)
+    indexes = {i['name'] for i in inspector.get_indexes('jobs')}
+    for name, columns, unique in INDEXES:
+        if name not in indexes:
+            op.create_index(name, 'jobs', columns, unique=unique)
+
+
+def downgrade():
+    # The baseline owns these columns and indexes; nothing to undo
+    pass
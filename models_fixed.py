@@ -1,3 +1,4 @@
+import json
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 
@@ -73,6 +74,18 @@ class CandidateSkill(db.Model):
     skill_id = db.Column(db.Integer, db.ForeignKey('skills.skill_id'), primary_key=True)
     proficiency = db.Column(db.Integer)
 
+    def to_dict(self):
+        return {'candidate_id': self.candidate_id, 'skill_id': self.skill_id, 'proficiency': self.proficiency}
+
+class JobRequiredSkill(db.Model):
+    __tablename__ = 'job_required_skills'
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.job_id'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.skill_id'), primary_key=True)
+    required_proficiency = db.Column(db.Integer, default=50)
+
+    def to_dict(self):
+        return {'job_id': self.job_id, 'skill_id': self.skill_id, 'required_proficiency': self.required_proficiency}
+
 class Job(db.Model):
     __tablename__ = 'jobs'
     job_id = db.Column(db.Integer, primary_key=True)
@@ -86,6 +99,21 @@ class Job(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Dedup for imported postings (see job_dedup.py); NULL for manually posted jobs
+    source_url = db.Column(db.String)
+    fingerprint = db.Column(db.String)
+    title_key = db.Column(db.String)
+    simhash = db.Column(db.BigInteger)
+
+    __table_args__ = (
+        db.Index('uq_jobs_fingerprint', 'fingerprint', unique=True),
+        db.Index('ix_jobs_title_key', 'title_key'),
+        # /api/jobs lists active postings in job_id (keyset) order and may
+        # filter salary_min >= ?. Leading with (is_active, job_id) serves the
+        # sort and the cursor; salary_min is checked inside the index, so rows
+        # below the range are skipped without reading them.
+        db.Index('ix_jobs_active_listing', 'is_active', 'job_id', 'salary_min'),
+    )
 
     def to_dict(self):
         return {
@@ -105,9 +133,42 @@ class Resume(db.Model):
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     parsed_title = db.Column(db.String)
     parsed_summary = db.Column(db.Text)
+    # backend.sql arrays/jsonb, stored as JSON here
+    parsed_skills = db.Column(db.JSON)
+    parsed_experience = db.Column(db.JSON)
+    parsed_education = db.Column(db.JSON)
+    # Uploaded file, relative to RESUME_UPLOAD_DIR (see resume_pipeline.py)
+    storage_path = db.Column(db.String)
+    file_size = db.Column(db.Integer)
+    # NULL (no file) | pending -> parsing -> parsed | failed
+    parse_status = db.Column(db.String)
+    parse_error = db.Column(db.Text)
+    # Lease of the parser working on the resume
+    parse_started_at = db.Column(db.DateTime)
+    parsed_at = db.Column(db.DateTime)
+
+    # The parse worker's pending scan and the status summary
+    __table_args__ = (
+        db.Index('ix_resumes_parse_status', 'parse_status', 'resume_id'),
+    )
 
     def to_dict(self):
-        return {'resume_id': self.resume_id, 'candidate_id': self.candidate_id, 'file_name': self.file_name}
+        return {
+            'resume_id': self.resume_id,
+            'candidate_id': self.candidate_id,
+            'file_name': self.file_name,
+            'file_type': self.file_type,
+            'file_size': self.file_size,
+            'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else None,
+            'parse_status': self.parse_status,
+            'parse_error': self.parse_error,
+            'parsed_at': self.parsed_at.isoformat() if self.parsed_at else None,
+            'parsed_title': self.parsed_title,
+            'parsed_summary': self.parsed_summary,
+            'parsed_skills': self.parsed_skills,
+            'parsed_experience': self.parsed_experience,
+            'parsed_education': self.parsed_education
+        }
 
 class Application(db.Model):
     __tablename__ = 'applications'
@@ -118,6 +179,14 @@ class Application(db.Model):
     applied_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    job = db.relationship('Job', backref='applications')
+
+    # /api/applications?candidate_id= / ?job_id=, paged in application_id order
+    __table_args__ = (
+        db.Index('ix_applications_candidate_id', 'candidate_id', 'application_id'),
+        db.Index('ix_applications_job_id', 'job_id', 'application_id'),
+    )
+
     def to_dict(self):
         return {'application_id': self.application_id, 'candidate_id': self.candidate_id, 'job_id': self.job_id, 'status': self.current_status}
 
@@ -126,6 +195,28 @@ class PipelineStage(db.Model):
     stage_id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String, unique=True, nullable=False)
 
+    def to_dict(self):
+        return {'stage_id': self.stage_id, 'name': self.name}
+
+class ApplicationPipeline(db.Model):
+    """
+    Stage history of an application (backend.sql application_pipeline)
+
+    One row per stage the application has been in; the row with the latest
+    moved_at is its current stage. Re-entering a stage refreshes moved_at.
+    """
+    __tablename__ = 'application_pipeline'
+    application_id = db.Column(db.Integer, db.ForeignKey('applications.application_id'), primary_key=True)
+    stage_id = db.Column(db.Integer, db.ForeignKey('pipeline_stages.stage_id'), primary_key=True)
+    moved_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'application_id': self.application_id,
+            'stage_id': self.stage_id,
+            'moved_at': self.moved_at.isoformat() if self.moved_at else None
+        }
+
 class PipelineNote(db.Model):
     __tablename__ = 'pipeline_notes'
     note_id = db.Column(db.Integer, primary_key=True)
@@ -133,3 +224,229 @@ class PipelineNote(db.Model):
     author_id = db.Column(db.Integer, db.ForeignKey('users.user_id'))
     note_text = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # /api/pipeline/notes?application_id=, paged in note_id order
+    __table_args__ = (
+        db.Index('ix_pipeline_notes_application_id', 'application_id', 'note_id'),
+    )
+
+    def to_dict(self):
+        return {
+            'note_id': self.note_id,
+            'application_id': self.application_id,
+            'author_id': self.author_id,
+            'note_text': self.note_text,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class CrawlTask(db.Model):
+    __tablename__ = 'crawl_tasks'
+    task_id = db.Column(db.Integer, primary_key=True)
+    firecrawl_job_id = db.Column(db.String, unique=True, nullable=False)
+    url = db.Column(db.String)
+    employer_id = db.Column(db.Integer, db.ForeignKey('employers.employer_id'))
+    auto_add = db.Column(db.Boolean, default=False)
+    # pending -> crawling -> importing -> completed | failed
+    status = db.Column(db.String, nullable=False, default='crawling')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_poll_at = db.Column(db.DateTime, default=datetime.utcnow)
+    pages_crawled = db.Column(db.Integer)
+    jobs_found = db.Column(db.Integer)
+    jobs_added = db.Column(db.Integer)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+
+    # The crawl worker's due-task scan; finished tasks are left out of the index
+    __table_args__ = (
+        db.Index('ix_crawl_tasks_due', 'next_poll_at',
+                 sqlite_where=db.text("status IN ('pending', 'crawling')"),
+                 postgresql_where=db.text("status IN ('pending', 'crawling')")),
+    )
+
+    def to_dict(self):
+        return {
+            'task_id': self.task_id,
+            'jobId': self.firecrawl_job_id,
+            'url': self.url,
+            'auto_add': self.auto_add,
+            'status': self.status,
+            'attempts': self.attempts,
+            'pages_crawled': self.pages_crawled,
+            'jobs_found': self.jobs_found,
+            'jobs_added': self.jobs_added,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+class JobReadinessScore(db.Model):
+    __tablename__ = 'ai_job_readiness_scores'
+    score_id = db.Column(db.Integer, primary_key=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.candidate_id'))
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.job_id'))
+    readiness_score = db.Column(db.Numeric, nullable=False)
+    recency_score = db.Column(db.Numeric)
+    last_calculated = db.Column(db.DateTime, default=datetime.utcnow)
+
+    details = db.relationship('SkillMatchDetail', backref='readiness_score',
+                              cascade='all, delete-orphan', order_by='SkillMatchDetail.detail_id')
+
+    # One current score per pair; recomputing replaces it (see skill_matching.py).
+    # The score indexes serve the ranking reads in readiness.py.
+    __table_args__ = (
+        db.Index('uq_readiness_candidate_job', 'candidate_id', 'job_id', unique=True),
+        db.Index('ix_readiness_job_score', 'job_id', 'readiness_score'),
+        db.Index('ix_readiness_candidate_score', 'candidate_id', 'readiness_score'),
+    )
+
+    def to_dict(self):
+        return {
+            'score_id': self.score_id,
+            'candidate_id': self.candidate_id,
+            'job_id': self.job_id,
+            'readiness_score': float(self.readiness_score) if self.readiness_score is not None else None,
+            'recency_score': float(self.recency_score) if self.recency_score is not None else None,
+            'last_calculated': self.last_calculated.isoformat() if self.last_calculated else None
+        }
+
+class SkillMatchDetail(db.Model):
+    __tablename__ = 'ai_skill_match_details'
+    detail_id = db.Column(db.Integer, primary_key=True)
+    readiness_score_id = db.Column(db.Integer, db.ForeignKey('ai_job_readiness_scores.score_id'), index=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.skill_id'))
+    # Matched | Gap | Surplus
+    match_status = db.Column(db.String, nullable=False)
+    match_percentage = db.Column(db.Numeric)
+    explanation_text = db.Column(db.Text)
+
+    def to_dict(self):
+        return {
+            'skill_id': self.skill_id,
+            'match_status': self.match_status,
+            'match_percentage': float(self.match_percentage) if self.match_percentage is not None else None,
+            'explanation_text': self.explanation_text
+        }
+
+class ReadinessDirtyPair(db.Model):
+    """A (candidate, job) pair whose readiness score must be recomputed (see readiness.py)"""
+    __tablename__ = 'readiness_dirty_pairs'
+    candidate_id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, primary_key=True)
+    marked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class JobEmbedding(db.Model):
+    """Semantic vector of a job's title and description (see semantic_index.py)"""
+    __tablename__ = 'job_embeddings'
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.job_id'), primary_key=True)
+    # float32 array, L2-normalized
+    vector = db.Column(db.LargeBinary, nullable=False)
+    model_version = db.Column(db.Integer, nullable=False)
+    indexed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class JobEmbeddingBucket(db.Model):
+    """LSH bucket membership of a job embedding, one row per hash table"""
+    __tablename__ = 'job_embedding_buckets'
+    table_no = db.Column(db.Integer, primary_key=True)
+    bucket = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.job_id'), primary_key=True, index=True)
+
+class JobView(db.Model):
+    """One view of a job's detail page (backend.sql job_views), written in batches by job_stats.py"""
+    __tablename__ = 'job_views'
+    view_id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.job_id'), index=True)
+    viewer_id = db.Column(db.Integer, db.ForeignKey('users.user_id'))
+    viewed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class JobApplicationStats(db.Model):
+    """Materialized per-job view and application counters (backend.sql job_applications_stats)"""
+    __tablename__ = 'job_applications_stats'
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.job_id'), primary_key=True)
+    total_applications = db.Column(db.Integer, default=0)
+    total_views = db.Column(db.Integer, default=0)
+
+    job = db.relationship('Job', backref=db.backref('stats', uselist=False))
+
+    def to_dict(self):
+        return {'total_applications': self.total_applications or 0, 'total_views': self.total_views or 0}
+
+class JobAlert(db.Model):
+    """
+    A candidate's saved job search (backend.sql job_alerts; see job_alerts.py)
+
+    job_tags is a JSON list here rather than a Postgres array.
+    """
+    __tablename__ = 'job_alerts'
+    alert_id = db.Column(db.Integer, primary_key=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.candidate_id'), index=True)
+    job_tags = db.Column(db.JSON)
+    location = db.Column(db.String)
+    remote_type = db.Column(db.String)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_sent = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'alert_id': self.alert_id,
+            'candidate_id': self.candidate_id,
+            'job_tags': self.job_tags or [],
+            'location': self.location,
+            'remote_type': self.remote_type,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_sent': self.last_sent.isoformat() if self.last_sent else None
+        }
+
+class JobAlertDigest(db.Model):
+    """New jobs matching a candidate's alerts, collected from one import"""
+    __tablename__ = 'job_alert_digests'
+    digest_id = db.Column(db.Integer, primary_key=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.candidate_id'), nullable=False)
+    # JSON lists; job_ids is capped, job_count is the full number of matches
+    alert_ids = db.Column(db.Text, nullable=False)
+    job_ids = db.Column(db.Text, nullable=False)
+    job_count = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # /api/candidates/<id>/alert-digests, paged in digest_id order
+    __table_args__ = (
+        db.Index('ix_job_alert_digests_candidate_id', 'candidate_id', 'digest_id'),
+    )
+
+    def to_dict(self):
+        return {
+            'digest_id': self.digest_id,
+            'candidate_id': self.candidate_id,
+            'alert_ids': json.loads(self.alert_ids),
+            'job_ids': json.loads(self.job_ids),
+            'job_count': self.job_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class ScrapeTask(db.Model):
+    """A scrape, scrape-and-import or crawl start run on the async Firecrawl client"""
+    __tablename__ = 'scrape_tasks'
+    task_id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String, nullable=False)
+    url = db.Column(db.String)
+    # pending -> completed | failed
+    status = db.Column(db.String, nullable=False, default='pending')
+    # JSON body and HTTP status the synchronous endpoint would have returned
+    result = db.Column(db.Text)
+    http_status = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, index=True)
+
+    def to_dict(self):
+        return {
+            'task_id': self.task_id,
+            'kind': self.kind,
+            'url': self.url,
+            'status': self.status,
+            'result': json.loads(self.result) if self.result else None,
+            'http_status': self.http_status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
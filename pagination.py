@@ -0,0 +1,255 @@
+"""
+Keyset pagination and field projection helpers for the list endpoints.
+Every list route returns at most `limit` rows per request; the opaque cursor
+for the next page is sent back in the X-Next-Cursor / Link response headers so
+the JSON body stays a plain array for existing frontend callers.
+
+Exports and sync jobs can instead ask for the whole result set as
+newline-delimited JSON (Accept: application/x-ndjson or ?stream=1), which is
+read with yield_per and written row by row.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlencode
+from flask import Response, jsonify, request, stream_with_context
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Rows fetched from the database per batch when streaming
+STREAM_BATCH_SIZE = 500
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+class PaginationError(ValueError):
+    """Raised for malformed limit / cursor / fields / ids query parameters"""
+
+
+class Page:
+    """One page of results plus the cursor for the page after it"""
+
+    def __init__(self, items: List, next_cursor: Optional[str], fields: Optional[List[str]]):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.fields = fields
+
+
+def encode_cursor(state: Dict) -> str:
+    """Encode cursor state as an opaque URL-safe token"""
+    raw = json.dumps(state, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token: Optional[str]) -> Dict:
+    """Decode a cursor token produced by encode_cursor"""
+    if not token:
+        return {}
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise PaginationError('Invalid cursor')
+    if not isinstance(state, dict):
+        raise PaginationError('Invalid cursor')
+    return state
+
+
+def parse_limit(value: Optional[str]) -> int:
+    """Parse the limit parameter, clamped to MAX_PAGE_SIZE"""
+    if value is None or value == '':
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise PaginationError('limit must be an integer')
+    if limit < 1:
+        raise PaginationError('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_fields(model, value: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated fields= projection into model column names.
+
+    The primary key is always included so rows stay addressable and the
+    keyset cursor can be computed.
+    """
+    if not value:
+        return None
+    mapper = inspect(model)
+    columns = {c.key for c in mapper.column_attrs}
+    fields = [f.strip() for f in value.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in columns]
+    if unknown:
+        raise PaginationError(f"Unknown field(s): {', '.join(unknown)}")
+    pk = mapper.primary_key[0].key
+    if pk not in fields:
+        fields.insert(0, pk)
+    return fields
+
+
+def parse_id_list(value: str, max_ids: int = MAX_PAGE_SIZE) -> List[int]:
+    """Parse a comma-separated ids= parameter into a list of integers"""
+    try:
+        ids = [int(v) for v in value.split(',') if v.strip()]
+    except ValueError:
+        raise PaginationError('ids must be a comma-separated list of integers')
+    if len(ids) > max_ids:
+        raise PaginationError(f'At most {max_ids} ids may be requested at once')
+    return ids
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _json_default(value):
+    converted = _json_value(value)
+    if converted is value:
+        raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+    return converted
+
+
+def project(obj, fields: List[str]) -> Dict:
+    """Serialize only the projected columns of a model instance"""
+    return {f: _json_value(getattr(obj, f)) for f in fields}
+
+
+def _cursor_key(key, value):
+    """Validate a cursor's key value against the key column's Python type"""
+    try:
+        python_type = key.type.python_type
+    except NotImplementedError:
+        python_type = None
+    if python_type not in (int, str, float):
+        python_type = (int, str, float)
+    # bool is an int subclass, but never a key value
+    if isinstance(value, bool) or not isinstance(value, python_type):
+        raise PaginationError('Invalid cursor')
+    return value
+
+
+def paginate(query, model, key=None, ranked: bool = False, args=None) -> Page:
+    """
+    Fetch one page of a query using keyset pagination.
+
+    Args:
+        query: A SQLAlchemy query over model (filters already applied)
+        model: The mapped model class
+        key: Column to paginate on (defaults to the primary key); must be unique
+        ranked: True when the query is already ordered by relevance. Ranked
+            orderings have no stable key to seek on, so the cursor falls back
+            to an offset within the ranked result set.
+        args: Query-string mapping (defaults to request.args)
+
+    Returns:
+        A Page with the rows and the next cursor (None on the last page)
+    """
+    args = request.args if args is None else args
+    limit = parse_limit(args.get('limit'))
+    cursor = decode_cursor(args.get('cursor'))
+    fields = parse_fields(model, args.get('fields'))
+    key = key if key is not None else inspect(model).primary_key[0]
+    key_name = key.key
+
+    if fields:
+        query = query.options(load_only(*[getattr(model, f) for f in fields]))
+
+    if ranked:
+        offset = cursor.get('o', 0)
+        if not isinstance(offset, int) or offset < 0:
+            raise PaginationError('Invalid cursor')
+        rows = query.order_by(key).offset(offset).limit(limit + 1).all()
+        next_state = {'o': offset + limit}
+    else:
+        if 'k' in cursor:
+            query = query.filter(key > _cursor_key(key, cursor['k']))
+        rows = query.order_by(key).limit(limit + 1).all()
+        next_state = {'k': getattr(rows[limit - 1], key_name)} if len(rows) > limit else None
+
+    has_more = len(rows) > limit
+    return Page(rows[:limit], encode_cursor(next_state) if has_more else None, fields)
+
+
+def _serialize_rows(items: Iterable, fields: Optional[List[str]], serialize=None,
+                    embed: Optional[Dict] = None) -> Iterator[Dict]:
+    """Serialize rows for the list endpoints (see page_response)"""
+    serialize = serialize or (lambda obj: obj.to_dict())
+    for obj in items:
+        row = project(obj, fields) if fields else serialize(obj)
+        if embed:
+            for name, fn in embed.items():
+                row[name] = fn(obj)
+        yield row
+
+
+def page_response(page: Page, serialize=None, embed: Optional[Dict] = None):
+    """
+    Build the JSON response for a page.
+
+    Rows are serialized with serialize(obj) (default obj.to_dict()) unless a
+    fields= projection was requested, in which case only those columns are
+    emitted so no deferred attribute is ever loaded. `embed` maps extra keys
+    to callables (e.g. eagerly loaded relationships) added to every row.
+    """
+    response = jsonify(list(_serialize_rows(page.items, page.fields, serialize, embed)))
+    if page.next_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = page.next_cursor
+        next_url = f'{request.base_url}?{urlencode(args)}'
+        response.headers['X-Next-Cursor'] = page.next_cursor
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
+
+
+def wants_stream(args=None) -> bool:
+    """True if the client asked for an NDJSON stream instead of a page"""
+    args = request.args if args is None else args
+    if args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def stream_response(query, model, key=None, serialize=None, embed: Optional[Dict] = None,
+                    args=None, batch_size: int = STREAM_BATCH_SIZE) -> Response:
+    """
+    Stream every row of a query as newline-delimited JSON.
+
+    Rows are fetched batch_size at a time with yield_per and written as soon as
+    they are serialized, so memory stays flat however many rows match. The
+    query's own ordering (e.g. search relevance) is kept, with the key as a
+    tie-breaker. fields= and a keyset cursor= are honoured as in paginate();
+    limit= is only applied when given explicitly.
+
+    Parameters are validated before the first byte is sent, so bad input still
+    gets a 400 rather than a truncated stream.
+    """
+    args = request.args if args is None else args
+    limit = parse_limit(args.get('limit')) if args.get('limit') else None
+    cursor = decode_cursor(args.get('cursor'))
+    fields = parse_fields(model, args.get('fields'))
+    key = key if key is not None else inspect(model).primary_key[0]
+
+    if fields:
+        query = query.options(load_only(*[getattr(model, f) for f in fields]))
+    if 'k' in cursor:
+        query = query.filter(key > cursor['k'])
+    query = query.order_by(key)
+    if limit is not None:
+        query = query.limit(limit)
+    query = query.yield_per(batch_size)
+
+    def generate():
+        for row in _serialize_rows(query, fields, serialize, embed):
+            yield json.dumps(row, default=_json_default) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,129 @@
+"""
+Multi-process parsing stage for crawl results.
+Page parsing is pure-Python regex work that holds the GIL, so large crawls are
+parsed in a shared ProcessPoolExecutor instead of the web worker thread. Pages
+are dispatched in chunks with a bounded number of chunks in flight, and parsed
+jobs are yielded in page order as chunks complete, so neither every page nor
+every parsed job has to be held in memory at once. Small inputs are parsed
+inline, where starting and feeding worker processes would cost more than it saves.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Windows caps ProcessPoolExecutor at 61 workers
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', str(min(os.cpu_count() or 1, 61))))
+# Pages sent to a worker per task
+PARSE_CHUNK_SIZE = int(os.getenv('PARSE_CHUNK_SIZE', '4'))
+# Inputs with fewer pages than this are parsed inline
+PARSE_POOL_MIN_PAGES = int(os.getenv('PARSE_POOL_MIN_PAGES', '16'))
+# 'spawn' avoids forking a multi-threaded web server; override with 'fork' or 'forkserver'
+PARSE_START_METHOD = os.getenv('PARSE_START_METHOD', 'spawn')
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Return the shared parsing pool, starting it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS,
+                mp_context=multiprocessing.get_context(PARSE_START_METHOD)
+            )
+        return _pool
+
+
+def shutdown_parse_pool(wait: bool = True) -> None:
+    """Stop the worker processes; the next parse starts a new pool"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+atexit.register(shutdown_parse_pool, wait=False)
+
+
+def _parse_chunk(parse: Callable[..., List[Dict]], chunk: List[Tuple]) -> List[Dict]:
+    """Worker entry point: parse every page of a chunk"""
+    jobs: List[Dict] = []
+    for args in chunk:
+        jobs.extend(parse(*args))
+    return jobs
+
+
+def _chunks(items: Iterator, size: int) -> Iterator[List]:
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_parsed(pages: Iterable[Tuple], parse: Callable[..., List[Dict]],
+                chunk_size: int = PARSE_CHUNK_SIZE,
+                max_workers: int = PARSE_WORKERS,
+                min_pages: int = PARSE_POOL_MIN_PAGES) -> Iterator[Dict]:
+    """
+    Parse pages in worker processes and yield their jobs in page order
+
+    Args:
+        pages: Iterable of argument tuples for `parse` (may be a generator)
+        parse: Module-level (picklable) function returning a list of jobs per page
+        chunk_size: Pages per worker task
+        max_workers: Parallelism; 1 or less parses everything inline
+        min_pages: Inputs smaller than this are parsed inline
+
+    Yields:
+        Parsed job dictionaries
+    """
+    pages = iter(pages)
+    head = list(islice(pages, max(min_pages, chunk_size))) if max_workers > 1 else []
+    if max_workers <= 1 or len(head) < min_pages:
+        # Chunk by chunk, so a long generator is never held in memory at once
+        for chunk in _chunks(chain(head, pages), max(1, chunk_size)):
+            yield from _parse_chunk(parse, chunk)
+        return
+
+    # At most two chunks per worker in flight: enough to keep every worker busy
+    # while bounding how many pages and results are buffered
+    max_pending = max_workers * 2
+    pending: deque = deque()
+    chunks = _chunks(chain(head, pages), max(1, chunk_size))
+    pool: Optional[ProcessPoolExecutor] = get_parse_pool()
+
+    def results(future, chunk) -> List[Dict]:
+        nonlocal pool
+        if pool is not None:
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory): finish this parse inline
+                shutdown_parse_pool(wait=False)
+                pool = None
+        return _parse_chunk(parse, chunk)
+
+    try:
+        for chunk in chunks:
+            future = pool.submit(_parse_chunk, parse, chunk) if pool is not None else None
+            pending.append((future, chunk))
+            if len(pending) >= max_pending:
+                yield from results(*pending.popleft())
+        while pending:
+            yield from results(*pending.popleft())
+    finally:
+        # The consumer stopped early: drop work that has not started yet
+        for future, _ in pending:
+            if future is not None:
+                future.cancel()
@@ -0,0 +1,165 @@
+"""
+Kanban board queries for a job's application pipeline.
+An application's current stage is its latest application_pipeline row. An
+application with no stage history falls back to the stage named like its
+current_status. A single query returns, for every stage, the stage's
+application count and its first N cards (most recently moved first). Each card
+carries the application's latest note, read through the
+(application_id, note_id) index. Further cards of one column are paged with a
+keyset cursor on (moved_at, application_id).
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import aliased
+from models_fixed import db, Application, ApplicationPipeline, PipelineNote, PipelineStage
+from pagination import PaginationError, decode_cursor, encode_cursor, parse_limit
+
+DEFAULT_CARDS_PER_STAGE = 20
+MAX_CARDS_PER_STAGE = 100
+
+
+def _ranked_cards(job_id: int):
+    """
+    Subquery of a job's applications with their current stage, per-stage count
+    and position within the stage (1 = most recently moved)
+    """
+    history = (
+        select(ApplicationPipeline.application_id, ApplicationPipeline.stage_id, ApplicationPipeline.moved_at,
+               func.row_number().over(
+                   partition_by=ApplicationPipeline.application_id,
+                   order_by=(ApplicationPipeline.moved_at.desc(), ApplicationPipeline.stage_id.desc())
+               ).label('rn'))
+        .join(Application, Application.application_id == ApplicationPipeline.application_id)
+        .where(Application.job_id == job_id)
+    ).subquery()
+    by_status = aliased(PipelineStage)
+    current = (
+        select(Application.application_id, Application.candidate_id, Application.current_status,
+               Application.applied_at,
+               func.coalesce(history.c.stage_id, by_status.stage_id).label('stage_id'),
+               func.coalesce(history.c.moved_at, Application.updated_at).label('moved_at'))
+        .outerjoin(history, and_(history.c.application_id == Application.application_id, history.c.rn == 1))
+        .outerjoin(by_status, func.lower(by_status.name) == func.lower(Application.current_status))
+        .where(Application.job_id == job_id)
+    ).subquery()
+    return (
+        select(current,
+               func.count().over(partition_by=current.c.stage_id).label('stage_count'),
+               func.row_number().over(
+                   partition_by=current.c.stage_id,
+                   order_by=(current.c.moved_at.desc(), current.c.application_id.desc())
+               ).label('pos'))
+        .where(current.c.stage_id.isnot(None))
+    ).subquery()
+
+
+def _with_latest_note(query, cards):
+    """Outer-join each card's latest note onto a query over the cards subquery"""
+    latest_note_id = (
+        select(func.max(PipelineNote.note_id))
+        .where(PipelineNote.application_id == cards.c.application_id)
+        .correlate(cards)
+        .scalar_subquery()
+    )
+    return (query
+            .add_columns(PipelineNote.note_id, PipelineNote.note_text, PipelineNote.author_id,
+                         PipelineNote.created_at.label('note_created_at'))
+            .outerjoin(PipelineNote, PipelineNote.note_id == latest_note_id))
+
+
+def _card(row) -> Dict:
+    return {
+        'application_id': row.application_id,
+        'candidate_id': row.candidate_id,
+        'status': row.current_status,
+        'applied_at': row.applied_at.isoformat() if row.applied_at else None,
+        'moved_at': row.moved_at.isoformat() if row.moved_at else None,
+        'latest_note': {
+            'note_id': row.note_id,
+            'note_text': row.note_text,
+            'author_id': row.author_id,
+            'created_at': row.note_created_at.isoformat() if row.note_created_at else None
+        } if row.note_id is not None else None
+    }
+
+
+def _cursor_after(card: Dict) -> str:
+    return encode_cursor({'m': card['moved_at'], 'a': card['application_id']})
+
+
+def parse_cards_per_stage(value: Optional[str]) -> int:
+    """Parse the cards= parameter, clamped to MAX_CARDS_PER_STAGE"""
+    if not value:
+        return DEFAULT_CARDS_PER_STAGE
+    try:
+        cards = int(value)
+    except ValueError:
+        raise PaginationError('cards must be an integer')
+    if cards < 1:
+        raise PaginationError('cards must be positive')
+    return min(cards, MAX_CARDS_PER_STAGE)
+
+
+def board(job_id: int, cards_per_stage: int = DEFAULT_CARDS_PER_STAGE) -> List[Dict]:
+    """
+    Every pipeline stage with its application count and first cards for a job
+
+    Returns:
+        [{'stage_id', 'name', 'count', 'cards', 'next_cursor'}] in stage order;
+        next_cursor (for stage_cards) is None when the column is complete
+    """
+    cards = _ranked_cards(job_id)
+    query = _with_latest_note(
+        select(PipelineStage.stage_id.label('column_id'), PipelineStage.name, cards)
+        .select_from(PipelineStage)
+        .outerjoin(cards, and_(cards.c.stage_id == PipelineStage.stage_id, cards.c.pos <= cards_per_stage)),
+        cards
+    ).order_by(PipelineStage.stage_id, cards.c.pos)
+
+    columns: Dict[int, Dict] = {}
+    for row in db.session.execute(query):
+        column = columns.get(row.column_id)
+        if column is None:
+            column = columns[row.column_id] = {
+                'stage_id': row.column_id,
+                'name': row.name,
+                'count': row.stage_count or 0,
+                'cards': [],
+                'next_cursor': None
+            }
+        if row.application_id is not None:
+            column['cards'].append(_card(row))
+    for column in columns.values():
+        if column['count'] > len(column['cards']):
+            column['next_cursor'] = _cursor_after(column['cards'][-1])
+    return list(columns.values())
+
+
+def stage_cards(job_id: int, stage_id: int, args) -> Tuple[List[Dict], Optional[str]]:
+    """
+    One page of a stage column, after the ?cursor= from board() or a previous page
+
+    Returns:
+        (cards, next cursor or None)
+    """
+    limit = min(parse_limit(args.get('limit')), MAX_CARDS_PER_STAGE)
+    cursor = decode_cursor(args.get('cursor'))
+    cards = _ranked_cards(job_id)
+    query = select(cards).where(cards.c.stage_id == stage_id)
+    if cursor:
+        try:
+            moved_at = datetime.fromisoformat(cursor['m']) if cursor.get('m') else None
+            application_id = int(cursor['a'])
+        except (KeyError, TypeError, ValueError):
+            raise PaginationError('Invalid cursor')
+        query = query.where(or_(cards.c.moved_at < moved_at,
+                                and_(cards.c.moved_at == moved_at, cards.c.application_id < application_id)))
+    rows = db.session.execute(
+        _with_latest_note(query, cards)
+        .order_by(cards.c.moved_at.desc(), cards.c.application_id.desc())
+        .limit(limit + 1)
+    ).all()
+    page = [_card(row) for row in rows[:limit]]
+    return page, (_cursor_after(page[-1]) if len(rows) > limit else None)
@@ -0,0 +1,274 @@
+"""
+Incremental readiness-score maintenance.
+Changing a candidate's skills or a job's required skills marks the affected
+(candidate, job) pairs dirty in readiness_dirty_pairs. The marking is done
+from a session flush hook, in the same transaction as the change. A background
+worker recomputes only those pairs, in batches. It writes
+ai_job_readiness_scores (with last_calculated) and the match details, and drops
+scores for pairs that no longer share a skill. Ranking endpoints then read the
+stored scores through the (job_id, readiness_score) and
+(candidate_id, readiness_score) indexes instead of scoring on demand.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import bindparam, delete, event, func, insert, inspect, literal, select, union
+from sqlalchemy.orm import Session, selectinload
+from models_fixed import (db, CandidateSkill, Job, JobRequiredSkill, JobReadinessScore,
+                          ReadinessDirtyPair, SkillMatchDetail)
+import skill_matching
+from background import BackgroundWorker
+
+# Dirty pairs recomputed per transaction
+RECOMPUTE_BATCH_SIZE = 500
+WORKER_IDLE_SLEEP = 2.0
+
+_PENDING_KEY = 'readiness_pending'
+_MARKED_KEY = 'readiness_marked'
+
+
+def _dirty_upsert(select_stmt):
+    """
+    INSERT the (candidate_id, job_id, marked_at) rows of a SELECT into the dirty
+    set, refreshing marked_at of pairs already there
+
+    A refreshed marked_at tells a recompute that started earlier not to clear
+    the pair.
+    """
+    table = ReadinessDirtyPair.__table__
+    columns = [table.c.candidate_id, table.c.job_id, table.c.marked_at]
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        # No upsert: replace the pairs instead
+        pairs = select_stmt.subquery()
+        return [
+            delete(table).where(
+                select(literal(1)).where(pairs.c.candidate_id == table.c.candidate_id,
+                                         pairs.c.job_id == table.c.job_id).exists()
+            ),
+            insert(table).from_select(columns, select_stmt)
+        ]
+    stmt = dialect_insert(table).from_select(columns, select_stmt)
+    return [stmt.on_conflict_do_update(
+        index_elements=[table.c.candidate_id, table.c.job_id],
+        set_={'marked_at': stmt.excluded.marked_at}
+    )]
+
+
+def _candidate_pairs(candidate_id: int, skill_ids: Set[int], now: datetime):
+    """Pairs of a candidate with every job requiring one of the changed skills"""
+    return (select(literal(candidate_id).label('candidate_id'),
+                   JobRequiredSkill.job_id.label('job_id'),
+                   literal(now).label('marked_at'))
+            .where(JobRequiredSkill.skill_id.in_(skill_ids))
+            .distinct())
+
+
+def _job_pairs(job_id: int, skill_ids: Set[int], now: datetime):
+    """Pairs of a job with every candidate holding one of the changed skills"""
+    return (select(CandidateSkill.candidate_id.label('candidate_id'),
+                   literal(job_id).label('job_id'),
+                   literal(now).label('marked_at'))
+            .where(CandidateSkill.skill_id.in_(skill_ids))
+            .distinct())
+
+
+def _changed_skills(obj) -> Set[int]:
+    """Current and previous skill_id of a changed skill row"""
+    history = inspect(obj).attrs.skill_id.history
+    return {s for s in (obj.skill_id, *history.deleted) if s is not None}
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_skill_changes(session, flush_context, instances) -> None:
+    """Remember which candidates' / jobs' skills this flush changes"""
+    pending = session.info.setdefault(_PENDING_KEY, {'candidates': {}, 'jobs': {}})
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if isinstance(obj, CandidateSkill):
+            pending['candidates'].setdefault(obj.candidate_id, set()).update(_changed_skills(obj))
+        elif isinstance(obj, JobRequiredSkill):
+            pending['jobs'].setdefault(obj.job_id, set()).update(_changed_skills(obj))
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_changed_pairs(session, flush_context) -> None:
+    """Mark the affected pairs dirty inside the flushing transaction"""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or not (pending['candidates'] or pending['jobs']):
+        return
+    now = datetime.utcnow()
+    conn = session.connection()
+    for candidate_id, skill_ids in pending['candidates'].items():
+        if candidate_id is not None and skill_ids:
+            for stmt in _dirty_upsert(_candidate_pairs(candidate_id, skill_ids, now)):
+                conn.execute(stmt)
+    for job_id, skill_ids in pending['jobs'].items():
+        if job_id is not None and skill_ids:
+            for stmt in _dirty_upsert(_job_pairs(job_id, skill_ids, now)):
+                conn.execute(stmt)
+    session.info[_MARKED_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_worker(session) -> None:
+    if session.info.pop(_MARKED_KEY, False):
+        readiness_worker.wake()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_changes(session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_MARKED_KEY, None)
+
+
+def mark_all_dirty() -> int:
+    """
+    Queue every pair for recomputation (initial backfill or after a scoring change)
+
+    Covers pairs sharing a skill and pairs that already have a stored score, so
+    stale scores are cleared too. Returns the number of dirty pairs.
+    """
+    now = literal(datetime.utcnow()).label('marked_at')
+    sharing = (select(CandidateSkill.candidate_id.label('candidate_id'),
+                      JobRequiredSkill.job_id.label('job_id'), now)
+               .join(JobRequiredSkill, JobRequiredSkill.skill_id == CandidateSkill.skill_id))
+    scored = (select(JobReadinessScore.candidate_id.label('candidate_id'),
+                     JobReadinessScore.job_id.label('job_id'), now)
+              .where(JobReadinessScore.candidate_id.isnot(None), JobReadinessScore.job_id.isnot(None)))
+    pairs = union(sharing, scored).subquery()
+    for stmt in _dirty_upsert(select(pairs.c.candidate_id, pairs.c.job_id, pairs.c.marked_at)
+                              .where(pairs.c.candidate_id.isnot(None))):
+        db.session.execute(stmt)
+    db.session.commit()
+    readiness_worker.wake()
+    return pending_count()
+
+
+def pending_count(candidate_id: Optional[int] = None, job_id: Optional[int] = None) -> int:
+    """Number of dirty pairs, optionally for one candidate or job"""
+    query = select(func.count()).select_from(ReadinessDirtyPair)
+    if candidate_id is not None:
+        query = query.where(ReadinessDirtyPair.candidate_id == candidate_id)
+    if job_id is not None:
+        query = query.where(ReadinessDirtyPair.job_id == job_id)
+    return db.session.execute(query).scalar()
+
+
+def _delete_scores(pairs: List[Tuple[int, int]]) -> None:
+    if not pairs:
+        return
+    by_job: Dict[int, List[int]] = {}
+    for candidate_id, job_id in pairs:
+        by_job.setdefault(job_id, []).append(candidate_id)
+    for job_id, candidate_ids in by_job.items():
+        score_ids = select(JobReadinessScore.score_id).where(
+            JobReadinessScore.job_id == job_id, JobReadinessScore.candidate_id.in_(candidate_ids))
+        db.session.execute(delete(SkillMatchDetail).where(SkillMatchDetail.readiness_score_id.in_(score_ids)))
+        db.session.execute(delete(JobReadinessScore).where(
+            JobReadinessScore.job_id == job_id, JobReadinessScore.candidate_id.in_(candidate_ids)))
+
+
+def recompute_dirty(batch_size: int = RECOMPUTE_BATCH_SIZE) -> int:
+    """
+    Recompute one batch of dirty pairs in a single transaction
+
+    Pairs re-marked while the batch was computed keep their newer marked_at and
+    stay dirty for the next batch.
+
+    Returns:
+        Number of pairs processed (0 when nothing is dirty)
+    """
+    claimed = db.session.execute(
+        select(ReadinessDirtyPair.candidate_id, ReadinessDirtyPair.job_id, ReadinessDirtyPair.marked_at)
+        .order_by(ReadinessDirtyPair.marked_at)
+        .limit(batch_size)
+    ).all()
+    if not claimed:
+        return 0
+
+    by_job: Dict[int, List[int]] = {}
+    for candidate_id, job_id, _ in claimed:
+        by_job.setdefault(job_id, []).append(candidate_id)
+    active = set(db.session.execute(
+        select(Job.job_id).where(Job.job_id.in_(list(by_job)), Job.is_active.is_(True))
+    ).scalars())
+    required = skill_matching.job_requirements(active)
+    skills = skill_matching.candidate_skills({c for c, _, _ in claimed})
+
+    scored: List[Tuple[int, int, float]] = []
+    dropped: List[Tuple[int, int]] = []
+    for job_id, candidate_ids in by_job.items():
+        job_required = required.get(job_id)
+        if not job_required:
+            dropped.extend((c, job_id) for c in candidate_ids)
+            continue
+        matrix = skill_matching.SparseSkillMatrix(
+            ((c, s, p) for c in candidate_ids for s, p in skills.get(c, {}).items() if s in job_required),
+            skill_ids=list(job_required)
+        )
+        scores = dict(zip(matrix.row_ids, skill_matching.score_rows_against_requirements(matrix, job_required)))
+        for candidate_id in candidate_ids:
+            if scores.get(candidate_id, 0) > 0:
+                scored.append((candidate_id, job_id, scores[candidate_id]))
+            else:
+                dropped.append((candidate_id, job_id))
+
+    skill_matching.save_matches(skill_matching.build_matches(scored, skills, required), commit=False)
+    _delete_scores(dropped)
+    table = ReadinessDirtyPair.__table__
+    db.session.execute(
+        table.delete().where(table.c.candidate_id == bindparam('c'), table.c.job_id == bindparam('j'),
+                             table.c.marked_at <= bindparam('m')),
+        [{'c': c, 'j': j, 'm': m} for c, j, m in claimed]
+    )
+    db.session.commit()
+    return len(claimed)
+
+
+def _stored_matches(query) -> List[Dict]:
+    rows = query.options(selectinload(JobReadinessScore.details)).all()
+    return [
+        dict(row.to_dict(), readiness_score=float(row.readiness_score),
+             details=[detail.to_dict() for detail in row.details])
+        for row in rows
+    ]
+
+
+def top_candidates_for_job(job_id: int, k: int) -> List[Dict]:
+    """Stored top-k candidates for a job, best first (index range read)"""
+    return _stored_matches(
+        JobReadinessScore.query
+        .filter(JobReadinessScore.job_id == job_id)
+        .order_by(JobReadinessScore.readiness_score.desc(), JobReadinessScore.candidate_id)
+        .limit(k)
+    )
+
+
+def top_jobs_for_candidate(candidate_id: int, k: int) -> List[Dict]:
+    """Stored top-k active jobs for a candidate, best first"""
+    return _stored_matches(
+        JobReadinessScore.query
+        .join(Job, Job.job_id == JobReadinessScore.job_id)
+        .filter(JobReadinessScore.candidate_id == candidate_id, Job.is_active.is_(True))
+        .order_by(JobReadinessScore.readiness_score.desc(), JobReadinessScore.job_id)
+        .limit(k)
+    )
+
+
+class ReadinessWorker(BackgroundWorker):
+    """Daemon thread that recomputes dirty pairs inside the Flask app context"""
+
+    name = 'readiness-worker'
+    idle_sleep = WORKER_IDLE_SLEEP
+
+    def run_once(self) -> bool:
+        return recompute_dirty() > 0
+
+
+readiness_worker = ReadinessWorker()
@@ -0,0 +1,257 @@
+"""
+Read-through cache for hot GET responses.
+A cached route declares the tables its response depends on. Entries are keyed
+by path, normalized query args and the current generation of each of those
+tables. A committed write to a table bumps its generation, which orphans
+exactly the entries built from it. Writes are seen by session hooks, both ORM
+flushes and Core INSERT/UPDATE/DELETE statements such as the job import
+upserts. Orphaned entries age out through the LRU/TTL eviction.
+
+The store is in-process by default. Set RESPONSE_CACHE_URL to a redis:// URL
+(Redis or any server speaking its protocol) to share entries and generations
+between worker processes. An in-process store cannot see invalidations made by
+other processes, so with more than one worker process (WEB_CONCURRENCY, which
+gunicorn.conf.py exports) and no shared store the cache is switched off.
+Responses carry an ETag, and conditional GETs get a 304.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from flask import Response, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from pagination import wants_stream
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '300'))
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '512'))
+RESPONSE_CACHE_URL = os.getenv('RESPONSE_CACHE_URL', '')
+RESPONSE_CACHE_PREFIX = 'respcache'
+# Worker processes serving the app
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', '1'))
+
+_CHANGED_KEY = 'response_cache_tables'
+# Headers rebuilt for every response rather than replayed from the entry
+_UNCACHED_HEADERS = {'cache-control', 'content-length', 'date', 'etag', 'server-timing', 'set-cookie', 'x-cache'}
+
+
+class MemoryStore:
+    """Thread-safe in-process store: TTL + LRU entries and per-table generations"""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Tuple[float, bytes]]' = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generations(self, tables: List[str]) -> List[int]:
+        with self._lock:
+            return [self._generations.get(t, 0) for t in tables]
+
+    def bump(self, tables: Iterable[str]) -> None:
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+class RedisStore:
+    """
+    Store on a Redis-protocol server shared by every worker process
+
+    Size bounding is left to the server (maxmemory with an allkeys-lru policy);
+    every entry also gets the TTL.
+    """
+
+    def __init__(self, url: str, prefix: str = RESPONSE_CACHE_PREFIX):
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _generation_key(self, table: str) -> str:
+        return f'{self.prefix}:gen:{table}'
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(f'{self.prefix}:{key}')
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.client.set(f'{self.prefix}:{key}', value, ex=ttl)
+
+    def generations(self, tables: List[str]) -> List[int]:
+        values = self.client.mget([self._generation_key(t) for t in tables])
+        return [int(v) if v is not None else 0 for v in values]
+
+    def bump(self, tables: Iterable[str]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for table in tables:
+            pipe.incr(self._generation_key(table))
+        pipe.execute()
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=f'{self.prefix}:*'):
+            self.client.delete(key)
+
+
+def create_store(url: str = RESPONSE_CACHE_URL, processes: int = WEB_CONCURRENCY):
+    """
+    RedisStore for a redis:// URL, else MemoryStore for a single process
+
+    Returns:
+        The store, or None (cache off) when several processes would each
+        keep a private MemoryStore
+    """
+    if url:
+        if redis is not None:
+            return RedisStore(url)
+        warnings.warn('RESPONSE_CACHE_URL is set but the redis package is not installed')
+    if processes > 1:
+        warnings.warn(f'Response cache disabled: {processes} worker processes need a shared store '
+                      '(RESPONSE_CACHE_URL)')
+        return None
+    return MemoryStore()
+
+
+class ResponseCache:
+    """Read-through response cache with table-generation invalidation"""
+
+    def __init__(self, store=None, ttl: int = RESPONSE_CACHE_TTL):
+        self.store = store if store is not None else create_store()
+        self.ttl = ttl
+        # Tables some cached route depends on; writes to others are ignored
+        self.tables: Set[str] = set()
+        self.enabled = self.store is not None
+
+    def key(self, tables: List[str]) -> str:
+        """Cache key of the current request: path, sorted args and table generations"""
+        args = sorted(request.args.items(multi=True))
+        generations = self.store.generations(tables)
+        digest = hashlib.sha1(json.dumps([request.path, args, generations]).encode('utf-8')).hexdigest()
+        return f'{request.path}:{digest}'
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        """Orphan every entry built from the given tables"""
+        tables = [t for t in tables if t in self.tables]
+        if tables and self.store is not None:
+            self.store.bump(tables)
+
+    def clear(self) -> None:
+        if self.store is not None:
+            self.store.clear()
+
+    def cached(self, *tables: str, ttl: Optional[int] = None, unless: Optional[Callable[[], bool]] = None):
+        """
+        Decorator caching a view's 200 GET responses
+
+        Args:
+            tables: Names of the tables the response is built from
+            ttl: Seconds an entry lives (default RESPONSE_CACHE_TTL)
+            unless: Called per request; True serves it uncached (e.g. for
+                args that pull in data the tables don't cover)
+        """
+        self.tables.update(tables)
+        tables = sorted(tables)
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method != 'GET' or wants_stream() or (unless and unless()):
+                    return view(*args, **kwargs)
+                # Generations are read before the query runs, so a write that
+                # commits meanwhile orphans the entry stored below
+                key = self.key(tables)
+                cached = self.store.get(key)
+                if cached is not None:
+                    entry = json.loads(cached)
+                    # Replays Content-Type and pagination headers (X-Next-Cursor, Link)
+                    response = Response(entry['body'], status=entry['status'], headers=entry['headers'])
+                    response.set_etag(entry['etag'])
+                    response.headers['X-Cache'] = 'HIT'
+                else:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    body = response.get_data(as_text=True)
+                    etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+                    self.store.set(key, json.dumps({
+                        'body': body,
+                        'status': response.status_code,
+                        'headers': [[name, value] for name, value in response.headers.items()
+                                    if name.lower() not in _UNCACHED_HEADERS],
+                        'etag': etag
+                    }).encode('utf-8'), ttl or self.ttl)
+                    response.set_etag(etag)
+                    response.headers['X-Cache'] = 'MISS'
+                # Clients may keep the body but must revalidate it every time
+                response.headers['Cache-Control'] = 'no-cache'
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+
+# Process-wide cache used by the hot GET routes in app.py
+response_cache = ResponseCache()
+
+
+@event.listens_for(Session, 'before_flush')
+def _note_flushed_tables(session, flush_context, instances) -> None:
+    changed = session.info.setdefault(_CHANGED_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        table = getattr(obj, '__tablename__', None)
+        if table in response_cache.tables:
+            changed.add(table)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _note_statement_tables(orm_execute_state) -> None:
+    """Core INSERT/UPDATE/DELETE statements bypass the flush"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        name = getattr(table, 'name', None)
+        if name in response_cache.tables:
+            orm_execute_state.session.info.setdefault(_CHANGED_KEY, set()).add(name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session) -> None:
+    changed = session.info.pop(_CHANGED_KEY, None)
+    if changed:
+        response_cache.invalidate(changed)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_tables(session, previous_transaction) -> None:
+    session.info.pop(_CHANGED_KEY, None)
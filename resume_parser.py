@@ -0,0 +1,327 @@
+"""
+Offline resume text extraction and field parsing.
+This runs in the parse pool's worker processes (see parse_pool.py and
+resume_pipeline.py), so it imports no Flask or database code. Text is
+extracted with the standard library from PDF, DOCX, HTML, RTF and plain-text
+files. pypdf is used for PDFs when it is installed. The fallback PDF reader
+only handles simple text-based files, not scans or CID-encoded fonts.
+
+Fields are found by heuristics:
+- title: the first line in the resume header that names a role
+- summary, skills, experience and education: split by their section headings
+- experience entries: lines carrying a date range
+- education entries: lines naming a degree
+"""
+
+import re
+import zipfile
+import zlib
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from xml.etree import ElementTree
+
+try:
+    import pypdf
+except ImportError:  # pragma: no cover - optional dependency
+    pypdf = None
+
+SUPPORTED_TYPES = ('pdf', 'docx', 'txt', 'md', 'html', 'htm', 'rtf')
+# Extracted text beyond this is ignored
+MAX_TEXT_CHARS = 200_000
+MAX_SKILLS = 50
+MAX_ENTRIES = 20
+
+SECTION_HEADINGS = {
+    'summary': ('summary', 'professional summary', 'profile', 'professional profile', 'about', 'about me',
+                'objective', 'career objective'),
+    'skills': ('skills', 'technical skills', 'key skills', 'core skills', 'core competencies', 'competencies',
+               'technologies', 'tools and technologies'),
+    'experience': ('experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'career history'),
+    'education': ('education', 'education and training', 'academic background', 'qualifications'),
+}
+_HEADING_SECTIONS = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+_ROLE_RE = re.compile(
+    r'\b(engineer|developer|programmer|architect|designer|manager|analyst|scientist|consultant|specialist|'
+    r'administrator|director|lead|officer|coordinator|technician|researcher|intern|accountant|recruiter|'
+    r'writer|editor|nurse|teacher|marketer|strategist|head of|vp)\b', re.IGNORECASE)
+_MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+_DATE = rf'(?:{_MONTH}\s+)?(?:\d{{1,2}}/)?(?:19|20)\d{{2}}'
+_DATE_RANGE_RE = re.compile(
+    rf'(?P<start>{_DATE})\s*(?:-|–|—|to)\s*(?P<end>{_DATE}|present|current|now|today)', re.IGNORECASE)
+_DEGREE_RE = re.compile(
+    r'\b(bachelor|master|doctor|ph\.?\s?d|mba|b\.?\s?sc|m\.?\s?sc|b\.?\s?s|m\.?\s?s|b\.?\s?a|m\.?\s?a|'
+    r'b\.?\s?eng|m\.?\s?eng|associate|diploma|degree|certificate)\b', re.IGNORECASE)
+_YEAR_RE = re.compile(r'\b(?:19|20)\d{2}\b')
+_SKILL_SPLIT_RE = re.compile(r'[,;|•·▪●\n\t]+')
+
+
+def file_type_for(filename: Optional[str]) -> Optional[str]:
+    """Supported file type from a file name's extension, or None"""
+    if not filename or '.' not in filename:
+        return None
+    ext = filename.rsplit('.', 1)[1].lower()
+    return ext if ext in SUPPORTED_TYPES else None
+
+
+# ---------------------------------------------------------------------------
+# Text extraction
+# ---------------------------------------------------------------------------
+
+_PDF_STREAM_RE = re.compile(rb'stream\r?\n(.*?)\r?\nendstream', re.DOTALL)
+_PDF_TEXT_RE = re.compile(
+    rb'\[((?:\\.|[^\]\\])*)\]\s*TJ'
+    rb'|\(((?:\\.|[^\\)])*)\)\s*(?:Tj|\'|")'
+    rb'|(T\*|\b(?:Td|TD|ET)\b)', re.DOTALL)
+_PDF_ARRAY_RE = re.compile(rb'\(((?:\\.|[^\\)])*)\)|(-?\d+(?:\.\d+)?)')
+_PDF_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+
+
+def _pdf_string(raw: bytes) -> str:
+    def unescape(match):
+        value = match.group(1)
+        if value[:1].isdigit():
+            return bytes([int(value, 8) & 0xFF])
+        return _PDF_ESCAPES.get(value, value)
+    return re.sub(rb'\\([0-7]{1,3}|.)', unescape, raw, flags=re.DOTALL).decode('latin-1')
+
+
+def _pdf_text_fallback(data: bytes) -> str:
+    """Text of a simple PDF's content streams (literal strings with Tj/TJ only)"""
+    parts: List[str] = []
+    for match in _PDF_STREAM_RE.finditer(data):
+        stream = match.group(1)
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+        for array, literal, breaker in (m.groups() for m in _PDF_TEXT_RE.finditer(stream)):
+            if breaker is not None:
+                parts.append('\n')
+            elif literal is not None:
+                parts.append(_pdf_string(literal))
+            else:
+                for string, kerning in (m.groups() for m in _PDF_ARRAY_RE.finditer(array)):
+                    if string is not None:
+                        parts.append(_pdf_string(string))
+                    elif float(kerning) < -150:
+                        parts.append(' ')
+    return ''.join(parts)
+
+
+def _pdf_text(path: str) -> str:
+    if pypdf is not None:
+        reader = pypdf.PdfReader(path)
+        return '\n'.join(page.extract_text() or '' for page in reader.pages)
+    with open(path, 'rb') as f:
+        return _pdf_text_fallback(f.read())
+
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def _docx_text(path: str) -> str:
+    with zipfile.ZipFile(path) as archive, archive.open('word/document.xml') as document:
+        paragraphs: List[str] = []
+        for _, element in ElementTree.iterparse(document):
+            if element.tag == f'{_W}p':
+                parts = []
+                for node in element.iter():
+                    if node.tag == f'{_W}t':
+                        parts.append(node.text or '')
+                    elif node.tag == f'{_W}tab':
+                        parts.append('\t')
+                    elif node.tag in (f'{_W}br', f'{_W}cr'):
+                        parts.append('\n')
+                paragraphs.append(''.join(parts))
+                element.clear()
+        return '\n'.join(paragraphs)
+
+
+class _HTMLText(HTMLParser):
+    BLOCKS = {'p', 'div', 'br', 'li', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section', 'ul', 'ol', 'table'}
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('script', 'style'):
+            self._skip += 1
+        elif tag in self.BLOCKS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style'):
+            self._skip = max(0, self._skip - 1)
+        elif tag in self.BLOCKS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def _html_text(text: str) -> str:
+    parser = _HTMLText()
+    parser.feed(text)
+    parser.close()
+    return ''.join(parser.parts)
+
+
+def _rtf_text(text: str) -> str:
+    text = re.sub(r'\{\\\*[^{}]*\}', '', text)
+    text = re.sub(r"\\'([0-9a-fA-F]{2})", lambda m: bytes([int(m.group(1), 16)]).decode('cp1252', 'replace'), text)
+    text = re.sub(r'\\(par|line)\b ?', '\n', text)
+    text = re.sub(r'\\tab\b ?', '\t', text)
+    text = re.sub(r'\\[a-zA-Z]+-?\d* ?', '', text)
+    return re.sub(r'[{}]', '', text).replace('\\\\', '\\')
+
+
+def _read_text(path: str) -> str:
+    with open(path, 'rb') as f:
+        data = f.read(MAX_TEXT_CHARS * 4)
+    return data.decode('utf-8-sig', errors='replace')
+
+
+def extract_text(path: str, file_type: str) -> str:
+    """Plain text of a resume file"""
+    if file_type == 'pdf':
+        text = _pdf_text(path)
+    elif file_type == 'docx':
+        text = _docx_text(path)
+    elif file_type in ('html', 'htm'):
+        text = _html_text(_read_text(path))
+    elif file_type == 'rtf':
+        text = _rtf_text(_read_text(path))
+    elif file_type in ('txt', 'md'):
+        text = _read_text(path)
+    else:
+        raise ValueError(f'Unsupported file type: {file_type}')
+    return text[:MAX_TEXT_CHARS]
+
+
+# ---------------------------------------------------------------------------
+# Field parsing
+# ---------------------------------------------------------------------------
+
+def _heading(line: str) -> Optional[str]:
+    key = re.sub(r'[^a-z ]', '', line.lower().replace('&', 'and')).strip()
+    if len(key) > 40:
+        return None
+    return _HEADING_SECTIONS.get(' '.join(key.split()))
+
+
+def _sections(lines: List[str]) -> Dict[str, List[str]]:
+    """Lines per section; lines before the first heading go to 'header'"""
+    sections: Dict[str, List[str]] = {'header': []}
+    current = 'header'
+    for line in lines:
+        section = _heading(line)
+        if section is not None:
+            current = section
+            sections.setdefault(current, [])
+        else:
+            sections[current].append(line)
+    return sections
+
+
+def _clean(line: str) -> str:
+    return line.strip(' \t-*•·▪●–—|:')
+
+
+def _title(header: List[str]) -> Optional[str]:
+    for line in header[:8]:
+        if '@' in line or len(line) > 80 or sum(c.isdigit() for c in line) > 4:
+            continue
+        if _ROLE_RE.search(line):
+            return _clean(line)
+    return None
+
+
+def _summary(sections: Dict[str, List[str]]) -> Optional[str]:
+    lines = sections.get('summary')
+    if not lines:
+        # No summary heading: the first sentence-like header line
+        lines = [line for line in sections['header'] if len(line.split()) >= 8 and '@' not in line][:3]
+    text = ' '.join(_clean(line) for line in lines if _clean(line))
+    return text[:1000] or None
+
+
+def _skills(lines: List[str]) -> List[str]:
+    skills: List[str] = []
+    seen = set()
+    for line in lines:
+        # "Languages: Python, Go" -> Python, Go
+        if ':' in line and len(line.split(':', 1)[0]) < 30:
+            line = line.split(':', 1)[1]
+        for item in _SKILL_SPLIT_RE.split(line):
+            skill = _clean(item)
+            if 1 < len(skill) <= 40 and skill.lower() not in seen:
+                seen.add(skill.lower())
+                skills.append(skill)
+                if len(skills) == MAX_SKILLS:
+                    return skills
+    return skills
+
+
+def _experience(lines: List[str]) -> List[Dict]:
+    entries: List[Dict] = []
+    previous = ''
+    for line in lines:
+        match = _DATE_RANGE_RE.search(line)
+        if match:
+            title = _clean(line[:match.start()] + ' ' + line[match.end():]) or _clean(previous)
+            entries.append({'title': title[:200] or None, 'start': match.group('start'),
+                            'end': match.group('end')})
+            if len(entries) == MAX_ENTRIES:
+                break
+        previous = line
+    return entries
+
+
+def _education(lines: List[str]) -> List[Dict]:
+    entries: List[Dict] = []
+    for line in lines:
+        if _DEGREE_RE.search(line):
+            years = _YEAR_RE.findall(line)
+            entries.append({'degree': _clean(line)[:200], 'year': int(years[-1]) if years else None})
+            if len(entries) == MAX_ENTRIES:
+                break
+    return entries
+
+
+def parse_fields(text: str) -> Dict:
+    """Title, summary, skills, experience and education found in resume text"""
+    lines = [' '.join(line.split()) for line in text.splitlines()]
+    sections = _sections([line for line in lines if line])
+    return {
+        'parsed_title': _title(sections['header']),
+        'parsed_summary': _summary(sections),
+        'parsed_skills': _skills(sections.get('skills', [])),
+        'parsed_experience': _experience(sections.get('experience', [])),
+        'parsed_education': _education(sections.get('education', []))
+    }
+
+
+def parse_resume_file(resume_id: int, path: str, file_type: str) -> List[Dict]:
+    """
+    Parse pool entry point: extract and parse one stored resume
+
+    Returns:
+        [{'resume_id', 'parse_status' ('parsed' | 'failed'), 'parse_error', parsed fields...}]
+        (a list, as parse_pool.iter_parsed expects)
+    """
+    try:
+        text = extract_text(path, file_type)
+        if not text.strip():
+            raise ValueError('No text could be extracted (scanned or image-only file?)')
+        result = parse_fields(text)
+        result.update(resume_id=resume_id, parse_status='parsed', parse_error=None)
+    except FileNotFoundError:
+        result = {'resume_id': resume_id, 'parse_status': 'failed', 'parse_error': 'Stored file is missing'}
+    except Exception as e:
+        result = {'resume_id': resume_id, 'parse_status': 'failed', 'parse_error': f'{type(e).__name__}: {e}'[:500]}
+    return [result]
@@ -0,0 +1,259 @@
+"""
+Resume upload storage and the background parsing pipeline.
+Multipart uploads stream straight into files under RESUME_UPLOAD_DIR. Werkzeug
+hands the parser a file on disk for each part, so a request never holds a
+whole resume in memory, and oversized bodies are cut off with 413. Each stored
+resume is recorded as parse_status 'pending'.
+
+A background worker leases pending resumes in batches. It runs text
+extraction and field parsing (resume_parser.py) on the shared parse process
+pool, then writes the results back with one executemany per batch. Request
+threads never parse. Re-parsing (e.g. backfilling after a parser change) is
+a single UPDATE that puts resumes back to 'pending'. Clients poll
+/api/resumes/<id> for the outcome. A lease older than RESUME_PARSE_LEASE
+seconds (a worker that died mid-batch) is taken over by the next scan.
+"""
+
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, bindparam, func, or_, select, update
+from werkzeug.formparser import parse_form_data
+from werkzeug.utils import secure_filename
+from models_fixed import db, Resume
+from background import BackgroundWorker
+from parse_pool import iter_parsed
+from resume_parser import SUPPORTED_TYPES, file_type_for, parse_resume_file
+
+RESUME_UPLOAD_DIR = os.getenv('RESUME_UPLOAD_DIR',
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'resumes'))
+RESUME_MAX_BYTES = int(os.getenv('RESUME_MAX_BYTES', str(10 * 1024 * 1024)))
+# Resumes leased per worker batch
+RESUME_PARSE_BATCH = int(os.getenv('RESUME_PARSE_BATCH', '32'))
+# Seconds a worker owns a leased batch before others may take it over
+RESUME_PARSE_LEASE = int(os.getenv('RESUME_PARSE_LEASE', '600'))
+# Room for the non-file form fields on top of RESUME_MAX_BYTES
+_FORM_OVERHEAD = 64 * 1024
+
+
+class UploadError(ValueError):
+    """Invalid resume upload (HTTP 400)"""
+
+
+class StoredUpload:
+    """An uploaded file in the upload directory (temp_path follows it when store_resume moves it)"""
+
+    def __init__(self, temp_path: str, filename: str, file_type: str):
+        self.temp_path = temp_path
+        self.filename = filename
+        self.file_type = file_type
+        self.size = os.path.getsize(temp_path)
+
+    def discard(self) -> None:
+        try:
+            os.unlink(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+
+def _storage_path(resume_id: int, file_type: str) -> str:
+    # 1000 resumes per directory keeps listings manageable at backfill scale
+    return os.path.join(f'{resume_id // 1000:05d}', f'{resume_id}-{uuid.uuid4().hex[:8]}.{file_type}')
+
+
+def absolute_path(storage_path: str) -> str:
+    return os.path.join(RESUME_UPLOAD_DIR, storage_path)
+
+
+def receive_upload(environ, field: str = 'file') -> Tuple[Dict, StoredUpload]:
+    """
+    Stream a multipart request body to disk
+
+    Args:
+        environ: WSGI environ of a request whose body has not been read
+        field: Form field holding the resume file
+
+    Returns:
+        (form fields, the stored upload)
+
+    Raises:
+        UploadError: No file, or a file type resume_parser cannot read
+        RequestEntityTooLarge: Body larger than RESUME_MAX_BYTES (plus form fields)
+    """
+    os.makedirs(RESUME_UPLOAD_DIR, exist_ok=True)
+    created: List[str] = []
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        f = tempfile.NamedTemporaryFile('wb+', dir=RESUME_UPLOAD_DIR, prefix='.upload-', delete=False)
+        created.append(f.name)
+        return f
+
+    try:
+        _, form, files = parse_form_data(environ, stream_factory=stream_factory,
+                                         max_content_length=RESUME_MAX_BYTES + _FORM_OVERHEAD, silent=False)
+        upload = files.get(field)
+        if upload is None or not upload.filename:
+            raise UploadError(f'Multipart field "{field}" with a file is required')
+        file_type = file_type_for(upload.filename)
+        if file_type is None:
+            raise UploadError(f'Unsupported file type; expected one of {", ".join(SUPPORTED_TYPES)}')
+        for f in files.values():
+            f.stream.close()
+        stored = StoredUpload(upload.stream.name, secure_filename(upload.filename) or f'resume.{file_type}',
+                              file_type)
+        if stored.size > RESUME_MAX_BYTES:
+            raise UploadError(f'File exceeds {RESUME_MAX_BYTES} bytes')
+    except BaseException:
+        for path in created:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        raise
+    for path in created:
+        if path != stored.temp_path:
+            os.unlink(path)
+    return form.to_dict(), stored
+
+
+def store_resume(candidate_id: int, upload: StoredUpload) -> Resume:
+    """
+    Record an upload as a pending resume and move the file into place (caller commits)
+
+    If the commit fails, upload.discard() removes the moved file.
+    """
+    resume = Resume(candidate_id=candidate_id, file_name=upload.filename, file_type=upload.file_type,
+                    file_size=upload.size, parse_status='pending')
+    db.session.add(resume)
+    db.session.flush()
+    resume.storage_path = _storage_path(resume.resume_id, upload.file_type)
+    target = absolute_path(resume.storage_path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(upload.temp_path, target)
+    upload.temp_path = target
+    return resume
+
+
+def request_reparse(resume_ids: Optional[List[int]] = None, candidate_id: Optional[int] = None,
+                    failed_only: bool = False) -> int:
+    """
+    Queue stored resumes for (re-)parsing with one UPDATE (caller commits)
+
+    Resumes being parsed right now are left alone.
+
+    Returns:
+        Number of resumes queued
+    """
+    query = update(Resume).where(Resume.storage_path.isnot(None), Resume.parse_status != 'parsing')
+    if resume_ids is not None:
+        query = query.where(Resume.resume_id.in_(resume_ids))
+    if candidate_id is not None:
+        query = query.where(Resume.candidate_id == candidate_id)
+    if failed_only:
+        query = query.where(Resume.parse_status == 'failed')
+    result = db.session.execute(
+        query.values(parse_status='pending', parse_error=None, parse_started_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def status_counts() -> Dict[str, int]:
+    """Resumes per parse_status (files only)"""
+    rows = db.session.execute(
+        select(Resume.parse_status, func.count()).where(Resume.parse_status.isnot(None))
+        .group_by(Resume.parse_status)
+    ).all()
+    return {status: count for status, count in rows}
+
+
+def _claim_batch(batch_size: int) -> Tuple[datetime, List[Tuple[int, str, str]]]:
+    """
+    Lease up to batch_size pending (or abandoned) resumes
+
+    The lease timestamp doubles as the claim token: rows another worker leased
+    in between keep their own timestamp and are not returned.
+    """
+    now = datetime.utcnow()
+    claimable = or_(Resume.parse_status == 'pending',
+                    and_(Resume.parse_status == 'parsing',
+                         Resume.parse_started_at < now - timedelta(seconds=RESUME_PARSE_LEASE)))
+    ids = list(db.session.scalars(
+        select(Resume.resume_id).where(claimable).order_by(Resume.resume_id).limit(batch_size)
+    ))
+    if not ids:
+        return now, []
+    db.session.execute(
+        update(Resume).where(Resume.resume_id.in_(ids), claimable)
+        .values(parse_status='parsing', parse_started_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    claimed = db.session.execute(
+        select(Resume.resume_id, Resume.storage_path, Resume.file_type)
+        .where(Resume.resume_id.in_(ids), Resume.parse_status == 'parsing', Resume.parse_started_at == now)
+    ).all()
+    db.session.commit()
+    return now, [tuple(row) for row in claimed]
+
+
+def parse_pending(batch_size: int = RESUME_PARSE_BATCH) -> int:
+    """
+    Parse one leased batch of resumes in the parse pool and store the results
+
+    Returns:
+        Number of resumes parsed (successfully or not)
+    """
+    lease, claimed = _claim_batch(batch_size)
+    if not claimed:
+        return 0
+    pages = ((resume_id, absolute_path(path), file_type) for resume_id, path, file_type in claimed)
+    results = list(iter_parsed(pages, parse_resume_file, chunk_size=4, min_pages=1))
+
+    now = datetime.utcnow()
+    table = Resume.__table__
+    # Only rows still under this lease: a re-parse request or takeover wins
+    db.session.execute(
+        table.update().where(table.c.resume_id == bindparam('b_resume_id'),
+                             table.c.parse_started_at == lease).values(
+            parse_status=bindparam('b_parse_status'),
+            parse_error=bindparam('b_parse_error'),
+            parsed_title=bindparam('b_parsed_title'),
+            parsed_summary=bindparam('b_parsed_summary'),
+            parsed_skills=bindparam('b_parsed_skills', type_=table.c.parsed_skills.type),
+            parsed_experience=bindparam('b_parsed_experience', type_=table.c.parsed_experience.type),
+            parsed_education=bindparam('b_parsed_education', type_=table.c.parsed_education.type),
+            parsed_at=now
+        ),
+        [
+            {
+                'b_resume_id': r['resume_id'],
+                'b_parse_status': r['parse_status'],
+                'b_parse_error': r['parse_error'],
+                'b_parsed_title': r.get('parsed_title'),
+                'b_parsed_summary': r.get('parsed_summary'),
+                'b_parsed_skills': r.get('parsed_skills'),
+                'b_parsed_experience': r.get('parsed_experience'),
+                'b_parsed_education': r.get('parsed_education')
+            }
+            for r in results
+        ]
+    )
+    db.session.commit()
+    return len(results)
+
+
+class ResumeParseWorker(BackgroundWorker):
+    """Daemon thread feeding pending resumes to the parse pool"""
+
+    name = 'resume-parser'
+    # Woken on uploads and re-parse requests; the timer catches other processes'
+    idle_sleep = 15.0
+
+    def run_once(self) -> bool:
+        return parse_pending() > 0
+
+
+resume_parser_worker = ResumeParseWorker()
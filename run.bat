@@ -29,12 +29,17 @@ echo Initializing database...
 python init_db.py
 
 echo.
-echo Starting Flask server...
+echo Starting server...
 echo Open http://localhost:5000 in your browser
 echo Press Ctrl+C to stop the server
 echo.
 
-python app.py
+rem "run.bat dev" starts the Flask debug server instead of the production server
+if /i "%1"=="dev" (
+    python app.py
+) else (
+    python serve.py
+)
 
 pause
 
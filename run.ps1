@@ -36,10 +36,15 @@ Write-Host "Initializing database..." -ForegroundColor Yellow
 python init_db.py
 
 Write-Host ""
-Write-Host "Starting Flask server..." -ForegroundColor Green
+Write-Host "Starting server..." -ForegroundColor Green
 Write-Host "Open http://localhost:5000 in your browser" -ForegroundColor Cyan
 Write-Host "Press Ctrl+C to stop the server" -ForegroundColor Yellow
 Write-Host ""
 
-python app.py
+# ".\run.ps1 dev" starts the Flask debug server instead of the production server
+if ($args[0] -eq "dev") {
+    python app.py
+} else {
+    python serve.py
+}
 
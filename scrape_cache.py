@@ -0,0 +1,202 @@
+"""
+Scrape result cache for Firecrawl page scrapes.
+Entries are keyed by normalized URL, expire after a TTL and are evicted LRU once
+the cache is full. An optional SQLite file keeps entries across restarts. Each
+entry stores a hash of the scraped content so a re-scrape of an unchanged page
+can skip parsing, and the employers whose import of that content is recorded so
+it can skip importing it for them again.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+SCRAPE_CACHE_TTL = int(os.getenv('SCRAPE_CACHE_TTL', '3600'))
+SCRAPE_CACHE_SIZE = int(os.getenv('SCRAPE_CACHE_SIZE', '1024'))
+SCRAPE_CACHE_PATH = os.getenv('SCRAPE_CACHE_PATH', '')
+
+# Query parameters that never change page content
+_TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid')
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so equivalent spellings share one cache entry
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the query string and strips a trailing slash.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'http').lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+    path = parts.path.rstrip('/') or '/'
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def content_hash(content: str) -> str:
+    """Stable hash of scraped page content"""
+    return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
+
+
+class ScrapeCache:
+    """Thread-safe TTL + LRU cache of scrape results with optional SQLite backing"""
+
+    def __init__(self, max_entries: int = SCRAPE_CACHE_SIZE, ttl: int = SCRAPE_CACHE_TTL,
+                 db_path: Optional[str] = SCRAPE_CACHE_PATH or None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self._entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS scrape_cache (
+                        url_key TEXT PRIMARY KEY,
+                        content_hash TEXT NOT NULL,
+                        result_json TEXT NOT NULL,
+                        fetched_at REAL NOT NULL,
+                        imported_by TEXT NOT NULL DEFAULT '[]'
+                    )
+                    """
+                )
+                columns = {row[1] for row in conn.execute('PRAGMA table_info(scrape_cache)')}
+                if 'imported_by' not in columns:
+                    # Cache files from before per-employer import tracking
+                    conn.execute("ALTER TABLE scrape_cache ADD COLUMN imported_by TEXT NOT NULL DEFAULT '[]'")
+                conn.execute('CREATE INDEX IF NOT EXISTS ix_scrape_cache_fetched_at ON scrape_cache (fetched_at)')
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _load(self, key: str) -> Optional[Dict]:
+        if not self.db_path:
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT content_hash, result_json, fetched_at, imported_by FROM scrape_cache WHERE url_key = ?',
+                (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            'content_hash': row[0],
+            'result': json.loads(row[1]),
+            'fetched_at': row[2],
+            'imported_by': json.loads(row[3])
+        }
+
+    def _store(self, key: str, entry: Dict) -> None:
+        if not self.db_path:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO scrape_cache (url_key, content_hash, result_json, fetched_at, imported_by) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, entry['content_hash'], json.dumps(entry['result']), entry['fetched_at'],
+                 json.dumps(entry['imported_by']))
+            )
+            # Keep the on-disk store bounded too: drop the oldest entries beyond 10x the memory size
+            conn.execute(
+                'DELETE FROM scrape_cache WHERE url_key IN ('
+                'SELECT url_key FROM scrape_cache ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries * 10,)
+            )
+
+    def _remember(self, key: str, entry: Dict) -> None:
+        """Insert into the in-memory LRU (caller holds the lock)"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """
+        Return the cached entry for a URL, fresh or stale, or None
+
+        The returned dict has content_hash, result, fetched_at, imported_by
+        (employer IDs) and a computed 'fresh' flag (younger than the TTL).
+        """
+        key = normalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            entry = self._load(key)
+            if entry is None:
+                return None
+            with self._lock:
+                self._remember(key, entry)
+        return dict(entry, imported_by=list(entry['imported_by']),
+                    fresh=(time.time() - entry['fetched_at']) < self.ttl)
+
+    def put(self, url: str, page_hash: str, result: Dict, imported_by: Iterable[int] = ()) -> None:
+        """Store (or refresh) the scrape result for a URL"""
+        key = normalize_url(url)
+        entry = {
+            'content_hash': page_hash,
+            'result': result,
+            'fetched_at': time.time(),
+            'imported_by': sorted(set(imported_by))
+        }
+        with self._lock:
+            self._remember(key, entry)
+        self._store(key, entry)
+
+    def mark_imported(self, url: str, employer_id: int) -> None:
+        """Record that the jobs of the cached page were imported for an employer"""
+        key = normalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and employer_id not in entry['imported_by']:
+                entry['imported_by'] = sorted(entry['imported_by'] + [employer_id])
+        if self.db_path:
+            with self._connect() as conn:
+                row = conn.execute('SELECT imported_by FROM scrape_cache WHERE url_key = ?', (key,)).fetchone()
+                if row is not None:
+                    imported_by = sorted(set(json.loads(row[0])) | {employer_id})
+                    conn.execute('UPDATE scrape_cache SET imported_by = ? WHERE url_key = ?',
+                                 (json.dumps(imported_by), key))
+
+    def invalidate(self, url: str) -> None:
+        """Drop a URL from the cache"""
+        key = normalize_url(url)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute('DELETE FROM scrape_cache WHERE url_key = ?', (key,))
+
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute('DELETE FROM scrape_cache')
+
+
+# Process-wide cache used by firecrawl_utils.scrape_job_page
+scrape_cache = ScrapeCache()
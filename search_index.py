@@ -0,0 +1,190 @@
+"""
+Full-text search index for job postings.
+Keeps an SQLite FTS5 table (or a Postgres tsvector column) in sync with the jobs
+table so keyword searches can use a ranked index instead of LIKE scans.
+"""
+
+import re
+from typing import List, Optional
+from sqlalchemy import text, table, column
+
+# External-content FTS5 table mirroring jobs.title / jobs.description
+JOBS_FTS_TABLE = 'jobs_fts'
+
+# Column weights for bm25(): title matches count more than description matches
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+_TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+_SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {JOBS_FTS_TABLE} USING fts5(
+        title, description,
+        content='jobs', content_rowid='job_id',
+        tokenize='porter unicode61', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {JOBS_FTS_TABLE}_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO {JOBS_FTS_TABLE}(rowid, title, description)
+        VALUES (new.job_id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {JOBS_FTS_TABLE}_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO {JOBS_FTS_TABLE}({JOBS_FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.job_id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {JOBS_FTS_TABLE}_au AFTER UPDATE OF title, description ON jobs BEGIN
+        INSERT INTO {JOBS_FTS_TABLE}({JOBS_FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.job_id, old.title, old.description);
+        INSERT INTO {JOBS_FTS_TABLE}(rowid, title, description)
+        VALUES (new.job_id, new.title, new.description);
+    END
+    """,
+]
+
+_POSTGRES_DDL = [
+    """
+    ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_jobs_search_vector ON jobs USING GIN (search_vector)",
+]
+
+# Cached per-dialect availability; None means "not checked yet"
+_index_available: Optional[bool] = None
+
+
+def tokenize_query(keywords: str) -> List[str]:
+    """Split a free-text search string into lowercase word terms"""
+    return [t.lower() for t in _TERM_PATTERN.findall(keywords or '')]
+
+
+def _fts5_match_expression(terms: List[str]) -> str:
+    """Build an FTS5 MATCH expression: every term required, each as a prefix"""
+    return ' AND '.join(f'"{t}"*' for t in terms)
+
+
+def _tsquery_expression(terms: List[str]) -> str:
+    """Build a Postgres to_tsquery expression with prefix matching"""
+    return ' & '.join(f'{t}:*' for t in terms)
+
+
+def ensure_job_search_index(db) -> bool:
+    """
+    Create the full-text index for jobs if it does not exist yet.
+    Safe to call on every startup; an existing index is left untouched.
+
+    Args:
+        db: The Flask-SQLAlchemy instance (must be inside an app context)
+
+    Returns:
+        True if a full-text index is available for the current database
+    """
+    global _index_available
+    dialect = db.engine.dialect.name
+
+    try:
+        with db.engine.begin() as conn:
+            if dialect == 'sqlite':
+                existed = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"),
+                    {'name': JOBS_FTS_TABLE}
+                ).first() is not None
+                for ddl in _SQLITE_DDL:
+                    conn.execute(text(ddl))
+                if not existed:
+                    # Backfill rows that were inserted before the index existed
+                    conn.execute(text(f"INSERT INTO {JOBS_FTS_TABLE}({JOBS_FTS_TABLE}) VALUES ('rebuild')"))
+            elif dialect == 'postgresql':
+                for ddl in _POSTGRES_DDL:
+                    conn.execute(text(ddl))
+            else:
+                _index_available = False
+                return False
+        _index_available = True
+    except Exception:
+        # e.g. SQLite compiled without FTS5 - fall back to LIKE matching
+        _index_available = False
+
+    return _index_available
+
+
+def rebuild_job_search_index(db) -> None:
+    """Rebuild the SQLite FTS5 index from the jobs table (no-op elsewhere)"""
+    if db.engine.dialect.name == 'sqlite':
+        with db.engine.begin() as conn:
+            conn.execute(text(f"INSERT INTO {JOBS_FTS_TABLE}({JOBS_FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def search_available(db) -> bool:
+    """Check (once) whether the full-text index exists in the current database"""
+    global _index_available
+    if _index_available is None:
+        dialect = db.engine.dialect.name
+        with db.engine.connect() as conn:
+            if dialect == 'sqlite':
+                _index_available = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"),
+                    {'name': JOBS_FTS_TABLE}
+                ).first() is not None
+            elif dialect == 'postgresql':
+                _index_available = conn.execute(
+                    text("SELECT 1 FROM information_schema.columns "
+                         "WHERE table_name='jobs' AND column_name='search_vector'")
+                ).first() is not None
+            else:
+                _index_available = False
+    return _index_available
+
+
+def apply_job_search(query, db, job_model, keywords: str):
+    """
+    Restrict a Job query to postings matching the keywords, best matches first.
+
+    All terms must match (in title or description) and each term also matches
+    as a prefix, so "pyth eng" finds "Python Engineer". Results are ordered by
+    BM25 on SQLite and ts_rank_cd on Postgres. Without an index this falls back
+    to the old substring filter.
+
+    Args:
+        query: A SQLAlchemy query over job_model
+        db: The Flask-SQLAlchemy instance
+        job_model: The Job model class
+        keywords: Raw search string from the request
+
+    Returns:
+        The filtered (and ranked) query
+    """
+    terms = tokenize_query(keywords)
+    if not terms:
+        return query
+
+    if not search_available(db):
+        for term in terms:
+            query = query.filter(
+                job_model.title.contains(term) | job_model.description.contains(term)
+            )
+        return query
+
+    if db.engine.dialect.name == 'postgresql':
+        tsquery = _tsquery_expression(terms)
+        return query.filter(
+            text("jobs.search_vector @@ to_tsquery('english', :tsq)").bindparams(tsq=tsquery)
+        ).order_by(
+            text("ts_rank_cd(jobs.search_vector, to_tsquery('english', :tsq_rank)) DESC").bindparams(tsq_rank=tsquery)
+        )
+
+    fts = table(JOBS_FTS_TABLE, column('rowid'))
+    return query.join(fts, fts.c.rowid == job_model.job_id).filter(
+        text(f"{JOBS_FTS_TABLE} MATCH :fts_match").bindparams(fts_match=_fts5_match_expression(terms))
+    ).order_by(
+        text(f"bm25({JOBS_FTS_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT})")
+    )
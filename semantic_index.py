@@ -0,0 +1,337 @@
+"""
+Offline semantic job search.
+Job titles and descriptions are embedded with a stateless hashing vectorizer.
+Unigrams and bigrams get sublinear TF weights, title terms count double, and
+each feature is projected onto 128 dimensions through the sign bits of its
+hash (a random projection). Nothing is fitted to the corpus, so new and updated
+jobs are embedded on their own without retraining, and no network access is
+needed.
+
+Vectors are stored in job_embeddings. The ANN index is a multi-table
+random-hyperplane LSH on the vectors' sign bits, stored in
+job_embedding_buckets: 16 tables keyed by 12 sign bits each. A query probes
+its own bucket plus the buckets reached by flipping its least certain bits,
+then re-ranks the candidates by exact cosine similarity. A background worker
+embeds jobs that are new, updated, or indexed under an older model version.
+
+NumPy is optional and only speeds up embedding and re-ranking.
+"""
+
+import hashlib
+import math
+import os
+import random
+import re
+from array import array
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, delete, desc, event, func, insert, or_, select
+from sqlalchemy.orm import Session
+from models_fixed import db, Candidate, Job, JobEmbedding, JobEmbeddingBucket, Resume
+from background import BackgroundWorker
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Bump when the vectorizer changes; older embeddings are re-indexed
+MODEL_VERSION = 1
+EMBEDDING_DIM = 128
+LSH_TABLES = 16
+LSH_BITS = 12
+# Embedding dimensions whose signs make up each table's bucket key
+_TABLE_DIMS = [random.Random(t).sample(range(EMBEDDING_DIM), LSH_BITS) for t in range(LSH_TABLES)]
+# Extra buckets probed per table (one per flipped low-margin bit)
+PROBE_BITS = int(os.getenv('SEMANTIC_PROBE_BITS', '3'))
+# Candidates re-ranked exactly per query, most LSH hits first
+MAX_CANDIDATES = int(os.getenv('SEMANTIC_MAX_CANDIDATES', '2000'))
+# Indexes up to this size are scanned exactly when the LSH probe finds too few
+# candidates; larger ones are probed again with every bit flipped
+EXACT_SCAN_LIMIT = 20000
+INDEX_BATCH_SIZE = 500
+TITLE_WEIGHT = 2.0
+DEFAULT_TOP_K = 10
+MAX_TOP_K = 100
+
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+_STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or our that the this to we will with you your'.split()
+)
+_CHANGED_KEY = 'semantic_jobs_changed'
+
+
+def _tokens(text: Optional[str]) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or '').lower()) if t not in _STOPWORDS]
+
+
+def _add_features(counts: Counter, text: Optional[str], weight: float) -> None:
+    words = _tokens(text)
+    for word in words:
+        counts[word] += weight
+    for first, second in zip(words, words[1:]):
+        counts[f'{first} {second}'] += weight
+
+
+@lru_cache(maxsize=65536)
+def _feature_digest(feature: str) -> bytes:
+    """128 pseudo-random sign bits for a feature"""
+    return hashlib.blake2b(feature.encode('utf-8'), digest_size=EMBEDDING_DIM // 8).digest()
+
+
+def embed_text(title: Optional[str], body: Optional[str]) -> Optional[List[float]]:
+    """
+    L2-normalized embedding of a title and body, or None if neither has terms
+    """
+    counts: Counter = Counter()
+    _add_features(counts, title, TITLE_WEIGHT)
+    _add_features(counts, body, 1.0)
+    if not counts:
+        return None
+    features = list(counts)
+    weights = [1.0 + math.log(counts[f]) for f in features]
+
+    if np is not None:
+        digests = np.frombuffer(b''.join(_feature_digest(f) for f in features), dtype=np.uint8)
+        bits = np.unpackbits(digests.reshape(len(features), -1), axis=1, bitorder='little')
+        vector = np.asarray(weights) @ (bits.astype(np.float64) * 2.0 - 1.0)
+        norm = float(np.linalg.norm(vector))
+        return (vector / norm).tolist() if norm else None
+
+    vector = [0.0] * EMBEDDING_DIM
+    for feature, weight in zip(features, weights):
+        bits = int.from_bytes(_feature_digest(feature), 'little')
+        for i in range(EMBEDDING_DIM):
+            vector[i] += weight if (bits >> i) & 1 else -weight
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else None
+
+
+def encode_vector(vector: Sequence[float]) -> bytes:
+    return array('f', vector).tobytes()
+
+
+def decode_vector(blob: bytes) -> array:
+    values = array('f')
+    values.frombytes(blob)
+    return values
+
+
+def lsh_keys(vector: Sequence[float]) -> List[int]:
+    """Bucket key per table: the sign bits of that table's slice of the vector"""
+    keys = []
+    for dims in _TABLE_DIMS:
+        key = 0
+        for j, dim in enumerate(dims):
+            if vector[dim] > 0:
+                key |= 1 << j
+        keys.append(key)
+    return keys
+
+
+def probe_keys(vector: Sequence[float], probe_bits: int = PROBE_BITS) -> List[List[int]]:
+    """Keys to probe per table: the query's bucket plus its least certain bit flips"""
+    probes = []
+    for dims, key in zip(_TABLE_DIMS, lsh_keys(vector)):
+        uncertain = sorted(range(LSH_BITS), key=lambda j: abs(vector[dims[j]]))[:probe_bits]
+        probes.append([key] + [key ^ (1 << j) for j in uncertain])
+    return probes
+
+
+def _pending_jobs_query(limit: int):
+    return (select(Job.job_id, Job.title, Job.description)
+            .outerjoin(JobEmbedding, JobEmbedding.job_id == Job.job_id)
+            .where(or_(JobEmbedding.job_id.is_(None),
+                       JobEmbedding.model_version != MODEL_VERSION,
+                       JobEmbedding.indexed_at < Job.updated_at))
+            .limit(limit))
+
+
+def index_jobs(jobs: Iterable[Tuple[int, Optional[str], Optional[str]]]) -> int:
+    """
+    (Re)index (job_id, title, description) rows within the current transaction
+
+    Jobs without any terms get a zero vector and no buckets, so they are
+    recorded as indexed but never returned.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return 0
+    ids = [job_id for job_id, _, _ in jobs]
+    db.session.execute(delete(JobEmbeddingBucket).where(JobEmbeddingBucket.job_id.in_(ids)))
+    db.session.execute(delete(JobEmbedding).where(JobEmbedding.job_id.in_(ids)))
+    now = datetime.utcnow()
+    embeddings = []
+    buckets = []
+    for job_id, title, description in jobs:
+        vector = embed_text(title, description)
+        embeddings.append({
+            'job_id': job_id,
+            'vector': encode_vector(vector or [0.0] * EMBEDDING_DIM),
+            'model_version': MODEL_VERSION,
+            'indexed_at': now
+        })
+        if vector:
+            buckets.extend(
+                {'table_no': t, 'bucket': key, 'job_id': job_id}
+                for t, key in enumerate(lsh_keys(vector))
+            )
+    db.session.execute(insert(JobEmbedding.__table__), embeddings)
+    if buckets:
+        db.session.execute(insert(JobEmbeddingBucket.__table__), buckets)
+    return len(jobs)
+
+
+def index_pending_jobs(batch_size: int = INDEX_BATCH_SIZE) -> int:
+    """Index one batch of new, updated or outdated jobs; returns how many were indexed"""
+    count = index_jobs(db.session.execute(_pending_jobs_query(batch_size)).all())
+    if count:
+        db.session.commit()
+    return count
+
+
+def _candidate_ids(vector: Sequence[float], limit: int = MAX_CANDIDATES,
+                   probe_bits: int = PROBE_BITS) -> List[int]:
+    """Jobs sharing a probed bucket with the query, most shared tables first"""
+    conditions = [
+        and_(JobEmbeddingBucket.table_no == t, JobEmbeddingBucket.bucket.in_(keys))
+        for t, keys in enumerate(probe_keys(vector, probe_bits))
+    ]
+    hits = func.count().label('hits')
+    return list(db.session.execute(
+        select(JobEmbeddingBucket.job_id, hits)
+        .where(or_(*conditions))
+        .group_by(JobEmbeddingBucket.job_id)
+        .order_by(desc(hits))
+        .limit(limit)
+    ).scalars())
+
+
+def _rank(vector: Sequence[float], rows: List[Tuple[int, bytes]], k: int) -> List[Tuple[int, float]]:
+    if not rows:
+        return []
+    if np is not None:
+        matrix = np.frombuffer(b''.join(blob for _, blob in rows), dtype=np.float32).reshape(len(rows), -1)
+        scores = (matrix @ np.asarray(vector, dtype=np.float32)).tolist()
+    else:
+        scores = [sum(a * b for a, b in zip(decode_vector(blob), vector)) for _, blob in rows]
+    ranked = sorted(zip((job_id for job_id, _ in rows), scores), key=lambda pair: (-pair[1], pair[0]))
+    return [(job_id, score) for job_id, score in ranked if score > 0][:k]
+
+
+def search(vector: Sequence[float], k: int = DEFAULT_TOP_K,
+           exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+    """
+    Approximate top-k active jobs by cosine similarity to a query vector
+
+    Returns:
+        (job_id, similarity) pairs, most similar first
+    """
+    excluded = set(exclude)
+    candidates = [job_id for job_id in _candidate_ids(vector) if job_id not in excluded]
+    query = (select(JobEmbedding.job_id, JobEmbedding.vector)
+             .join(Job, Job.job_id == JobEmbedding.job_id)
+             .where(Job.is_active.is_(True), JobEmbedding.model_version == MODEL_VERSION))
+    if len(candidates) < k:
+        indexed = db.session.execute(
+            select(func.count()).select_from(JobEmbedding).where(JobEmbedding.model_version == MODEL_VERSION)
+        ).scalar()
+        if indexed <= EXACT_SCAN_LIMIT:
+            # Too few bucket neighbours in a small index: scan all of it exactly
+            candidates = None
+        else:
+            # Large index: widen the probe, keeping the neighbours already found
+            wider = _candidate_ids(vector, probe_bits=LSH_BITS)
+            candidates = list(dict.fromkeys(candidates + [job_id for job_id in wider if job_id not in excluded]))
+    if candidates is not None:
+        query = query.where(JobEmbedding.job_id.in_(candidates))
+    rows = db.session.execute(query).all()
+    rows = [(job_id, blob) for job_id, blob in rows if job_id not in excluded]
+    return _rank(vector, rows, k)
+
+
+def job_vector(job: Job) -> Optional[List[float]]:
+    """A job's stored embedding, or a fresh one if it is not indexed yet"""
+    stored = db.session.get(JobEmbedding, job.job_id)
+    if stored is not None and stored.model_version == MODEL_VERSION:
+        vector = list(decode_vector(stored.vector))
+        return vector if any(vector) else None
+    return embed_text(job.title, job.description)
+
+
+def candidate_vector(candidate: Candidate) -> Optional[List[float]]:
+    """Embedding of a candidate's headline, summary and parsed resumes"""
+    resumes = Resume.query.filter_by(candidate_id=candidate.candidate_id).all()
+    title = ' '.join(filter(None, [candidate.headline] + [r.parsed_title for r in resumes]))
+    body = '\n'.join(filter(None, [candidate.summary] + [r.parsed_summary for r in resumes]))
+    return embed_text(title, body)
+
+
+def similar_jobs(job: Job, k: int = DEFAULT_TOP_K) -> List[Dict]:
+    vector = job_vector(job)
+    return _with_jobs(search(vector, k, exclude=[job.job_id])) if vector else []
+
+
+def recommended_jobs(candidate: Candidate, k: int = DEFAULT_TOP_K) -> List[Dict]:
+    vector = candidate_vector(candidate)
+    return _with_jobs(search(vector, k)) if vector else []
+
+
+def _with_jobs(ranked: List[Tuple[int, float]]) -> List[Dict]:
+    jobs = {j.job_id: j for j in Job.query.filter(Job.job_id.in_([job_id for job_id, _ in ranked]))}
+    return [
+        dict(jobs[job_id].to_dict(), similarity=round(score, 4))
+        for job_id, score in ranked if job_id in jobs
+    ]
+
+
+def parse_top_k(value: Optional[str]) -> int:
+    """Parse a top_k query parameter, clamped to MAX_TOP_K"""
+    if not value:
+        return DEFAULT_TOP_K
+    try:
+        k = int(value)
+    except ValueError:
+        raise ValueError('top_k must be an integer')
+    return max(1, min(k, MAX_TOP_K))
+
+
+@event.listens_for(Session, 'before_flush')
+def _note_job_changes(session, flush_context, instances) -> None:
+    if any(isinstance(obj, Job) for obj in (*session.new, *session.dirty)):
+        session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _note_bulk_job_writes(orm_execute_state) -> None:
+    """Bulk INSERT/UPDATE statements on jobs (e.g. job_import) bypass the flush"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update:
+        if getattr(orm_execute_state.statement, 'table', None) is Job.__table__:
+            orm_execute_state.session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_indexer(session) -> None:
+    if session.info.pop(_CHANGED_KEY, False):
+        semantic_indexer.wake()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_job_changes(session, previous_transaction) -> None:
+    session.info.pop(_CHANGED_KEY, None)
+
+
+class SemanticIndexWorker(BackgroundWorker):
+    """Daemon thread that keeps job_embeddings in step with the jobs table"""
+
+    name = 'semantic-indexer'
+    # Woken on job writes; the timer only catches writes from other processes
+    idle_sleep = 30.0
+
+    def run_once(self) -> bool:
+        return index_pending_jobs() > 0
+
+
+semantic_indexer = SemanticIndexWorker()
@@ -0,0 +1,28 @@
+"""
+Production server entry point.
+Serves the app with gunicorn (see gunicorn.conf.py) on Linux/macOS and with
+waitress on Windows, where gunicorn does not run. Both replace the
+single-threaded Werkzeug debug server that `python app.py` starts.
+"""
+
+import os
+import sys
+
+HOST = os.getenv('HOST', '0.0.0.0')
+PORT = int(os.getenv('PORT', '5000'))
+# Waitress request threads (gunicorn reads its own settings from gunicorn.conf.py)
+WEB_THREADS = int(os.getenv('WEB_THREADS', '16'))
+
+
+def main() -> None:
+    if os.name == 'nt':
+        from waitress import serve
+        from app import app
+        serve(app, host=HOST, port=PORT, threads=WEB_THREADS)
+        return
+    config = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+    os.execvp(sys.executable, [sys.executable, '-m', 'gunicorn', '-c', config, 'app:app'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+"""
+Skill-based matching between candidates and jobs.
+Candidate proficiencies (candidate_skills) and job requirements
+(job_required_skills) are loaded into sparse matrices, and one vectorized pass
+scores every candidate against a job, or every active job against a candidate.
+A pair's readiness score is the mean coverage of the job's required skills,
+where coverage is min(proficiency / required proficiency, 1).
+
+The top-k results carry a per-skill Matched / Gap / Surplus breakdown. They
+are persisted to ai_job_readiness_scores and ai_skill_match_details.
+
+NumPy and SciPy are in requirements.txt but optional. Without them the same
+scores are computed with plain dicts, which is fine for small datasets.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from models_fixed import (db, CandidateSkill, Job, JobRequiredSkill,
+                          JobReadinessScore, Skill, SkillMatchDetail)
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+    sparse = None
+
+DEFAULT_TOP_K = 10
+MAX_TOP_K = 100
+# Proficiency assumed when a skill row has none (also backend.sql's default requirement)
+DEFAULT_PROFICIENCY = 50
+
+MATCHED, GAP, SURPLUS = 'Matched', 'Gap', 'Surplus'
+
+
+def vectorized() -> bool:
+    """True if NumPy/SciPy are available for matrix scoring"""
+    return np is not None
+
+
+def _level(value) -> int:
+    return DEFAULT_PROFICIENCY if value is None else value
+
+
+class SparseSkillMatrix:
+    """
+    (rows x skills) proficiency matrix with id <-> index maps
+
+    Rows are candidates or jobs. Backed by a SciPy CSR matrix when available,
+    and by a dict of dicts otherwise.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[int, int, Optional[int]]],
+                 skill_ids: Optional[List[int]] = None):
+        rows: Dict[int, Dict[int, int]] = {}
+        for row_id, skill_id, value in entries:
+            rows.setdefault(row_id, {})[skill_id] = _level(value)
+        self.rows = rows
+        self.row_ids = list(rows)
+        if skill_ids is None:
+            skill_ids = sorted({s for skills in rows.values() for s in skills})
+        self.skill_ids = list(skill_ids)
+        self.skill_index = {s: i for i, s in enumerate(self.skill_ids)}
+        self.matrix = None
+        if vectorized():
+            indptr = [0]
+            indices: List[int] = []
+            data: List[int] = []
+            for row_id in self.row_ids:
+                for skill_id, value in rows[row_id].items():
+                    col = self.skill_index.get(skill_id)
+                    if col is not None:
+                        indices.append(col)
+                        data.append(value)
+                indptr.append(len(indices))
+            self.matrix = sparse.csr_matrix(
+                (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64),
+                 np.asarray(indptr, dtype=np.int64)),
+                shape=(len(self.row_ids), len(self.skill_ids))
+            )
+
+    def __len__(self) -> int:
+        return len(self.row_ids)
+
+
+def _coverage(have, need):
+    return min(have / need, 1.0) if need else 1.0
+
+
+def _coverage_array(have, need):
+    """Vectorized _coverage: a requirement of 0 is always covered"""
+    ratio = np.divide(have, need, out=np.ones_like(have), where=need > 0)
+    return np.minimum(ratio, 1.0)
+
+
+def score_rows_against_requirements(candidates: SparseSkillMatrix, required: Dict[int, int]) -> List[float]:
+    """
+    Readiness of every candidate row for one job
+
+    Args:
+        candidates: Candidate proficiencies, with columns = the job's required skills
+        required: skill_id -> required proficiency
+
+    Returns:
+        Scores (0-100) aligned with candidates.row_ids
+    """
+    if not required:
+        return [0.0] * len(candidates)
+    if candidates.matrix is not None:
+        need = np.asarray([required[s] for s in candidates.skill_ids], dtype=np.float64)
+        # Requirements of 0 are covered for every row, held or not
+        free = need <= 0
+        covered = candidates.matrix.copy()
+        covered.data = np.where(free[covered.indices], 0.0, _coverage_array(covered.data, need[covered.indices]))
+        sums = np.asarray(covered.sum(axis=1)).ravel() + np.count_nonzero(free)
+        return (sums * (100.0 / len(required))).tolist()
+    return [
+        100.0 * sum(_coverage(skills.get(s, 0), need) for s, need in required.items()) / len(required)
+        for skills in (candidates.rows[row_id] for row_id in candidates.row_ids)
+    ]
+
+
+def score_requirements_against_skills(jobs: SparseSkillMatrix, skills: Dict[int, int]) -> List[float]:
+    """
+    Readiness of one candidate for every job row
+
+    Args:
+        jobs: Job required proficiencies (one row per job)
+        skills: The candidate's skill_id -> proficiency
+
+    Returns:
+        Scores (0-100) aligned with jobs.row_ids
+    """
+    if jobs.matrix is not None:
+        have = np.asarray([skills.get(s, 0) for s in jobs.skill_ids], dtype=np.float64)
+        covered = jobs.matrix.copy()
+        covered.data = _coverage_array(have[covered.indices], covered.data)
+        counts = np.diff(covered.indptr)
+        sums = np.asarray(covered.sum(axis=1)).ravel()
+        return np.where(counts > 0, 100.0 * sums / np.maximum(counts, 1), 0.0).tolist()
+    scores = []
+    for job_id in jobs.row_ids:
+        required = jobs.rows[job_id]
+        scores.append(
+            100.0 * sum(_coverage(skills.get(s, 0), need) for s, need in required.items()) / len(required)
+            if required else 0.0
+        )
+    return scores
+
+
+def top_k(ids: List[int], scores: List[float], k: int) -> List[Tuple[int, float]]:
+    """The k highest-scoring (id, score) pairs, best first (ties by lower id)"""
+    if not ids or k <= 0:
+        return []
+    if vectorized() and len(ids) > k:
+        values = np.asarray(scores)
+        # Everything scoring at least the k-th best, so ties at the cut-off are
+        # resolved by id below rather than by partition order
+        threshold = -np.partition(-values, k - 1)[k - 1]
+        pairs = [(ids[i], scores[i]) for i in np.flatnonzero(values >= threshold)]
+    else:
+        pairs = list(zip(ids, scores))
+    pairs.sort(key=lambda pair: (-pair[1], pair[0]))
+    return pairs[:k]
+
+
+def skill_breakdown(skills: Dict[int, int], required: Dict[int, int],
+                    skill_names: Optional[Dict[int, str]] = None) -> List[Dict]:
+    """
+    Per-skill Matched / Gap / Surplus rows for one candidate-job pair
+
+    Matched: proficiency meets the requirement. Gap: below it or missing.
+    Surplus: a skill the candidate has that the job does not require.
+    """
+    names = skill_names or {}
+    details = []
+    for skill_id, need in required.items():
+        have = skills.get(skill_id)
+        name = names.get(skill_id, f'skill {skill_id}')
+        if have is None and not need:
+            status, text = MATCHED, f'{name}: not held, none required'
+        elif have is not None and have >= need:
+            status, text = MATCHED, f'{name}: proficiency {have} meets the required {need}'
+        elif have is None:
+            status, text = GAP, f'{name}: missing, required {need}'
+        else:
+            status, text = GAP, f'{name}: proficiency {have} is below the required {need}'
+        details.append({
+            'skill_id': skill_id,
+            'match_status': status,
+            'match_percentage': round(100.0 * _coverage(have or 0, need), 2),
+            'explanation_text': text
+        })
+    for skill_id, have in skills.items():
+        if skill_id not in required:
+            details.append({
+                'skill_id': skill_id,
+                'match_status': SURPLUS,
+                'match_percentage': None,
+                'explanation_text': f"{names.get(skill_id, f'skill {skill_id}')}: proficiency {have}, not required for this job"
+            })
+    return details
+
+
+def _skill_names(skill_ids: Iterable[int]) -> Dict[int, str]:
+    ids = set(skill_ids)
+    if not ids:
+        return {}
+    return dict(db.session.execute(select(Skill.skill_id, Skill.name).where(Skill.skill_id.in_(ids))).all())
+
+
+def candidate_skills(candidate_ids: Iterable[int]) -> Dict[int, Dict[int, int]]:
+    """candidate_id -> {skill_id: proficiency}"""
+    skills: Dict[int, Dict[int, int]] = {}
+    ids = list(candidate_ids)
+    if ids:
+        for candidate_id, skill_id, value in db.session.execute(
+            select(CandidateSkill.candidate_id, CandidateSkill.skill_id, CandidateSkill.proficiency)
+            .where(CandidateSkill.candidate_id.in_(ids))
+        ):
+            skills.setdefault(candidate_id, {})[skill_id] = _level(value)
+    return skills
+
+
+def job_requirements(job_ids: Iterable[int]) -> Dict[int, Dict[int, int]]:
+    """job_id -> {skill_id: required proficiency}"""
+    required: Dict[int, Dict[int, int]] = {}
+    ids = list(job_ids)
+    if ids:
+        for job_id, skill_id, value in db.session.execute(
+            select(JobRequiredSkill.job_id, JobRequiredSkill.skill_id, JobRequiredSkill.required_proficiency)
+            .where(JobRequiredSkill.job_id.in_(ids))
+        ):
+            required.setdefault(job_id, {})[skill_id] = _level(value)
+    return required
+
+
+def build_matches(pairs: List[Tuple[int, int, float]], skills: Dict[int, Dict[int, int]],
+                  required: Dict[int, Dict[int, int]]) -> List[Dict]:
+    """Match dicts with skill breakdowns for scored (candidate_id, job_id, score) triples"""
+    names = _skill_names(
+        {s for r in required.values() for s in r} | {s for c in skills.values() for s in c}
+    )
+    return [
+        {
+            'candidate_id': candidate_id,
+            'job_id': job_id,
+            'readiness_score': round(score, 2),
+            'details': skill_breakdown(skills.get(candidate_id, {}), required.get(job_id, {}), names)
+        }
+        for candidate_id, job_id, score in pairs
+    ]
+
+
+def match_candidates_for_job(job_id: int, k: int = DEFAULT_TOP_K, persist: bool = True) -> List[Dict]:
+    """
+    Rank every candidate against one job
+
+    Only candidates holding at least one required skill are loaded; all others
+    score 0.
+
+    Returns:
+        Top-k matches (candidate_id, job_id, readiness_score, details), best first
+    """
+    required = job_requirements([job_id]).get(job_id, {})
+    if not required:
+        return []
+    candidates = SparseSkillMatrix(
+        db.session.execute(
+            select(CandidateSkill.candidate_id, CandidateSkill.skill_id, CandidateSkill.proficiency)
+            .where(CandidateSkill.skill_id.in_(list(required)))
+        ),
+        skill_ids=list(required)
+    )
+    scores = score_rows_against_requirements(candidates, required)
+    best = top_k(candidates.row_ids, scores, k)
+    skills = candidate_skills(candidate_id for candidate_id, _ in best)
+    matches = build_matches([(c, job_id, s) for c, s in best], skills, {job_id: required})
+    if persist:
+        save_matches(matches)
+    return matches
+
+
+def match_jobs_for_candidate(candidate_id: int, k: int = DEFAULT_TOP_K, persist: bool = True) -> List[Dict]:
+    """
+    Rank every active job with skill requirements against one candidate
+
+    Returns:
+        Top-k matches (candidate_id, job_id, readiness_score, details), best first
+    """
+    skills = candidate_skills([candidate_id]).get(candidate_id, {})
+    jobs = SparseSkillMatrix(db.session.execute(
+        select(JobRequiredSkill.job_id, JobRequiredSkill.skill_id, JobRequiredSkill.required_proficiency)
+        .join(Job, Job.job_id == JobRequiredSkill.job_id)
+        .where(Job.is_active.is_(True))
+    ))
+    scores = score_requirements_against_skills(jobs, skills)
+    best = top_k(jobs.row_ids, scores, k)
+    required = {job_id: jobs.rows[job_id] for job_id, _ in best}
+    matches = build_matches([(candidate_id, j, s) for j, s in best], {candidate_id: skills}, required)
+    if persist:
+        save_matches(matches)
+    return matches
+
+
+def save_matches(matches: List[Dict], commit: bool = True) -> None:
+    """
+    Store matches as the current readiness score of each pair
+
+    An existing score row for a pair is updated in place and its details are
+    replaced. Adds 'score_id' to every match (after the flush when commit is
+    False, so the caller can finish its own transaction).
+    """
+    if not matches:
+        return
+    candidate_ids = {m['candidate_id'] for m in matches}
+    job_ids = {m['job_id'] for m in matches}
+    existing = {
+        (row.candidate_id, row.job_id): row
+        for row in JobReadinessScore.query.filter(
+            JobReadinessScore.candidate_id.in_(candidate_ids),
+            JobReadinessScore.job_id.in_(job_ids)
+        )
+    }
+    now = datetime.utcnow()
+    rows = []
+    for match in matches:
+        row = existing.get((match['candidate_id'], match['job_id']))
+        if row is None:
+            row = JobReadinessScore(candidate_id=match['candidate_id'], job_id=match['job_id'])
+            db.session.add(row)
+        row.readiness_score = match['readiness_score']
+        row.last_calculated = now
+        row.details = [SkillMatchDetail(**detail) for detail in match['details']]
+        rows.append(row)
+    if commit:
+        db.session.commit()
+    else:
+        db.session.flush()
+    for match, row in zip(matches, rows):
+        match['score_id'] = row.score_id
+
+
+def parse_top_k(value: Optional[str]) -> int:
+    """Parse a top_k query parameter, clamped to MAX_TOP_K"""
+    if not value:
+        return DEFAULT_TOP_K
+    try:
+        k = int(value)
+    except ValueError:
+        raise ValueError('top_k must be an integer')
+    return max(1, min(k, MAX_TOP_K))
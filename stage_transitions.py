@@ -0,0 +1,135 @@
+"""
+Bulk pipeline stage transitions.
+Moves a set of applications, given by ID list or filter, to one pipeline stage.
+The applications are updated with a single set-based UPDATE. Each move is
+recorded in the application_pipeline stage history in the same transaction,
+with an upsert, because re-entering a stage refreshes moved_at. Every selected
+application gets an outcome: moved, unchanged (already in the stage), skipped
+(failed the from_status guard) or not_found (no such application, or one
+outside the filter).
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import delete, func, insert, literal, select, update
+from models_fixed import db, Application, ApplicationPipeline, PipelineStage
+
+# Most applications one transition may touch
+MAX_TRANSITION_SIZE = 5000
+
+_FILTER_FIELDS = ('job_id', 'candidate_id', 'current_status')
+
+
+def find_stage(stage_id=None, name: Optional[str] = None) -> Optional[PipelineStage]:
+    """Stage by id, or by case-insensitive name"""
+    if stage_id is not None:
+        return db.session.get(PipelineStage, int(stage_id))
+    if name:
+        return PipelineStage.query.filter(func.lower(PipelineStage.name) == name.strip().lower()).first()
+    return None
+
+
+def _history_upsert(application_ids: List[int], stage_id: int, moved_at: datetime):
+    """
+    INSERT (application_id, stage_id, moved_at) history rows, refreshing
+    moved_at of stages the applications were in before
+    """
+    table = ApplicationPipeline.__table__
+    columns = [table.c.application_id, table.c.stage_id, table.c.moved_at]
+    rows = select(Application.application_id, literal(stage_id), literal(moved_at, db.DateTime)).where(
+        Application.application_id.in_(application_ids)
+    )
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        # No upsert: replace the rows instead
+        return [
+            delete(table).where(table.c.stage_id == stage_id, table.c.application_id.in_(application_ids)),
+            insert(table).from_select(columns, rows)
+        ]
+    stmt = dialect_insert(table).from_select(columns, rows)
+    return [stmt.on_conflict_do_update(
+        index_elements=[table.c.application_id, table.c.stage_id],
+        set_={'moved_at': stmt.excluded.moved_at}
+    )]
+
+
+def record_stage(application_ids: List[int], stage: PipelineStage, moved_at: Optional[datetime] = None) -> None:
+    """Record applications entering a stage in application_pipeline (caller commits)"""
+    if application_ids:
+        for stmt in _history_upsert(application_ids, stage.stage_id, moved_at or datetime.utcnow()):
+            db.session.execute(stmt)
+
+
+def _selection(application_ids: Optional[Iterable[int]], filters: Optional[Dict]):
+    if application_ids is None and not filters:
+        raise ValueError('application_ids or filter is required')
+    unknown = set(filters or {}) - set(_FILTER_FIELDS)
+    if unknown:
+        raise ValueError(f'Unsupported filter fields: {", ".join(sorted(unknown))}')
+    query = select(Application.application_id, Application.current_status)
+    if application_ids is not None:
+        query = query.where(Application.application_id.in_(application_ids))
+    for field, value in (filters or {}).items():
+        if field == 'current_status':
+            query = query.where(func.lower(Application.current_status) == str(value).lower())
+        else:
+            query = query.where(getattr(Application, field) == value)
+    return query.order_by(Application.application_id).limit(MAX_TRANSITION_SIZE + 1).with_for_update()
+
+
+def transition_applications(stage: PipelineStage, application_ids: Optional[List[int]] = None,
+                            filters: Optional[Dict] = None, from_status: Optional[str] = None) -> Dict:
+    """
+    Move applications to a stage (caller commits)
+
+    Args:
+        stage: Target stage; current_status becomes its name
+        application_ids: Applications to move
+        filters: Select applications by job_id, candidate_id and/or
+            current_status instead of (or within) application_ids
+        from_status: Only move applications currently in this status
+
+    Returns:
+        {'moved': count, 'results': [{'application_id', 'outcome', 'from_status'}]}
+        with results in application_id order
+
+    Raises:
+        ValueError: No selection, unknown filter field, or more than
+            MAX_TRANSITION_SIZE applications selected
+    """
+    if application_ids is not None and len(application_ids) > MAX_TRANSITION_SIZE:
+        raise ValueError(f'At most {MAX_TRANSITION_SIZE} applications per transition')
+    rows = db.session.execute(_selection(application_ids, filters)).all()
+    if len(rows) > MAX_TRANSITION_SIZE:
+        raise ValueError(f'Filter matches more than {MAX_TRANSITION_SIZE} applications')
+
+    target = stage.name.lower()
+    guard = from_status.lower() if from_status else None
+    results = {}
+    moved = []
+    for application_id, status in rows:
+        current = (status or '').lower()
+        if current == target:
+            outcome = 'unchanged'
+        elif guard is not None and current != guard:
+            outcome = 'skipped'
+        else:
+            outcome = 'moved'
+            moved.append(application_id)
+        results[application_id] = {'application_id': application_id, 'outcome': outcome, 'from_status': status}
+    for application_id in application_ids or ():
+        results.setdefault(application_id, {'application_id': application_id, 'outcome': 'not_found',
+                                            'from_status': None})
+
+    if moved:
+        now = datetime.utcnow()
+        db.session.execute(
+            update(Application).where(Application.application_id.in_(moved))
+            .values(current_status=stage.name, updated_at=now)
+        )
+        record_stage(moved, stage, now)
+    return {'moved': len(moved), 'results': [results[k] for k in sorted(results)]}
@@ -0,0 +1,77 @@
+"""
+Shared fixtures: a fresh app and SQLite database per test.
+Background worker threads are off; tests drive the workers' run_once() or
+flush() directly.
+"""
+
+import os
+import sys
+
+import pytest
+from flask_migrate import upgrade
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# app.py builds a module-level app on import; keep it away from the committed app.db
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('BACKGROUND_WORKERS', '0')
+
+from app import create_app  # noqa: E402
+from models_fixed import db  # noqa: E402
+from response_cache import response_cache  # noqa: E402
+from job_alerts import alert_index  # noqa: E402
+from search_index import ensure_job_search_index  # noqa: E402
+from job_dedup import ensure_job_dedup_schema  # noqa: E402
+import search_index  # noqa: E402
+
+MIGRATIONS = os.path.join(ROOT, 'migrations')
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'BACKGROUND_WORKERS': False
+    })
+    with app.app_context():
+        db.create_all()
+        ensure_job_dedup_schema(db)
+        ensure_job_search_index(db)
+    # Process-wide caches must not carry rows over from another test's database
+    response_cache.clear()
+    alert_index.invalidate()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    response_cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def ctx(app):
+    """App context for calling module functions directly"""
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def migrated_app(tmp_path, monkeypatch):
+    """An app whose database was built only by `flask db upgrade` (inside an app context)"""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'migrated.db'}",
+        'BACKGROUND_WORKERS': False
+    })
+    monkeypatch.setattr(search_index, '_index_available', None)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+        yield app
+        db.session.remove()
+        db.engine.dispose()
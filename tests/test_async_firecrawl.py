@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+import async_firecrawl
+import firecrawl_utils
+from async_firecrawl import AsyncFirecrawlClient
+from models_fixed import db, Job, ScrapeTask
+from scrape_cache import ScrapeCache
+
+
+def _client(monkeypatch, handler):
+    monkeypatch.setenv('FIRECRAWL_API_KEY', 'test-key')
+    return AsyncFirecrawlClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+                                max_retries=2, backoff_factor=0)
+
+
+class FlakyAPI:
+    """MockTransport handler failing the first calls to each path"""
+
+    def __init__(self, failures):
+        self.failures = dict(failures)
+        self.calls = Counter()
+
+    def __call__(self, request):
+        key = (request.method, request.url.path)
+        self.calls[key] += 1
+        failure = self.failures.get(key)
+        if failure and self.calls[key] <= failure[1]:
+            if isinstance(failure[0], type):
+                raise failure[0]('simulated', request=request)
+            return httpx.Response(failure[0])
+        return httpx.Response(200, json={'success': True, 'jobId': 'job-1', 'data': []})
+
+
+def test_scrape_and_status_are_retried_on_5xx(monkeypatch):
+    api = FlakyAPI({('POST', '/v0/scrape'): (503, 2), ('GET', '/v0/crawl/job-1'): (httpx.ReadTimeout, 1)})
+    client = _client(monkeypatch, api)
+    assert asyncio.run(client.scrape_page('https://example.com'))['success'] is True
+    assert asyncio.run(client.get_crawl_status('job-1'))['success'] is True
+    assert api.calls == {('POST', '/v0/scrape'): 3, ('GET', '/v0/crawl/job-1'): 2}
+
+
+@pytest.mark.parametrize('failure', [502, httpx.ReadTimeout])
+def test_crawl_start_is_not_retried_once_sent(monkeypatch, failure):
+    api = FlakyAPI({('POST', '/v0/crawl'): (failure, 1)})
+    result = asyncio.run(_client(monkeypatch, api).crawl_site('https://example.com'))
+    assert result['success'] is False
+    assert api.calls[('POST', '/v0/crawl')] == 1
+
+
+def test_crawl_start_is_retried_on_connect_errors(monkeypatch):
+    api = FlakyAPI({('POST', '/v0/crawl'): (httpx.ConnectError, 2)})
+    result = asyncio.run(_client(monkeypatch, api).crawl_site('https://example.com'))
+    assert result == {'success': True, 'jobId': 'job-1', 'status': 'processing'}
+    assert api.calls[('POST', '/v0/crawl')] == 3
+
+
+PAGE = 'Careers\n## Backend Engineer\nLocation: Berlin\nBuild APIs in Python for our platform team.\n'
+
+
+@pytest.fixture
+def runner(app, monkeypatch):
+    """The shared event loop, running tasks against this test's app and a mocked Firecrawl"""
+    monkeypatch.setenv('FIRECRAWL_API_KEY', 'test-key')
+    monkeypatch.setattr(firecrawl_utils, 'scrape_cache', ScrapeCache(db_path=None))
+    runner = async_firecrawl.async_runner
+    runner.ensure_started(app)
+    monkeypatch.setattr(runner, 'app', app)
+    return runner
+
+
+def _mock_firecrawl(runner, monkeypatch, handler):
+    client = AsyncFirecrawlClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+                                  max_retries=0, backoff_factor=0)
+    monkeypatch.setattr(runner, 'client', lambda: client)
+
+
+def _wait(client, task_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        task = client.get(f'/api/async/tasks/{task_id}').get_json()
+        if task['status'] != 'pending':
+            return task
+        time.sleep(0.02)
+    raise AssertionError('task did not finish')
+
+
+def test_async_scrape_returns_at_once_and_finishes_on_the_loop(runner, client, monkeypatch):
+    release = threading.Event()
+
+    async def slow_page(request):
+        await asyncio.get_running_loop().run_in_executor(None, release.wait, 5)
+        return httpx.Response(200, json={'success': True, 'markdown': PAGE, 'pageTitle': 'Jobs'})
+
+    _mock_firecrawl(runner, monkeypatch, slow_page)
+    response = client.post('/api/async/scrape-and-import', json={'url': 'https://example.com/jobs'})
+    assert response.status_code == 202
+    task_id = response.get_json()['task_id']
+    assert response.get_json()['status_url'] == f'/api/async/tasks/{task_id}'
+    assert client.get(f'/api/async/tasks/{task_id}').get_json()['status'] == 'pending'
+
+    release.set()
+    task = _wait(client, task_id)
+    assert (task['status'], task['http_status']) == ('completed', 201)
+    assert task['result']['jobs_added'] == 1
+    with runner.app.app_context():
+        assert [j.title for j in Job.query] == ['Backend Engineer']
+
+
+def test_failed_scrape_is_recorded(runner, client, monkeypatch):
+    _mock_firecrawl(runner, monkeypatch, lambda request: httpx.Response(500))
+    task_id = client.post('/api/async/scrape-job', json={'url': 'https://example.com/jobs'}).get_json()['task_id']
+    task = _wait(client, task_id)
+    assert task['status'] == 'failed'
+    assert task['result']['success'] is False
+
+
+def test_async_requests_are_validated(client):
+    assert client.post('/api/async/crawl-site', json={}).status_code == 400
+    assert client.get('/api/async/tasks/nope').status_code == 404
+
+
+def test_tasks_orphaned_by_an_exited_process_fail(client, app):
+    now = datetime.utcnow()
+    overdue = now - timedelta(seconds=async_firecrawl.SCRAPE_TASK_DEADLINE + 60)
+    with app.app_context():
+        db.session.add_all([
+            ScrapeTask(task_id='orphan', kind='scrape-job', status='pending', created_at=overdue),
+            ScrapeTask(task_id='other-orphan', kind='scrape-job', status='pending', created_at=overdue),
+            ScrapeTask(task_id='running', kind='scrape-job', status='pending', created_at=now),
+            ScrapeTask(task_id='expired', kind='scrape-job', status='completed', created_at=overdue,
+                       completed_at=now - timedelta(seconds=async_firecrawl.SCRAPE_TASK_TTL + 60)),
+        ])
+        db.session.commit()
+
+    task = client.get('/api/async/tasks/orphan').get_json()
+    assert (task['status'], task['http_status']) == ('failed', 504)
+    assert 'did not finish' in task['result']['error']
+    assert client.get('/api/async/tasks/running').get_json()['status'] == 'pending'
+
+    # Finishing any task sweeps the rest; a task already failed keeps its answer
+    with app.app_context():
+        async_firecrawl._complete_task('orphan', {'success': True}, 200)
+        async_firecrawl._complete_task('running', {'success': True}, 200)
+    assert client.get('/api/async/tasks/orphan').get_json()['http_status'] == 504
+    assert client.get('/api/async/tasks/other-orphan').get_json()['status'] == 'failed'
+    assert client.get('/api/async/tasks/running').get_json()['status'] == 'completed'
+    assert client.get('/api/async/tasks/expired').status_code == 404
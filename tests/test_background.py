@@ -0,0 +1,85 @@
+import multiprocessing
+
+import background
+from background import BackgroundWorker, LeaderLock
+
+
+def _try_lock(path, queue):
+    queue.put(LeaderLock(path).acquire())
+
+
+def _acquire_in_other_process(path):
+    mp = multiprocessing.get_context('spawn')
+    queue = mp.Queue()
+    process = mp.Process(target=_try_lock, args=(path, queue))
+    process.start()
+    try:
+        return queue.get(timeout=30)
+    finally:
+        process.join()
+
+
+def test_leader_lock_is_exclusive_across_processes(tmp_path):
+    path = str(tmp_path / 'leader.lock')
+    lock = LeaderLock(path)
+    assert lock.acquire()
+    assert _acquire_in_other_process(path) is False
+    lock.release()
+    assert _acquire_in_other_process(path) is True
+
+
+def test_leader_lock_is_per_database(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(background, 'BACKGROUND_LOCK_DIR', str(tmp_path))
+    other = type('App', (), {'config': {'SQLALCHEMY_DATABASE_URI': 'sqlite:////elsewhere.db'}})
+    assert background.leader_lock(app) is background.leader_lock(app)
+    assert background.leader_lock(app).path != background.leader_lock(other).path
+
+
+class _Counter(BackgroundWorker):
+    name = 'test-counter'
+    idle_sleep = 0.01
+
+    def __init__(self):
+        super().__init__()
+        self.runs = 0
+
+    def run_once(self):
+        self.runs += 1
+        return False
+
+
+def test_singleton_worker_only_starts_in_the_leader(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(background, 'BACKGROUND_LOCK_DIR', str(tmp_path))
+    monkeypatch.setattr(background, 'BACKGROUND_LEADER_RETRY', 0)
+    monkeypatch.setattr(background, '_leader_locks', {})
+    # flock() locks are per open file, so a second LeaderLock stands in for another process
+    other = LeaderLock(background.leader_lock(app).path)
+    assert other.acquire()
+    worker = _Counter()
+    worker.ensure_started(app)
+    assert worker._thread is None
+
+    other.release()
+    worker.ensure_started(app)
+    try:
+        assert worker._thread is not None and worker._thread.is_alive()
+    finally:
+        worker.stop()
+        worker._thread.join(timeout=5)
+        background.leader_lock(app).release()
+
+
+def test_per_process_worker_ignores_the_lock(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(background, 'BACKGROUND_LOCK_DIR', str(tmp_path))
+    monkeypatch.setattr(background, '_leader_locks', {})
+    held = LeaderLock(background.leader_lock(app).path)
+    assert held.acquire()
+    worker = _Counter()
+    worker.singleton = False
+    worker.ensure_started(app)
+    try:
+        assert worker._thread.is_alive()
+    finally:
+        worker.stop()
+        worker._thread.join(timeout=5)
+        held.release()
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import event
+
+from models_fixed import db, Application, Candidate, Job
+
+
+@pytest.fixture
+def applications(app):
+    with app.app_context():
+        db.session.add_all([Job(job_id=i, title=f'Job {i}', is_active=i != 2) for i in range(1, 6)])
+        db.session.add(Candidate(candidate_id=1))
+        db.session.add_all([Application(candidate_id=1, job_id=i) for i in (1, 2, 4)])
+        db.session.commit()
+
+
+@pytest.fixture
+def selects(app):
+    """SELECT statements run while the test makes requests"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+def test_jobs_by_id_include_inactive_postings(client, applications, selects):
+    rows = client.get('/api/jobs?ids=4,2,99').get_json()
+    assert [j['job_id'] for j in rows] == [2, 4]
+    assert len([s for s in selects if 'FROM jobs' in s]) == 1
+
+
+def test_bad_id_lists_are_400(client):
+    assert client.get('/api/jobs?ids=1,x').status_code == 400
+    too_many = ','.join(str(i) for i in range(1001))
+    assert 'At most' in client.get(f'/api/jobs?ids={too_many}').get_json()['error']
+
+
+def test_applications_embed_their_job_in_one_query(client, applications, selects):
+    rows = client.get('/api/applications?candidate_id=1&expand=job').get_json()
+    assert [(a['job_id'], a['job']['title']) for a in rows] == [(1, 'Job 1'), (2, 'Job 2'), (4, 'Job 4')]
+    assert len(selects) == 1
+    assert 'JOIN jobs' in selects[0]
+
+
+def test_applications_without_expand_are_unchanged(client, applications):
+    rows = client.get('/api/applications?candidate_id=1').get_json()
+    assert len(rows) == 3
+    assert all('job' not in a for a in rows)
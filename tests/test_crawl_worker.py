@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import crawl_worker
+from crawl_worker import crawl_worker as worker
+from models_fixed import db, CrawlTask, Job
+
+
+def _page(title):
+    return {'url': f'https://example.com/{title}',
+            'jobs': [{'title': title, 'description': f'{title} role', 'location': 'Remote'}]}
+
+
+class FakeFirecrawl:
+    """Answers every crawl status poll with the same result"""
+
+    def __init__(self, result):
+        self.result = result
+        self.polls = 0
+
+    def __call__(self, job_id):
+        self.polls += 1
+        return self.result
+
+
+@pytest.fixture
+def firecrawl(ctx, monkeypatch):
+    def install(result):
+        fake = FakeFirecrawl(result)
+        monkeypatch.setattr(crawl_worker, 'get_crawl_results', fake)
+        return fake
+    return install
+
+
+def _make_due(task):
+    task.next_poll_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+
+def test_create_task_is_idempotent(ctx):
+    first = crawl_worker.create_task('fc-1', 'https://example.com')
+    assert crawl_worker.create_task('fc-1', 'https://example.com').task_id == first.task_id
+    assert CrawlTask.query.count() == 1
+
+
+def test_in_progress_crawl_backs_off(firecrawl):
+    fake = firecrawl({'success': True, 'status': 'active'})
+    task = crawl_worker.create_task('fc-1', 'https://example.com')
+    assert worker.run_once() is True
+    db.session.refresh(task)
+    assert task.status == 'crawling'
+    assert task.attempts == 1
+    assert task.next_poll_at > datetime.utcnow()
+    # Not due again until the backoff expires
+    assert worker.run_once() is False
+    assert fake.polls == 1
+
+
+def test_completed_crawl_is_imported_once(firecrawl):
+    completed = {'success': True, 'status': 'completed', 'data': [_page('Backend'), _page('Frontend')]}
+    firecrawl(completed)
+    task = crawl_worker.create_task('fc-1', 'https://example.com', auto_add=True)
+    assert worker.run_once() is True
+    db.session.refresh(task)
+    assert (task.status, task.pages_crawled, task.jobs_found, task.jobs_added) == ('completed', 2, 2, 2)
+    assert sorted(j.title for j in Job.query) == ['Backend', 'Frontend']
+    assert crawl_worker.import_crawl_results(task, completed) is False
+    assert Job.query.count() == 2
+
+
+def test_crawl_without_auto_add_only_counts_jobs(firecrawl):
+    firecrawl({'success': True, 'status': 'completed', 'data': [_page('Backend')]})
+    task = crawl_worker.create_task('fc-1', 'https://example.com')
+    worker.run_once()
+    db.session.refresh(task)
+    assert (task.status, task.jobs_found, task.jobs_added) == ('completed', 1, 0)
+    assert Job.query.count() == 0
+
+
+def test_repeated_poll_errors_fail_the_task(firecrawl, monkeypatch):
+    monkeypatch.setattr(crawl_worker, 'MAX_POLL_ERRORS', 2)
+    firecrawl({'success': False, 'error': 'HTTP 502'})
+    task = crawl_worker.create_task('fc-1', 'https://example.com')
+    worker.run_once()
+    db.session.refresh(task)
+    assert (task.status, task.error) == ('crawling', 'HTTP 502')
+    _make_due(task)
+    worker.run_once()
+    db.session.refresh(task)
+    assert task.status == 'failed'
+
+
+def test_failed_import_rolls_back(firecrawl, monkeypatch):
+    firecrawl({'success': True, 'status': 'completed', 'data': [_page('Backend')]})
+
+    def broken_import(jobs, employer_id):
+        list(jobs)
+        db.session.add(Job(title='half-imported', is_active=True))
+        db.session.flush()
+        raise RuntimeError('disk full')
+
+    monkeypatch.setattr(crawl_worker, 'bulk_import_jobs', broken_import)
+    task = crawl_worker.create_task('fc-1', 'https://example.com', auto_add=True)
+    worker.run_once()
+    db.session.refresh(task)
+    assert task.status == 'failed'
+    assert 'disk full' in task.error
+    assert Job.query.count() == 0
+
+
+def test_abandoned_import_is_retried(firecrawl):
+    firecrawl({'success': True, 'status': 'completed', 'data': [_page('Backend')]})
+    task = crawl_worker.create_task('fc-1', 'https://example.com', auto_add=True)
+    task.status = 'importing'
+    db.session.commit()
+    db.session.execute(CrawlTask.__table__.update().values(
+        updated_at=datetime.utcnow() - timedelta(seconds=crawl_worker.TASK_LEASE + 1)))
+    db.session.commit()
+    assert worker.run_once() is True
+    db.session.refresh(task)
+    assert task.status == 'completed'
+    assert Job.query.count() == 1
+
+
+def test_status_endpoints(firecrawl, client):
+    firecrawl({'success': True, 'status': 'completed', 'data': [_page('Backend')]})
+    task_id = crawl_worker.create_task('fc-1', 'https://example.com').task_id
+    worker.run_once()
+    body = client.get(f'/api/crawl-tasks/{task_id}?wait=5&since=never').get_json()
+    assert body['success'] is True and body['status'] == 'completed'
+    events = client.get(f'/api/crawl-tasks/{task_id}/events').get_data(as_text=True)
+    assert events.startswith('event: status\n') and '"completed"' in events
+    assert client.get('/api/crawl-tasks/999').status_code == 404
+
+
+def test_late_auto_add_poll_imports_a_completed_crawl_once(firecrawl, client, monkeypatch):
+    fake = firecrawl({'success': True, 'status': 'completed', 'data': [_page('Backend'), _page('Frontend')]})
+    monkeypatch.setattr('app.get_crawl_results', fake)
+    task = crawl_worker.create_task('fc-1', 'https://example.com')
+    worker.run_once()
+    db.session.refresh(task)
+    assert (task.status, task.jobs_added) == ('completed', 0)
+
+    body = client.get('/api/crawl-status/fc-1?auto_add=true&employer_id=3').get_json()
+    assert body['taskId'] == task.task_id and body['jobs_added'] == 2
+    assert sorted((j.title, j.employer_id) for j in Job.query) == [('Backend', 3), ('Frontend', 3)]
+    # Once only
+    assert crawl_worker.import_crawl_results(task, fake.result, auto_add=True) is False
+    client.get('/api/crawl-status/fc-1?auto_add=true')
+    assert Job.query.count() == 2
+    db.session.refresh(task)
+    assert (task.status, task.auto_add, task.jobs_added) == ('completed', True, 2)
@@ -0,0 +1,143 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from urllib3.exceptions import NewConnectionError, ReadTimeoutError
+
+import firecrawl_utils
+from firecrawl_utils import FirecrawlClient, build_session, scrape_job_pages
+
+
+class FlakyAPI(BaseHTTPRequestHandler):
+    """Answers every call with the status queued for its path, then 200"""
+
+    def _reply(self):
+        key = (self.command, self.path)
+        self.server.calls[key] += 1
+        statuses = self.server.statuses.get(key, [])
+        status = statuses.pop(0) if statuses else 200
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        body = json.dumps({'success': True, 'jobId': 'job-1', 'data': []}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setenv('FIRECRAWL_API_KEY', 'test-key')
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyAPI)
+    server.calls = Counter()
+    server.statuses = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f'http://127.0.0.1:{server.server_port}/v0'
+    client = FirecrawlClient(session=build_session(max_retries=2, backoff_factor=0, base_url=base_url))
+    client.base_url = base_url
+    yield server, client
+    server.shutdown()
+    server.server_close()
+
+
+def test_scrape_is_retried_on_5xx(api):
+    server, client = api
+    server.statuses[('POST', '/v0/scrape')] = [503, 502]
+    assert client.scrape_page('https://example.com/jobs')['success'] is True
+    assert server.calls[('POST', '/v0/scrape')] == 3
+
+
+def test_crawl_start_is_not_retried_on_5xx(api):
+    server, client = api
+    server.statuses[('POST', '/v0/crawl')] = [503]
+    result = client.crawl_site('https://example.com')
+    assert result['success'] is False
+    assert server.calls[('POST', '/v0/crawl')] == 1
+
+
+def test_crawl_status_is_retried_on_5xx(api):
+    server, client = api
+    server.statuses[('GET', '/v0/crawl/job-1')] = [500]
+    assert client.get_crawl_status('job-1')['success'] is True
+    assert server.calls[('GET', '/v0/crawl/job-1')] == 2
+
+
+def test_crawl_start_is_retried_on_connect_errors_only():
+    session = build_session(max_retries=2)
+    retry = session.get_adapter(f'{firecrawl_utils.FIRECRAWL_API_URL}/crawl').max_retries
+    after = retry.increment('POST', '/v0/crawl', error=NewConnectionError(None, 'refused'))
+    assert after.connect == 1
+    # The request went out: a timeout may have started the crawl
+    with pytest.raises(ReadTimeoutError):
+        retry.increment('POST', '/v0/crawl', error=ReadTimeoutError(None, '/v0/crawl', 'timed out'))
+
+
+class FakeScraper:
+    """Stands in for scrape_job_page, tracking concurrency per host"""
+
+    def __init__(self, delay=0.02, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+        self.running = Counter()
+        self.peak = Counter()
+        self.started = []
+
+    def __call__(self, url, use_cache=True):
+        host = url.split('/')[2]
+        with self.lock:
+            self.running[host] += 1
+            self.peak[host] = max(self.peak[host], self.running[host])
+            self.started.append(url)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running[host] -= 1
+        if url in self.fail:
+            raise RuntimeError('boom')
+        return {'success': True, 'url': url}
+
+
+def test_batch_respects_the_per_host_limit(monkeypatch):
+    scraper = FakeScraper()
+    monkeypatch.setattr(firecrawl_utils, 'scrape_job_page', scraper)
+    urls = [f'https://a.example/{i}' for i in range(8)] + [f'https://b.example/{i}' for i in range(3)]
+    results = list(scrape_job_pages(urls + urls[:2], max_workers=8, per_host_limit=2))
+    assert sorted(r['url'] for r in results) == sorted(urls)
+    assert scraper.peak == {'a.example': 2, 'b.example': 2}
+
+
+def test_busy_host_does_not_hold_threads(monkeypatch):
+    scraper = FakeScraper()
+    monkeypatch.setattr(firecrawl_utils, 'scrape_job_page', scraper)
+    urls = [f'https://a.example/{i}' for i in range(6)] + ['https://b.example/1', 'https://c.example/1']
+    list(scrape_job_pages(urls, max_workers=2, per_host_limit=1))
+    # With one slot for a.example the second thread serves the other hosts
+    # right away instead of waiting on a.example's queue
+    assert scraper.started[:3] == ['https://a.example/0', 'https://b.example/1', 'https://c.example/1']
+    assert scraper.peak['a.example'] == 1
+
+
+def test_batch_reports_failures_per_url(monkeypatch):
+    monkeypatch.setattr(firecrawl_utils, 'scrape_job_page', FakeScraper(delay=0, fail=['https://a.example/1']))
+    results = {r['url']: r for r in scrape_job_pages(['https://a.example/0', 'https://a.example/1'])}
+    assert results['https://a.example/1'] == {'success': False, 'error': 'boom', 'url': 'https://a.example/1'}
+    assert results['https://a.example/0']['success'] is True
+
+
+def test_stopping_early_drops_queued_urls(monkeypatch):
+    scraper = FakeScraper(delay=0.01)
+    monkeypatch.setattr(firecrawl_utils, 'scrape_job_page', scraper)
+    batch = scrape_job_pages([f'https://a.example/{i}' for i in range(20)], max_workers=4, per_host_limit=2)
+    next(batch)
+    batch.close()
+    assert len(scraper.started) <= 4
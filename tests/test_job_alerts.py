@@ -0,0 +1,83 @@
+import pytest
+
+from models_fixed import db, Candidate, Employer, JobAlert, JobAlertDigest, User
+from job_alerts import AlertIndex, normalize_remote_type, validate_alert
+from job_import import bulk_import_jobs
+
+
+@pytest.fixture
+def candidate_id(ctx):
+    user = User(email='alerts@example.com', role='candidate')
+    db.session.add_all([user, Employer(company_name='Acme')])
+    db.session.flush()
+    candidate = Candidate(user_id=user.user_id)
+    db.session.add(candidate)
+    db.session.commit()
+    return candidate.candidate_id
+
+
+def _job(title, remote_type, location='Berlin, Germany', description='Build APIs in Python'):
+    return {'title': title, 'description': description, 'location': location, 'remote_type': remote_type,
+            'url': f'https://jobs.example.com/{title.replace(" ", "-").lower()}'}
+
+
+@pytest.mark.parametrize('spelling, expected', [
+    ('remote', 'remote'), ('fully_remote', 'remote'), ('Fully Remote', 'remote'),
+    ('hybrid', 'hybrid'), ('on-site', 'on-site'), ('on_site', 'on-site'), ('Onsite', 'on-site'),
+    ('sometimes', None), (None, None)
+])
+def test_normalize_remote_type(spelling, expected):
+    assert normalize_remote_type(spelling) == expected
+
+
+def test_scraper_and_alert_vocabularies_match():
+    index = AlertIndex()
+    index.add(1, 10, None, None, 'remote')
+    index.add(2, 10, None, None, 'on-site')
+    index.add(3, 10, ['python'], 'berlin', 'fully_remote')
+    assert sorted(index.match(_job('Backend Engineer', 'fully_remote'))) == [1, 3]
+    assert index.match(_job('Backend Engineer', 'on_site')) == [2]
+    assert index.match(_job('Backend Engineer', 'hybrid')) == []
+
+
+def test_validate_alert_accepts_job_spellings():
+    assert validate_alert({'remote_type': 'fully_remote'}) is None
+    assert validate_alert({'remote_type': 'on_site'}) is None
+    assert validate_alert({'remote_type': 'sometimes'}) is not None
+    assert validate_alert({}) is not None
+
+
+def test_import_writes_digest_for_matching_remote_alert(candidate_id):
+    db.session.add_all([
+        JobAlert(candidate_id=candidate_id, job_tags=['python'], remote_type='remote'),
+        JobAlert(candidate_id=candidate_id, location='Paris', remote_type='on-site')
+    ])
+    db.session.commit()
+
+    result = bulk_import_jobs([
+        _job('Backend Engineer', 'fully_remote'),
+        _job('Office Engineer', 'on_site'),
+        _job('Hybrid Engineer', 'hybrid')
+    ], employer_id=1)
+    db.session.commit()
+
+    assert result['jobs_added'] == 3
+    assert result['alert_digests'] == 1
+    digest = JobAlertDigest.query.one()
+    assert digest.candidate_id == candidate_id
+    assert digest.job_count == 1
+    assert db.session.get(JobAlert, 1).last_sent is not None
+    assert db.session.get(JobAlert, 2).last_sent is None
+
+    # Re-importing the same postings refreshes them without another digest
+    again = bulk_import_jobs([_job('Backend Engineer', 'fully_remote')], employer_id=1)
+    db.session.commit()
+    assert again['alert_digests'] == 0
+
+
+def test_alert_endpoint_stores_canonical_remote_type(client, candidate_id):
+    response = client.post('/api/job-alerts', json={'candidate_id': candidate_id, 'remote_type': 'fully_remote'})
+    assert response.status_code == 201
+    assert response.get_json()['remote_type'] == 'remote'
+    bad = client.post('/api/job-alerts', json={'candidate_id': candidate_id, 'remote_type': 'sometimes'})
+    assert bad.status_code == 400
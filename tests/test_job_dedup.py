@@ -0,0 +1,85 @@
+from flask_migrate import stamp, upgrade
+from sqlalchemy import inspect, text
+
+import job_import
+from conftest import MIGRATIONS
+from job_dedup import hamming_distance, job_fingerprint, simhash
+from job_import import bulk_import_jobs
+from models_fixed import db, Job
+
+DESCRIPTION = ('We are hiring a backend engineer to build and run our payments APIs in Python '
+               'with PostgreSQL, Redis and Kubernetes on a small product team.')
+
+
+def _posting(**overrides):
+    job = {'title': 'Backend Engineer', 'description': DESCRIPTION, 'location': 'Berlin',
+           'source_url': 'https://jobs.example.com/backend?utm_source=feed'}
+    job.update(overrides)
+    return job
+
+
+def test_fingerprint_ignores_case_punctuation_and_tracking_params():
+    assert job_fingerprint('https://jobs.example.com/a?utm_source=x', 'Backend  Engineer!', 'Berlin') == \
+        job_fingerprint('https://jobs.example.com/a', 'backend engineer', 'BERLIN')
+    assert job_fingerprint(None, 'Backend Engineer', 'Berlin') != job_fingerprint(None, 'Backend Engineer', 'Paris')
+
+
+def test_simhash_is_close_for_edited_text():
+    edited = DESCRIPTION.replace('small', 'growing')
+    assert hamming_distance(simhash(DESCRIPTION), simhash(edited)) <= 10
+    assert hamming_distance(simhash(DESCRIPTION), simhash('Nurse for the night shift in a city hospital')) > 10
+
+
+def test_reimport_updates_instead_of_duplicating(ctx):
+    first = bulk_import_jobs([_posting()], employer_id=1)
+    db.session.commit()
+    second = bulk_import_jobs([_posting(title='backend engineer', description='Updated text')], employer_id=1)
+    db.session.commit()
+    assert (first['jobs_added'], second['jobs_added'], second['jobs_updated']) == (1, 0, 1)
+    job = Job.query.one()
+    assert job.description == 'Updated text'
+
+
+def test_repeats_within_one_batch_are_collapsed(ctx):
+    result = bulk_import_jobs([_posting(), _posting(description='Last copy wins')], employer_id=1)
+    db.session.commit()
+    assert (result['jobs_added'], result['duplicates_skipped']) == (1, 1)
+    assert Job.query.one().description == 'Last copy wins'
+
+
+def test_near_duplicates_from_other_boards_are_skipped_on_request(ctx):
+    bulk_import_jobs([_posting()], employer_id=1)
+    db.session.commit()
+    mirror = _posting(source_url='https://other-board.example.org/42', description=DESCRIPTION + ' Apply now.')
+    kept = bulk_import_jobs([mirror], employer_id=1, skip_near_duplicates=True)
+    db.session.commit()
+    assert (kept['jobs_added'], kept['duplicates_skipped']) == (0, 1)
+    assert bulk_import_jobs([mirror], employer_id=1, skip_near_duplicates=False)['jobs_added'] == 1
+
+
+def test_without_upsert_support_only_new_postings_are_inserted(ctx, monkeypatch):
+    monkeypatch.setattr(job_import, '_upsert_statement', lambda: None)
+    bulk_import_jobs([_posting()], employer_id=1)
+    result = bulk_import_jobs([_posting(), _posting(title='Frontend Engineer')], employer_id=1)
+    db.session.commit()
+    assert (result['jobs_added'], result['jobs_updated']) == (1, 0)
+    assert Job.query.count() == 2
+
+
+def test_migrations_restore_the_fingerprint_index(migrated_app):
+    # A database stamped past the baseline without the dedup schema
+    with db.engine.begin() as conn:
+        conn.execute(text('DROP INDEX uq_jobs_fingerprint'))
+        conn.execute(text('DROP INDEX ix_jobs_title_key'))
+        for column in ('source_url', 'fingerprint', 'title_key', 'simhash'):
+            conn.execute(text(f'ALTER TABLE jobs DROP COLUMN {column}'))
+    stamp(directory=MIGRATIONS, revision='0012')
+    upgrade(directory=MIGRATIONS)
+
+    indexes = {index['name']: index for index in inspect(db.engine).get_indexes('jobs')}
+    assert indexes['uq_jobs_fingerprint']['unique']
+    bulk_import_jobs([_posting()], employer_id=1)
+    again = bulk_import_jobs([_posting()], employer_id=1)
+    db.session.commit()
+    assert again['jobs_updated'] == 1
+    assert Job.query.count() == 1
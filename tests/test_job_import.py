@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import event
+
+from job_import import bulk_import_jobs, job_row
+from models_fixed import db, Job
+
+
+def _jobs(n, pulled=None):
+    for i in range(n):
+        if pulled is not None:
+            pulled.append(i)
+        yield {'title': f'Engineer {i}', 'description': f'Posting number {i} with its own text',
+               'location': 'Berlin', 'source_url': f'https://example.com/jobs/{i}'}
+
+
+@pytest.fixture
+def inserts(ctx):
+    """(rows per statement, generator pages pulled so far) for every jobs INSERT"""
+    calls = []
+    pulled = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('INSERT INTO JOBS'):
+            calls.append((len(parameters) if executemany else 1, len(pulled)))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield calls, pulled
+    event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def test_job_row_defaults():
+    row = job_row({'title': 'Engineer'}, employer_id=7)
+    assert (row['employer_id'], row['location'], row['remote_type'], row['is_active']) == (7, 'Remote', 'hybrid', True)
+    assert row['fingerprint']
+
+
+def test_jobs_are_inserted_one_executemany_per_chunk(inserts):
+    calls, pulled = inserts
+    result = bulk_import_jobs(_jobs(25, pulled), chunk_size=10)
+    assert result['jobs_added'] == 25
+    assert [rows for rows, _ in calls] == [10, 10, 5]
+    # The generator is read one chunk ahead of the insert, never all at once
+    assert [seen for _, seen in calls] == [10, 20, 25]
+    assert Job.query.count() == 25
+
+
+def test_import_joins_the_callers_transaction(ctx):
+    bulk_import_jobs(_jobs(3))
+    db.session.rollback()
+    assert Job.query.count() == 0
+
+
+def test_collected_jobs_carry_their_ids(ctx):
+    result = bulk_import_jobs(_jobs(3), collect_jobs=True, chunk_size=2)
+    db.session.commit()
+    assert [j['title'] for j in result['jobs']] == ['Engineer 0', 'Engineer 1', 'Engineer 2']
+    ids = {j.title: j.job_id for j in Job.query}
+    assert all(j['job_id'] == ids[j['title']] for j in result['jobs'])
+
+
+def test_empty_import(ctx):
+    assert bulk_import_jobs([]) == {'jobs_added': 0, 'jobs_updated': 0, 'duplicates_skipped': 0,
+                                    'alert_digests': 0}
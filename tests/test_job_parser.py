@@ -0,0 +1,108 @@
+"""
+The single-pass parser must extract exactly what the original line-by-line
+substring parser did. reference_section below is that original, kept as the
+oracle.
+"""
+
+import random
+import re
+
+import pytest
+
+from firecrawl_utils import JobParser, parse_job_page, parse_job_section
+
+
+def reference_section(section, source_url):
+    lines = section.strip().split('\n')
+    title = location = salary_range = remote_type = None
+    description_lines = []
+    for i, line in enumerate(lines):
+        line_lower = line.lower()
+        if not title and ('job title' in line_lower or 'position' in line_lower or 'role:' in line_lower or
+                          (i == 0 and 5 < len(line) < 200)):
+            title = line.replace('Job Title:', '').replace('Position:', '').replace('Role:', '').strip()
+        if 'location' in line_lower or 'city' in line_lower:
+            location = re.sub(r'(location|city|where)[:*\-]*', '', line, flags=re.IGNORECASE).strip()
+        if 'remote' in line_lower or 'work' in line_lower:
+            if 'fully remote' in line_lower or 'work from anywhere' in line_lower:
+                remote_type = 'fully_remote'
+            elif 'hybrid' in line_lower:
+                remote_type = 'hybrid'
+            elif 'on-site' in line_lower or 'office' in line_lower:
+                remote_type = 'on_site'
+        salary_match = re.search(r'\$[\d,]+\s*-\s*\$[\d,]+', line)
+        if salary_match:
+            salary_range = salary_match.group(0)
+        if not any(k in line_lower for k in ['location', 'salary', 'remote', 'job title', 'position', 'role']):
+            description_lines.append(line)
+    description = '\n'.join(description_lines).strip()[:500]
+    if title and (description or location):
+        return {'title': title[:100], 'description': description, 'location': location or 'Remote',
+                'remote_type': remote_type or 'hybrid', 'salary_range': salary_range, 'source_url': source_url}
+    return None
+
+
+def _parsed(section):
+    job = parse_job_section(section, 'https://example.com', scraped_at='now')
+    if job is not None:
+        assert job.pop('scraped_at') == 'now'
+    return job
+
+
+PAGE = """Careers at Example
+
+## Senior Backend Engineer
+Location: Berlin, Germany
+Hybrid work, two office days a week
+Salary: $90,000 - $120,000
+You will design APIs and own our data pipelines end to end.
+
+---
+Position: Site Reliability Engineer
+City: Remote (EU)
+Fully remote, work from anywhere in Europe
+Keep our network and Kubernetes clusters healthy.
+"""
+
+
+def test_page_sections_become_jobs():
+    jobs = parse_job_page(PAGE, 'https://example.com/careers')
+    assert [(j['title'], j['location'], j['remote_type'], j['salary_range']) for j in jobs] == [
+        ('Senior Backend Engineer', 'Berlin, Germany', 'hybrid', '$90,000 - $120,000'),
+        ('Site Reliability Engineer', 'Remote (EU)', 'fully_remote', None),
+    ]
+    assert 'design APIs' in jobs[0]['description'] and 'Salary' not in jobs[0]['description']
+    assert JobParser.extract_jobs_from_page(PAGE, 'https://example.com/careers')[1]['title'] == \
+        'Site Reliability Engineer'
+
+
+def test_short_sections_are_ignored():
+    assert parse_job_page('## Tiny\nnot a job', 'https://example.com') == []
+    assert parse_job_page('', 'https://example.com') == []
+
+
+@pytest.mark.parametrize('section', [
+    PAGE,
+    'Position-site reliability lead\nWork from anywheremote friendly team of five people',
+    'Location-site: Munich office\nRole: Data Engineer\nOn-site work with the platform team daily',
+    'Backend role at a network company\nWe work remotely from our Hamburg city office.',
+    'İstanbul Position: Backend Engineer\nLocation: İzmir\nRemote work possible, hybrid optional.',
+    'x\nJob Title: QA Engineer\nlocation: Leeds\nsalary $40,000-$50,000 and $1 - $2',
+])
+def test_matches_the_reference_parser(section):
+    assert _parsed(section) == reference_section(section, 'https://example.com')
+
+
+FRAGMENTS = ['Job Title:', 'Position:', 'Role:', 'role', 'location', 'Location-site', 'city', 'where',
+             'salary', '$50,000 - $70,000', 'remote', 'fully remote', 'Remote', 'work', 'network',
+             'work from anywhere', 'hybrid', 'on-site', 'office', 'position-site', 'İ', 'engineer',
+             'Python', 'Berlin', '-', ':', '*', ' ', ' ', ' ']
+
+
+def test_matches_the_reference_parser_on_random_sections():
+    rng = random.Random(1234)
+    for _ in range(2000):
+        lines = [''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 8)))
+                 for _ in range(rng.randint(1, 6))]
+        section = '\n'.join(lines)
+        assert _parsed(section) == reference_section(section, 'https://example.com'), section
@@ -0,0 +1,110 @@
+import pytest
+from sqlalchemy import insert
+
+import job_stats
+from job_stats import JobStatsRecorder, rebuild_stats
+from models_fixed import db, Application, Job, JobApplicationStats, JobView, User
+
+
+@pytest.fixture
+def recorder(ctx, monkeypatch):
+    """A fresh recorder standing in for the process-wide one the routes use"""
+    recorder = JobStatsRecorder(flush_size=1000)
+    monkeypatch.setattr(job_stats, 'job_stats', recorder)
+    db.session.execute(insert(Job.__table__), [{'title': f'Job {i}', 'is_active': True} for i in range(3)])
+    db.session.add(User(email='viewer@example.com', role='candidate'))
+    db.session.commit()
+    return recorder
+
+
+def _counters():
+    return {s.job_id: (s.total_views, s.total_applications) for s in JobApplicationStats.query}
+
+
+def test_events_are_buffered_until_flush(recorder):
+    for _ in range(3):
+        recorder.record_view(1, viewer_id=1)
+    recorder.record_view(2)
+    recorder.record_application(2)
+    assert recorder.pending() == 5
+    assert JobView.query.count() == 0
+
+    assert recorder.flush() == 5
+    assert recorder.pending() == 0
+    assert JobView.query.count() == 4
+    assert _counters() == {1: (3, 0), 2: (1, 1)}
+
+
+def test_flushes_add_to_the_counters(recorder):
+    recorder.record_view(1)
+    recorder.flush()
+    recorder.record_view(1)
+    recorder.record_application(1)
+    recorder.flush()
+    assert _counters() == {1: (2, 1)}
+
+
+def test_unknown_jobs_and_viewers_are_dropped(recorder):
+    recorder.record_view(99)
+    recorder.record_view(1, viewer_id=42)
+    recorder.flush()
+    assert _counters() == {1: (1, 0)}
+    assert JobView.query.one().viewer_id is None
+
+
+def test_failed_flush_keeps_the_events(recorder, monkeypatch):
+    recorder.record_view(1)
+    recorder.record_application(1)
+
+    def fail(rows):
+        raise RuntimeError('database unavailable')
+
+    monkeypatch.setattr(job_stats, '_apply_increments', fail)
+    with pytest.raises(RuntimeError):
+        recorder.flush()
+    assert recorder.pending() == 2
+    monkeypatch.undo()
+    recorder.flush()
+    assert _counters() == {1: (1, 1)}
+    assert JobView.query.count() == 1
+
+
+def test_fallback_without_upsert(recorder, monkeypatch):
+    monkeypatch.setattr(job_stats, '_stats_upsert', lambda: None)
+    recorder.record_view(1)
+    recorder.flush()
+    recorder.record_view(1)
+    recorder.record_view(3)
+    recorder.flush()
+    assert _counters() == {1: (2, 0), 3: (1, 0)}
+
+
+def test_rebuild_recounts_from_views_and_applications(recorder):
+    recorder.record_view(1)
+    recorder.flush()
+    db.session.add_all([Application(job_id=2), Application(job_id=2)])
+    db.session.execute(JobApplicationStats.__table__.update().values(total_views=500))
+    db.session.commit()
+    assert rebuild_stats() == 2
+    assert _counters() == {1: (1, 0), 2: (0, 2)}
+
+
+def test_job_detail_records_a_view(recorder, client):
+    response = client.get('/api/jobs/1')
+    assert response.get_json()['stats'] == {'total_applications': 0, 'total_views': 0}
+    assert recorder.pending() == 1
+    recorder.flush()
+    assert client.get('/api/jobs/1').get_json()['stats']['total_views'] == 1
+
+
+def test_expanded_listing_is_not_served_stale_from_cache(recorder, client):
+    first = client.get('/api/jobs?expand=stats')
+    assert first.get_json()[0]['stats']['total_views'] == 0
+    recorder.record_view(1)
+    recorder.flush()
+    second = client.get('/api/jobs?expand=stats')
+    assert 'X-Cache' not in second.headers
+    assert second.get_json()[0]['stats']['total_views'] == 1
+    # The plain listing is still cached
+    client.get('/api/jobs')
+    assert client.get('/api/jobs').headers['X-Cache'] == 'HIT'
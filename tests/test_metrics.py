@@ -0,0 +1,98 @@
+import os
+import re
+
+import pytest
+from sqlalchemy import text
+
+import metrics
+from models_fixed import db, Job
+
+WORKER = f'worker="{os.getpid()}"'
+
+
+def test_histogram_and_counter_exposition(monkeypatch):
+    monkeypatch.setattr(metrics, 'REGISTRY', [])
+    latency = metrics.Histogram('demo_seconds', 'Demo latency', ('route',), buckets=(0.1, 1))
+    errors = metrics.Counter('demo_errors_total', 'Demo errors', ('error',))
+    for value in (0.05, 0.5, 0.5, 3):
+        latency.observe(value, route='/api/"jobs"')
+    errors.inc(error='timeout')
+    errors.inc(2, error='timeout')
+    text = metrics.render()
+    assert '# TYPE demo_seconds histogram\n' in text
+    assert f'demo_seconds_bucket{{route="/api/\\"jobs\\"",{WORKER},le="0.1"}} 1\n' in text
+    assert f'demo_seconds_bucket{{route="/api/\\"jobs\\"",{WORKER},le="1.0"}} 3\n' in text
+    assert f'demo_seconds_bucket{{route="/api/\\"jobs\\"",{WORKER},le="+Inf"}} 4\n' in text
+    assert f'demo_seconds_sum{{route="/api/\\"jobs\\"",{WORKER}}} 4.05\n' in text
+    assert f'demo_seconds_count{{route="/api/\\"jobs\\"",{WORKER}}} 4\n' in text
+    assert f'demo_errors_total{{error="timeout",{WORKER}}} 3\n' in text
+
+
+def _sample(text, line_prefix):
+    match = re.search(rf'^{re.escape(line_prefix)} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_requests_are_timed_per_route_with_their_sql(app, client):
+    with app.app_context():
+        db.session.add_all(Job(title=f'Job {i}', is_active=True) for i in range(3))
+        db.session.commit()
+    count = f'http_request_duration_seconds_count{{method="GET",route="/api/jobs/<int:job_id>",status="200",{WORKER}}}'
+    before = _sample(client.get('/metrics').get_data(as_text=True), count)
+
+    response = client.get('/api/jobs/2')
+    timing = response.headers['Server-Timing']
+    assert re.fullmatch(r'db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+', timing)
+    assert int(re.search(r'"(\d+) queries"', timing).group(1)) >= 1
+    client.get('/api/jobs/3')
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert client.get('/metrics').content_type == metrics.PROMETHEUS_CONTENT_TYPE
+    # Routes are labelled by rule, not by URL, so ids don't explode the label set
+    assert _sample(text, count) == before + 2
+    assert 'route="/api/jobs/2"' not in text
+    assert f'http_request_sql_queries_bucket{{method="GET",route="/api/jobs/<int:job_id>",{WORKER},le="1.0"}}' in text
+
+
+def test_firecrawl_calls_are_timed_and_errors_counted():
+    class HTTPError(Exception):
+        response = type('Response', (), {'status_code': 503})()
+
+    errors = f'firecrawl_errors_total{{operation="test-op",client="sync",error="http_503",{WORKER}}}'
+    before = _sample(metrics.render(), errors)
+    with metrics.observe_firecrawl('test-op'):
+        pass
+    with pytest.raises(HTTPError):
+        with metrics.observe_firecrawl('test-op'):
+            raise HTTPError()
+    text = metrics.render()
+    assert _sample(text, errors) == before + 1
+    ok = f'firecrawl_request_duration_seconds_count{{operation="test-op",client="sync",outcome="ok",{WORKER}}}'
+    assert _sample(text, ok) >= 1
+
+
+def test_failed_statements_leave_no_timing_state(app):
+    with app.app_context():
+        with db.engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(Exception):
+                    conn.execute(text('SELECT * FROM no_such_table'))
+            conn.execute(text('SELECT 1'))
+            assert not conn.info.get('query_start') and 'metrics_start' not in conn.info
+
+
+def test_profiling_is_opt_in_and_token_gated(client, monkeypatch, tmp_path):
+    assert client.get('/api/jobs', headers={'X-Profile': 'text'}).mimetype == 'application/json'
+
+    monkeypatch.setattr(metrics, 'PROFILE_REQUESTS', True)
+    monkeypatch.setattr(metrics, 'PROFILE_TOKEN', 'secret')
+    monkeypatch.setattr(metrics, 'PROFILE_DIR', str(tmp_path))
+    assert client.get('/api/jobs', headers={'X-Profile': 'text'}).mimetype == 'application/json'
+
+    profile = client.get('/api/jobs', headers={'X-Profile': 'text:secret'})
+    assert profile.mimetype == 'text/plain'
+    assert 'function calls' in profile.get_data(as_text=True)
+
+    dumped = client.get('/api/jobs', headers={'X-Profile': 'secret'})
+    assert dumped.mimetype == 'application/json'
+    assert (tmp_path / dumped.headers['X-Profile-File']).exists()
@@ -0,0 +1,93 @@
+import pytest
+
+from models_fixed import db, Job, Skill
+from pagination import PaginationError, decode_cursor, encode_cursor, parse_fields, parse_limit
+
+
+def test_cursor_round_trip():
+    token = encode_cursor({'k': 42})
+    assert '=' not in token
+    assert decode_cursor(token) == {'k': 42}
+    assert decode_cursor(None) == {}
+    for bad in ('not a cursor!', encode_cursor([1, 2])):
+        with pytest.raises(PaginationError):
+            decode_cursor(bad)
+
+
+def test_limit_and_fields_validation():
+    assert parse_limit(None) == 100
+    assert parse_limit('5000') == 1000
+    for bad in ('0', 'ten'):
+        with pytest.raises(PaginationError):
+            parse_limit(bad)
+    # The primary key is always projected
+    assert parse_fields(Job, 'title,location') == ['job_id', 'title', 'location']
+    with pytest.raises(PaginationError, match='password'):
+        parse_fields(Job, 'title,password')
+
+
+@pytest.fixture
+def jobs(app):
+    with app.app_context():
+        db.session.add_all(Job(title=f'Engineer {i}', location='Berlin', is_active=i != 3) for i in range(1, 8))
+        db.session.commit()
+
+
+def _walk(client, url, **params):
+    """Follow X-Next-Cursor to the end, returning the pages' ids"""
+    pages = []
+    while True:
+        response = client.get(url, query_string=params)
+        assert response.status_code == 200
+        pages.append([row['job_id'] for row in response.get_json()])
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            assert 'Link' not in response.headers
+            return pages
+        assert f'cursor={cursor}' in response.headers['Link']
+        params['cursor'] = cursor
+
+
+def test_keyset_pages_cover_every_row_once(client, jobs):
+    assert _walk(client, '/api/jobs', limit=2) == [[1, 2], [4, 5], [6, 7]]
+    assert _walk(client, '/api/jobs', limit=6) == [[1, 2, 4, 5, 6, 7]]
+
+
+def test_rows_added_between_pages_are_not_skipped_or_repeated(app, client, jobs):
+    first = client.get('/api/jobs?limit=3')
+    with app.app_context():
+        db.session.delete(db.session.get(Job, 1))
+        db.session.add(Job(title='Engineer 8', is_active=True))
+        db.session.commit()
+    rest = client.get('/api/jobs', query_string={'limit': 10, 'cursor': first.headers['X-Next-Cursor']})
+    assert [j['job_id'] for j in rest.get_json()] == [5, 6, 7, 8]
+
+
+def test_field_projection(client, jobs):
+    rows = client.get('/api/jobs?fields=title&limit=2').get_json()
+    assert rows == [{'job_id': 1, 'title': 'Engineer 1'}, {'job_id': 2, 'title': 'Engineer 2'}]
+
+
+def test_bad_parameters_are_400(client):
+    for query in ('limit=abc', 'cursor=%%%', 'fields=nope'):
+        response = client.get(f'/api/jobs?{query}')
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+
+@pytest.mark.parametrize('key', [{'x': 1}, [1, 2], '5', True, None])
+def test_cursor_keys_must_match_the_key_column(client, key):
+    for path in ('/api/candidates', '/api/jobs'):
+        response = client.get(path, query_string={'cursor': encode_cursor({'k': key})})
+        assert response.status_code == 400
+        assert response.get_json() == {'success': False, 'error': 'Invalid cursor'}
+
+
+def test_other_list_endpoints_paginate(app, client):
+    with app.app_context():
+        db.session.add_all(Skill(name=f'skill {i}') for i in range(5))
+        db.session.commit()
+    first = client.get('/api/skills?limit=3')
+    assert len(first.get_json()) == 3
+    rest = client.get('/api/skills', query_string={'cursor': first.headers['X-Next-Cursor']})
+    assert [s['name'] for s in rest.get_json()] == ['skill 3', 'skill 4']
@@ -0,0 +1,62 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import parse_pool
+from parse_pool import iter_parsed
+
+
+def parse_page(page_no, count):
+    """Module-level so the worker processes can unpickle it"""
+    return [{'page': page_no, 'job': i} for i in range(count)]
+
+
+class Pages:
+    """A page generator that records how far it has been read"""
+
+    def __init__(self, n):
+        self.n = n
+        self.pulled = 0
+
+    def __iter__(self):
+        for page_no in range(self.n):
+            self.pulled += 1
+            yield (page_no, 2)
+
+
+def _expected(n):
+    return [{'page': p, 'job': i} for p in range(n) for i in range(2)]
+
+
+@pytest.mark.parametrize('max_workers, min_pages', [(1, 16), (4, 1000)])
+def test_inline_parse_reads_pages_chunk_by_chunk(max_workers, min_pages):
+    pages = Pages(10)
+    jobs = iter_parsed(pages, parse_page, chunk_size=3, max_workers=max_workers, min_pages=min_pages)
+    assert next(jobs) == {'page': 0, 'job': 0}
+    if max_workers == 1:
+        assert pages.pulled == 3
+    assert [next(jobs) for _ in range(5)] == _expected(10)[1:6]
+    assert list(jobs) == _expected(10)[6:]
+
+
+def test_pool_keeps_page_order():
+    try:
+        assert list(iter_parsed(Pages(25), parse_page, chunk_size=2, max_workers=2, min_pages=1)) == _expected(25)
+    finally:
+        parse_pool.shutdown_parse_pool()
+
+
+class BrokenPool:
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool('worker died'))
+        return future
+
+
+def test_broken_pool_finishes_inline(monkeypatch):
+    monkeypatch.setattr(parse_pool, 'get_parse_pool', lambda: BrokenPool())
+    shutdowns = []
+    monkeypatch.setattr(parse_pool, 'shutdown_parse_pool', lambda wait=True: shutdowns.append(wait))
+    assert list(iter_parsed(Pages(9), parse_page, chunk_size=2, max_workers=2, min_pages=1)) == _expected(9)
+    assert shutdowns == [False]
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models_fixed import db, Application, ApplicationPipeline, Candidate, Job, PipelineNote, PipelineStage, User
+
+T0 = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def pipeline(app):
+    """Job 1: applications 1-5 screened, 6 interviewing via history, 7 by status only; job 2 elsewhere"""
+    with app.app_context():
+        db.session.add_all([PipelineStage(stage_id=1, name='Applied'), PipelineStage(stage_id=2, name='Screening'),
+                            PipelineStage(stage_id=3, name='Interview'), PipelineStage(stage_id=4, name='Offer')])
+        db.session.add_all([Job(job_id=1, title='Backend', is_active=True), Job(job_id=2, title='Other', is_active=True)])
+        db.session.add(User(user_id=1, email='recruiter@example.com', role='employer'))
+        db.session.add_all([Candidate(candidate_id=i) for i in range(1, 9)])
+        db.session.add_all([Application(application_id=i, candidate_id=i, job_id=1, current_status='Applied')
+                            for i in range(1, 8)])
+        db.session.add(Application(application_id=8, candidate_id=8, job_id=2, current_status='Applied'))
+        db.session.add_all([ApplicationPipeline(application_id=i, stage_id=1, moved_at=T0) for i in range(1, 7)])
+        db.session.add_all([ApplicationPipeline(application_id=i, stage_id=2, moved_at=T0 + timedelta(hours=i))
+                            for i in range(1, 7)])
+        db.session.add(ApplicationPipeline(application_id=6, stage_id=3, moved_at=T0 + timedelta(days=1)))
+        db.session.add(ApplicationPipeline(application_id=8, stage_id=2, moved_at=T0))
+        db.session.get(Application, 7).current_status = 'interview'
+        db.session.add_all([PipelineNote(application_id=2, author_id=1, note_text='first call'),
+                            PipelineNote(application_id=2, author_id=1, note_text='strong SQL')])
+        db.session.commit()
+
+
+def _columns(body):
+    return {s['name']: (s['count'], [c['application_id'] for c in s['cards']]) for s in body['stages']}
+
+
+def test_board_counts_and_cards_per_stage(client, pipeline):
+    body = client.get('/api/jobs/1/pipeline?cards=3').get_json()
+    assert _columns(body) == {
+        'Applied': (0, []),
+        # Most recently moved first
+        'Screening': (5, [5, 4, 3]),
+        # Latest history row wins; no history falls back to current_status
+        # (moved at its updated_at, which is after every seeded move)
+        'Interview': (2, [7, 6]),
+        'Offer': (0, []),
+    }
+    screening = body['stages'][1]
+    assert screening['next_cursor'] is not None
+    assert body['stages'][2]['next_cursor'] is None
+
+
+def test_cards_carry_the_latest_note(client, pipeline):
+    cards = client.get('/api/jobs/1/pipeline?cards=10').get_json()['stages'][1]['cards']
+    notes = {c['application_id']: c['latest_note'] for c in cards}
+    assert notes[2]['note_text'] == 'strong SQL'
+    assert notes[1] is None
+
+
+def test_column_pages_continue_from_the_board(client, pipeline):
+    screening = client.get('/api/jobs/1/pipeline?cards=2').get_json()['stages'][1]
+    seen = [c['application_id'] for c in screening['cards']]
+    cursor = screening['next_cursor']
+    while cursor:
+        page = client.get('/api/jobs/1/pipeline/stages/2/cards', query_string={'cursor': cursor, 'limit': 2})
+        seen += [c['application_id'] for c in page.get_json()]
+        cursor = page.headers.get('X-Next-Cursor')
+    assert seen == [5, 4, 3, 2, 1]
+
+
+def test_board_is_invalidated_by_stage_moves(client, pipeline, app):
+    before = _columns(client.get('/api/jobs/1/pipeline').get_json())
+    with app.app_context():
+        db.session.add(ApplicationPipeline(application_id=1, stage_id=4, moved_at=T0 + timedelta(days=2)))
+        db.session.commit()
+    after = _columns(client.get('/api/jobs/1/pipeline').get_json())
+    assert before['Offer'] == (0, []) and after['Offer'] == (1, [1])
+    assert after['Screening'][0] == 4
+
+
+def test_bad_parameters(client, pipeline):
+    assert client.get('/api/jobs/1/pipeline?cards=0').status_code == 400
+    assert client.get('/api/jobs/1/pipeline/stages/2/cards?cursor=abc').status_code == 400
+    assert client.get('/api/jobs/99/pipeline').status_code == 404
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import readiness
+import skill_matching
+from models_fixed import (db, Candidate, CandidateSkill, Job, JobReadinessScore, JobRequiredSkill,
+                          ReadinessDirtyPair, Skill)
+
+
+@pytest.fixture
+def board(ctx):
+    db.session.add_all([Skill(skill_id=i, name=name) for i, name in [(1, 'Python'), (2, 'SQL'), (3, 'Go')]])
+    db.session.add_all([Job(job_id=1, title='Backend', is_active=True), Job(job_id=2, title='Data', is_active=True)])
+    db.session.add_all([Candidate(candidate_id=1), Candidate(candidate_id=2)])
+    db.session.add_all([
+        JobRequiredSkill(job_id=1, skill_id=1, required_proficiency=80),
+        JobRequiredSkill(job_id=2, skill_id=2, required_proficiency=50),
+    ])
+    db.session.commit()
+
+
+def _dirty():
+    return sorted((p.candidate_id, p.job_id) for p in ReadinessDirtyPair.query)
+
+
+def _scores():
+    return {(s.candidate_id, s.job_id): float(s.readiness_score) for s in JobReadinessScore.query}
+
+
+def test_skill_changes_mark_only_affected_pairs(board):
+    db.session.add(CandidateSkill(candidate_id=1, skill_id=1, proficiency=40))
+    db.session.commit()
+    assert _dirty() == [(1, 1)]
+
+    db.session.add(JobRequiredSkill(job_id=2, skill_id=3, required_proficiency=10))
+    db.session.add(CandidateSkill(candidate_id=2, skill_id=3, proficiency=10))
+    db.session.commit()
+    assert _dirty() == [(1, 1), (2, 2)]
+
+
+def test_rolled_back_changes_mark_nothing(board):
+    db.session.add(CandidateSkill(candidate_id=1, skill_id=1, proficiency=40))
+    db.session.flush()
+    db.session.rollback()
+    assert _dirty() == []
+
+
+def test_recompute_scores_dirty_pairs_and_clears_them(board):
+    db.session.add_all([CandidateSkill(candidate_id=1, skill_id=1, proficiency=40),
+                        CandidateSkill(candidate_id=2, skill_id=2, proficiency=50)])
+    db.session.commit()
+    assert readiness.recompute_dirty() == 2
+    assert _scores() == {(1, 1): 50.0, (2, 2): 100.0}
+    assert _dirty() == []
+    assert readiness.recompute_dirty() == 0
+
+    # Raising the proficiency re-scores only that pair
+    skill = db.session.get(CandidateSkill, (1, 1))
+    skill.proficiency = 80
+    db.session.commit()
+    assert _dirty() == [(1, 1)]
+    readiness.recompute_dirty()
+    assert _scores() == {(1, 1): 100.0, (2, 2): 100.0}
+
+
+def test_scores_are_dropped_when_pairs_stop_sharing_skills(board, client):
+    db.session.add(CandidateSkill(candidate_id=1, skill_id=1, proficiency=40))
+    db.session.commit()
+    readiness.recompute_dirty()
+    assert (1, 1) in _scores()
+
+    assert client.put('/api/candidates/1/skills', json=[{'skill_id': 3, 'proficiency': 90}]).status_code == 200
+    db.session.expire_all()
+    assert _dirty() == [(1, 1)]
+    readiness.recompute_dirty()
+    assert _scores() == {}
+
+
+def test_pairs_remarked_during_a_recompute_stay_dirty(board, monkeypatch):
+    db.session.add(CandidateSkill(candidate_id=1, skill_id=1, proficiency=40))
+    db.session.commit()
+    build_matches = skill_matching.build_matches
+
+    def remark_midway(*args):
+        db.session.execute(ReadinessDirtyPair.__table__.update().values(
+            marked_at=datetime.utcnow() + timedelta(seconds=5)))
+        return build_matches(*args)
+
+    monkeypatch.setattr(skill_matching, 'build_matches', remark_midway)
+    readiness.recompute_dirty()
+    assert _dirty() == [(1, 1)]
+
+
+def test_rebuild_marks_every_pair_and_clears_inactive_jobs(board):
+    db.session.add(CandidateSkill(candidate_id=1, skill_id=1, proficiency=40))
+    db.session.commit()
+    readiness.recompute_dirty()
+    db.session.get(Job, 1).is_active = False
+    db.session.commit()
+    assert readiness.mark_all_dirty() == 1
+    readiness.recompute_dirty()
+    assert _scores() == {}
+
+
+def test_match_endpoints_read_stored_scores(board, client):
+    db.session.add_all([CandidateSkill(candidate_id=1, skill_id=1, proficiency=80),
+                        CandidateSkill(candidate_id=2, skill_id=1, proficiency=40)])
+    db.session.commit()
+    body = client.get('/api/jobs/1/candidate-matches').get_json()
+    assert body['matches'] == [] and body['pending_recompute'] == 2
+
+    readiness.recompute_dirty()
+    body = client.get('/api/jobs/1/candidate-matches?top_k=1').get_json()
+    assert [(m['candidate_id'], m['readiness_score']) for m in body['matches']] == [(1, 100.0)]
+    assert body['pending_recompute'] == 0
+    jobs = client.get('/api/candidates/2/job-matches').get_json()['matches']
+    assert [(m['job_id'], m['readiness_score']) for m in jobs] == [(1, 50.0)]
+    assert client.get('/api/candidates/2/job-matches?top_k=x').status_code == 400
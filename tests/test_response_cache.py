@@ -0,0 +1,54 @@
+import pytest
+
+import response_cache
+from response_cache import MemoryStore, ResponseCache, create_store
+
+
+def test_memory_store_for_a_single_process():
+    assert isinstance(create_store('', processes=1), MemoryStore)
+
+
+def test_cache_is_off_for_several_processes_without_a_shared_store(monkeypatch):
+    with pytest.warns(UserWarning, match='shared store'):
+        assert create_store('', processes=4) is None
+    monkeypatch.setattr(response_cache, 'create_store', lambda: None)
+    cache = ResponseCache()
+    assert not cache.enabled
+    # Invalidation and clearing are no-ops rather than errors
+    cache.tables.add('jobs')
+    cache.invalidate(['jobs'])
+    cache.clear()
+
+
+def _add_jobs(app, count):
+    from models_fixed import db, Job
+    with app.app_context():
+        db.session.add_all(Job(title=f'Engineer {i}', is_active=True) for i in range(count))
+        db.session.commit()
+
+
+def test_cache_hit_replays_pagination_headers(app, client):
+    _add_jobs(app, 5)
+    first = client.get('/api/jobs?limit=2')
+    second = client.get('/api/jobs?limit=2')
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert first.headers['X-Next-Cursor']
+    for header in ('X-Next-Cursor', 'Link', 'Content-Type', 'ETag'):
+        assert second.headers[header] == first.headers[header]
+    assert second.get_json() == first.get_json()
+
+    # The replayed cursor still leads to page two
+    page2 = client.get('/api/jobs', query_string={'limit': 2, 'cursor': second.headers['X-Next-Cursor']})
+    assert [j['job_id'] for j in page2.get_json()] == [3, 4]
+
+
+def test_conditional_get_and_invalidation_on_write(app, client):
+    _add_jobs(app, 2)
+    first = client.get('/api/jobs')
+    assert client.get('/api/jobs', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    _add_jobs(app, 1)
+    after = client.get('/api/jobs')
+    assert after.headers['X-Cache'] == 'MISS'
+    assert len(after.get_json()) == 3
@@ -0,0 +1,120 @@
+import zipfile
+import zlib
+
+import pytest
+
+import resume_parser
+from resume_parser import extract_text, file_type_for, parse_fields, parse_resume_file
+
+RESUME = """Jane Doe
+Senior Backend Engineer
+jane@example.com | +1 555 0100 1234
+
+Summary
+Backend engineer building payment systems in Python and Go.
+
+Technical Skills
+Languages: Python, Go, SQL
+PostgreSQL; Redis | python
+
+Work Experience
+Acme Corp
+Senior Engineer, Jan 2020 - Present
+Engineer at Initech 2016 to 2019
+
+Education
+BSc Computer Science, State University, 2015
+Chess club captain
+"""
+
+
+def test_parse_fields():
+    fields = parse_fields(RESUME)
+    assert fields['parsed_title'] == 'Senior Backend Engineer'
+    assert fields['parsed_summary'] == 'Backend engineer building payment systems in Python and Go.'
+    # Labels dropped, duplicates (case-insensitive) removed, order kept
+    assert fields['parsed_skills'] == ['Python', 'Go', 'SQL', 'PostgreSQL', 'Redis']
+    assert fields['parsed_experience'] == [
+        {'title': 'Senior Engineer,', 'start': 'Jan 2020', 'end': 'Present'},
+        {'title': 'Engineer at Initech', 'start': '2016', 'end': '2019'},
+    ]
+    assert fields['parsed_education'] == [{'degree': 'BSc Computer Science, State University, 2015', 'year': 2015}]
+
+
+def test_parse_fields_without_headings():
+    fields = parse_fields('Data Analyst\nI turn messy spreadsheets into dashboards that people actually read.\n')
+    assert fields['parsed_title'] == 'Data Analyst'
+    assert fields['parsed_summary'].startswith('I turn messy spreadsheets')
+    assert fields['parsed_skills'] == [] and fields['parsed_experience'] == [] and fields['parsed_education'] == []
+
+
+def test_experience_title_falls_back_to_previous_line():
+    fields = parse_fields('Experience\nStaff Engineer, Globex\n03/2018 – 2021\n')
+    assert fields['parsed_experience'] == [{'title': 'Staff Engineer, Globex', 'start': '03/2018', 'end': '2021'}]
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('cv.PDF', 'pdf'), ('resume.final.docx', 'docx'), ('notes.md', 'md'), ('cv.exe', None), ('README', None), (None, None)
+])
+def test_file_type_for(name, expected):
+    assert file_type_for(name) == expected
+
+
+def _docx(path, paragraphs):
+    body = ''.join(f'<w:p><w:r><w:t>{p}</w:t></w:r></w:p>' for p in paragraphs)
+    xml = ('<?xml version="1.0"?><w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+           f'<w:body>{body}</w:body></w:document>')
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('word/document.xml', xml)
+
+
+def _pdf(path, lines, compress):
+    ops = b'BT ' + b' T* '.join(b'(' + line.encode().replace(b'(', b'\\(').replace(b')', b'\\)') + b') Tj'
+                               for line in lines) + b' ET'
+    stream = zlib.compress(ops) if compress else ops
+    path.write_bytes(b'%PDF-1.4\n1 0 obj\n<< >>\nstream\n' + stream + b'\nendstream\nendobj\n%%EOF\n')
+
+
+@pytest.mark.parametrize('file_type', ['txt', 'html', 'rtf', 'docx', 'pdf', 'pdf-deflate'])
+def test_extract_text_formats(tmp_path, monkeypatch, file_type):
+    lines = ['Platform Engineer (SRE)', 'Skills', 'Kubernetes, Terraform']
+    path = tmp_path / 'resume'
+    if file_type == 'txt':
+        path.write_text('\n'.join(lines))
+    elif file_type == 'html':
+        path.write_text('<html><style>p{}</style><body>' + ''.join(f'<p>{line}</p>' for line in lines)
+                        + '<script>var x;</script></body></html>')
+    elif file_type == 'rtf':
+        path.write_text(r'{\rtf1{\*\generator x;}' + r'\par '.join(lines) + '}')
+    elif file_type == 'docx':
+        _docx(path, lines)
+    else:
+        # The standard-library reader (pypdf is optional)
+        monkeypatch.setattr(resume_parser, 'pypdf', None)
+        _pdf(path, lines, compress=file_type == 'pdf-deflate')
+    text = extract_text(str(path), file_type.split('-')[0])
+    assert [line.strip() for line in text.splitlines() if line.strip()] == lines
+
+
+def test_pdf_fallback_decodes_escapes_and_kerning():
+    data = b'stream\nBT [(Sen)-20(ior)-300(Dev)] TJ (caf\\351 \\(x\\)) Tj ET\nendstream'
+    assert resume_parser._pdf_text_fallback(data) == 'Senior Devcaf\xe9 (x)\n'
+
+
+def test_parse_resume_file_outcomes(tmp_path):
+    path = tmp_path / 'cv.txt'
+    path.write_text(RESUME)
+    [parsed] = parse_resume_file(7, str(path), 'txt')
+    assert parsed['resume_id'] == 7 and parsed['parse_status'] == 'parsed' and parsed['parse_error'] is None
+    assert parsed['parsed_title'] == 'Senior Backend Engineer'
+
+    [missing] = parse_resume_file(8, str(tmp_path / 'gone.txt'), 'txt')
+    assert missing == {'resume_id': 8, 'parse_status': 'failed', 'parse_error': 'Stored file is missing'}
+
+    blank = tmp_path / 'blank.txt'
+    blank.write_text('  \n')
+    [empty] = parse_resume_file(9, str(blank), 'txt')
+    assert empty['parse_status'] == 'failed' and 'No text' in empty['parse_error']
+
+    [corrupt] = parse_resume_file(10, str(path), 'docx')
+    assert corrupt['parse_status'] == 'failed' and corrupt['parse_error'].startswith('BadZipFile')
@@ -0,0 +1,160 @@
+import io
+import os
+from datetime import datetime, timedelta
+from functools import partial
+
+import pytest
+
+import parse_pool
+import resume_pipeline
+from models_fixed import db, Candidate, Resume
+
+RESUME = b'Backend Engineer\nSkills\nPython, Go\nExperience\nEngineer at Acme 2019 - present\n'
+
+
+@pytest.fixture
+def uploads(app, tmp_path, monkeypatch):
+    """Upload directory under tmp_path, candidate 1, and parsing inline in this process"""
+    directory = tmp_path / 'uploads'
+    monkeypatch.setattr(resume_pipeline, 'RESUME_UPLOAD_DIR', str(directory))
+    monkeypatch.setattr(resume_pipeline, 'iter_parsed', partial(parse_pool.iter_parsed, max_workers=1))
+    with app.app_context():
+        db.session.add(Candidate(candidate_id=1))
+        db.session.commit()
+    return directory
+
+
+def _upload(client, content=RESUME, filename='cv.txt', candidate_id='1'):
+    data = {'file': (io.BytesIO(content), filename)}
+    if candidate_id is not None:
+        data['candidate_id'] = candidate_id
+    return client.post('/api/resumes', data=data, content_type='multipart/form-data')
+
+
+def _files(directory):
+    return sorted(os.path.relpath(os.path.join(root, name), directory)
+                  for root, _, names in os.walk(directory) for name in names)
+
+
+def _parse_all(app):
+    with app.app_context():
+        return resume_pipeline.parse_pending()
+
+
+def test_upload_is_stored_pending_then_parsed(client, uploads, app):
+    resp = _upload(client)
+    assert resp.status_code == 201
+    body = resp.get_json()
+    assert body['parse_status'] == 'pending'
+    assert body['file_name'] == 'cv.txt' and body['file_type'] == 'txt' and body['file_size'] == len(RESUME)
+    with app.app_context():
+        stored = db.session.get(Resume, body['resume_id']).storage_path
+    # No temp files left behind
+    assert _files(uploads) == [stored]
+    assert (uploads / stored).read_bytes() == RESUME
+
+    assert _parse_all(app) == 1
+    detail = client.get(f"/api/resumes/{body['resume_id']}").get_json()
+    assert detail['parse_status'] == 'parsed' and detail['parse_error'] is None
+    assert detail['parsed_title'] == 'Backend Engineer'
+    assert detail['parsed_skills'] == ['Python', 'Go']
+    assert detail['parsed_at'] is not None
+    assert _parse_all(app) == 0
+
+
+@pytest.mark.parametrize('kwargs, status, error', [
+    ({'filename': 'cv.exe'}, 400, 'Unsupported file type'),
+    ({'filename': ''}, 400, 'is required'),
+    ({'candidate_id': None}, 400, 'candidate_id is required'),
+    ({'candidate_id': '2'}, 404, 'Candidate not found'),
+])
+def test_rejected_uploads_leave_no_files(client, uploads, app, kwargs, status, error):
+    resp = _upload(client, **kwargs)
+    assert resp.status_code == status
+    assert error in resp.get_json()['error']
+    assert _files(uploads) == []
+    with app.app_context():
+        assert Resume.query.count() == 0
+
+
+def test_oversized_upload_is_413(client, uploads, monkeypatch):
+    monkeypatch.setattr(resume_pipeline, 'RESUME_MAX_BYTES', 1024)
+    # Past the form overhead allowance: the body is cut off while streaming
+    resp = _upload(client, content=b'x' * (resume_pipeline._FORM_OVERHEAD + 4096))
+    assert resp.status_code == 413
+    # Within the allowance but over the file limit: rejected once stored
+    resp = _upload(client, content=b'x' * 2048)
+    assert resp.status_code == 400 and 'exceeds 1024 bytes' in resp.get_json()['error']
+    assert _files(uploads) == []
+
+
+def test_failures_are_recorded_and_reparsed(client, uploads, app):
+    ok = _upload(client).get_json()['resume_id']
+    bad = _upload(client, content=b'not a zip', filename='cv.docx').get_json()['resume_id']
+    assert _parse_all(app) == 2
+    assert client.get(f'/api/resumes/{bad}').get_json()['parse_status'] == 'failed'
+    assert client.get('/api/resumes/parse-status').get_json()['counts'] == {'parsed': 1, 'failed': 1}
+
+    resp = client.post('/api/resumes/reparse', json={'failed_only': True})
+    assert resp.get_json() == {'success': True, 'queued': 1}
+    detail = client.get(f'/api/resumes/{bad}').get_json()
+    assert detail['parse_status'] == 'pending' and detail['parse_error'] is None
+
+    assert client.post('/api/resumes/reparse', json={}).get_json()['queued'] == 2
+    assert _parse_all(app) == 2
+    assert client.get(f'/api/resumes/{ok}').get_json()['parse_status'] == 'parsed'
+    assert client.post('/api/resumes/reparse', json={'resume_ids': ['1']}).status_code == 400
+
+
+def test_reparse_skips_leased_and_fileless_resumes(client, uploads, app):
+    leased = _upload(client).get_json()['resume_id']
+    with app.app_context():
+        db.session.add(Resume(candidate_id=1, file_name='legacy.pdf'))
+        db.session.get(Resume, leased).parse_status = 'parsing'
+        db.session.get(Resume, leased).parse_started_at = datetime.utcnow()
+        db.session.commit()
+    assert client.post('/api/resumes/reparse', json={'candidate_id': 1}).get_json()['queued'] == 0
+    assert client.get('/api/resumes/parse-status').get_json()['counts'] == {'parsing': 1}
+
+
+def test_batches_and_abandoned_leases(client, uploads, app, monkeypatch):
+    ids = [_upload(client).get_json()['resume_id'] for _ in range(3)]
+    with app.app_context():
+        lease, claimed = resume_pipeline._claim_batch(2)
+        assert [row[0] for row in claimed] == ids[:2]
+        # A live lease is not claimed again
+        assert [row[0] for row in resume_pipeline._claim_batch(5)[1]] == ids[2:]
+        assert resume_pipeline._claim_batch(5)[1] == []
+
+    monkeypatch.setattr(resume_pipeline, 'RESUME_PARSE_LEASE', 0)
+    with app.app_context():
+        # Every lease is now stale and taken over
+        assert resume_pipeline.parse_pending(batch_size=5) == 3
+    counts = client.get('/api/resumes/parse-status').get_json()['counts']
+    assert counts == {'parsed': 3}
+
+
+def test_results_of_a_lost_lease_are_dropped(client, uploads, app, monkeypatch):
+    resume_id = _upload(client).get_json()['resume_id']
+    real_claim = resume_pipeline._claim_batch
+
+    def claim_then_lose_lease(batch_size):
+        lease, claimed = real_claim(batch_size)
+        # Another worker takes the batch over while this one is parsing
+        db.session.query(Resume).filter_by(resume_id=resume_id).update(
+            {'parse_started_at': lease + timedelta(seconds=1)})
+        db.session.commit()
+        return lease, claimed
+
+    monkeypatch.setattr(resume_pipeline, '_claim_batch', claim_then_lose_lease)
+    with app.app_context():
+        resume_pipeline.parse_pending()
+    detail = client.get(f'/api/resumes/{resume_id}').get_json()
+    assert detail['parse_status'] == 'parsing' and detail['parsed_title'] is None
+
+
+def test_worker_run_once(uploads, client, app):
+    _upload(client)
+    with app.app_context():
+        assert resume_pipeline.resume_parser_worker.run_once() is True
+        assert resume_pipeline.resume_parser_worker.run_once() is False
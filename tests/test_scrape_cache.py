@@ -0,0 +1,167 @@
+import pytest
+
+import firecrawl_utils
+import scrape_cache as scrape_cache_module
+from scrape_cache import ScrapeCache, content_hash, normalize_url
+
+
+def test_equivalent_urls_share_a_key():
+    assert normalize_url('HTTPS://Jobs.Example.com:443/board/?b=2&a=1&utm_source=x#top') == \
+        'https://jobs.example.com/board?a=1&b=2'
+    assert normalize_url('http://example.com:8080') == 'http://example.com:8080/'
+    assert normalize_url('https://example.com/a?page=1') != normalize_url('https://example.com/a?page=2')
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scrape_cache_module.time, 'time', clock)
+    return clock
+
+
+def test_entries_go_stale_after_the_ttl(clock):
+    cache = ScrapeCache(ttl=60, db_path=None)
+    cache.put('https://example.com/jobs', 'h1', {'jobs': []})
+    assert cache.lookup('https://example.com/jobs/')['fresh'] is True
+    clock.now += 61
+    entry = cache.lookup('https://example.com/jobs')
+    # Stale entries are still returned for the content-hash check
+    assert entry['fresh'] is False
+    assert entry['content_hash'] == 'h1'
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ScrapeCache(max_entries=2, db_path=None)
+    cache.put('https://example.com/1', 'h', {})
+    cache.put('https://example.com/2', 'h', {})
+    cache.lookup('https://example.com/1')
+    cache.put('https://example.com/3', 'h', {})
+    assert cache.lookup('https://example.com/2') is None
+    assert cache.lookup('https://example.com/1') is not None
+
+
+def test_sqlite_backing_survives_restarts(tmp_path, clock):
+    path = str(tmp_path / 'scrape_cache.db')
+    cache = ScrapeCache(max_entries=1, db_path=path)
+    cache.put('https://example.com/1', 'h1', {'jobs': [{'title': 'A'}]})
+    cache.put('https://example.com/2', 'h2', {'jobs': []})
+    cache.mark_imported('https://example.com/1', 7)
+
+    restarted = ScrapeCache(max_entries=1, db_path=path)
+    entry = restarted.lookup('https://example.com/1')
+    assert entry['result'] == {'jobs': [{'title': 'A'}]}
+    assert entry['imported_by'] == [7]
+    restarted.invalidate('https://example.com/1')
+    assert ScrapeCache(db_path=path).lookup('https://example.com/1') is None
+
+
+class FakeClient:
+    def __init__(self, content):
+        self.content = content
+        self.calls = 0
+
+    def scrape_page(self, url):
+        self.calls += 1
+        return {'success': True, 'markdown': self.content, 'pageTitle': 'Jobs'}
+
+
+PAGE = '# Backend Engineer\nLocation: Berlin\nBuild APIs in Python for our platform team.\n'
+
+
+@pytest.fixture
+def scraper(monkeypatch, clock):
+    monkeypatch.setenv('FIRECRAWL_API_KEY', 'test-key')
+    cache = ScrapeCache(ttl=60, db_path=None)
+    monkeypatch.setattr(firecrawl_utils, 'scrape_cache', cache)
+    # The import routes record imports on the same cache
+    monkeypatch.setattr('app.scrape_cache', cache)
+    client = FakeClient(PAGE)
+    monkeypatch.setattr(firecrawl_utils, 'get_client', lambda: client)
+    return client, cache
+
+
+def test_fresh_hit_skips_firecrawl(scraper):
+    client, cache = scraper
+    first = firecrawl_utils.scrape_job_page('https://example.com/jobs')
+    assert first['cached'] is False and first['job_count'] >= 1
+    second = firecrawl_utils.scrape_job_page('https://example.com/jobs?utm_medium=mail')
+    assert second['cached'] is True
+    assert second['jobs'] == first['jobs']
+    assert client.calls == 1
+    assert firecrawl_utils.scrape_job_page('https://example.com/jobs', use_cache=False)['cached'] is False
+    assert client.calls == 2
+
+
+def test_stale_unchanged_page_is_not_reparsed(scraper, clock, monkeypatch):
+    client, cache = scraper
+    firecrawl_utils.scrape_job_page('https://example.com/jobs')
+    cache.mark_imported('https://example.com/jobs', 1)
+    clock.now += 120
+
+    def no_parse(content, url):
+        raise AssertionError('unchanged page was parsed again')
+
+    monkeypatch.setattr(firecrawl_utils.JobParser, 'extract_jobs_from_page', staticmethod(no_parse))
+    result = firecrawl_utils.scrape_job_page('https://example.com/jobs')
+    assert client.calls == 2
+    assert result['unchanged'] is True
+    assert result['imported_by'] == [1]
+    assert cache.lookup('https://example.com/jobs')['content_hash'] == content_hash(PAGE)
+
+
+def test_hits_report_the_requested_url(scraper, clock, client):
+    firecrawl_utils.scrape_job_page('https://a.com/job')
+    assert firecrawl_utils.scrape_job_page('https://a.com/job/')['url'] == 'https://a.com/job/'
+    clock.now += 120
+    # Stale, unchanged content
+    assert firecrawl_utils.scrape_job_page('https://A.com/job#top')['url'] == 'https://A.com/job#top'
+
+    urls = ['https://a.com/job/', 'https://b.com/x?utm_source=1']
+    body = client.post('/api/scrape-batch', json={'urls': urls}).get_json()
+    assert body['total'] == 2
+    assert [r['url'] for r in body['results']] == urls
+    assert body['results'][0]['cached'] is True
+
+
+def test_import_skip_is_per_employer_and_rechecks_jobs(scraper, client, app):
+    from models_fixed import db, Job
+
+    def scrape_and_import(employer_id):
+        resp = client.post('/api/scrape-and-import',
+                           json={'url': 'https://example.com/jobs', 'employer_id': employer_id})
+        return resp.status_code, resp.get_json()
+
+    assert scrape_and_import(1)[0] == 201
+    status, body = scrape_and_import(1)
+    assert status == 200 and body['unchanged'] is True and body['jobs'] == []
+    # Another employer's import of the same page is not refused
+    status, body = scrape_and_import(2)
+    assert status == 201
+    with app.app_context():
+        Job.query.delete()
+        db.session.commit()
+    # Nor is re-importing once the imported jobs are gone
+    status, body = scrape_and_import(1)
+    assert status == 201 and body['jobs_added'] >= 1
+
+
+def test_cache_files_without_employer_tracking_are_upgraded(tmp_path):
+    import sqlite3
+    path = str(tmp_path / 'old.db')
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE scrape_cache (url_key TEXT PRIMARY KEY, content_hash TEXT NOT NULL, '
+                     'result_json TEXT NOT NULL, fetched_at REAL NOT NULL, imported INTEGER NOT NULL DEFAULT 0)')
+        conn.execute("INSERT INTO scrape_cache VALUES ('https://example.com/', 'h', '{}', 1.0, 1)")
+    conn.close()
+    cache = ScrapeCache(db_path=path)
+    assert cache.lookup('https://example.com')['imported_by'] == []
+    cache.mark_imported('https://example.com', 3)
+    assert ScrapeCache(db_path=path).lookup('https://example.com')['imported_by'] == [3]
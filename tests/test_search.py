@@ -0,0 +1,60 @@
+from sqlalchemy import insert, text
+
+import search_index
+from models_fixed import db, Job
+
+
+def _add_jobs(*jobs):
+    db.session.execute(insert(Job.__table__), [dict(job, is_active=True) for job in jobs])
+    db.session.commit()
+
+
+def _titles(client, keywords):
+    response = client.get('/api/jobs', query_string={'keywords': keywords})
+    assert response.status_code == 200
+    return [job['title'] for job in response.get_json()]
+
+
+def test_keyword_search_ranks_title_matches_first(ctx):
+    _add_jobs(
+        {'title': 'Office Manager', 'description': 'Keeps the python team supplied'},
+        {'title': 'Senior Python Engineer', 'description': 'Backend services'},
+        {'title': 'Data Analyst', 'description': 'SQL and dashboards'},
+    )
+    assert _titles(ctx.test_client(), 'python') == ['Senior Python Engineer', 'Office Manager']
+
+
+def test_all_terms_required_and_prefixes_match(ctx):
+    _add_jobs(
+        {'title': 'Python Engineer', 'description': 'Remote backend role'},
+        {'title': 'Python Tutor', 'description': 'Evenings'},
+    )
+    client = ctx.test_client()
+    assert _titles(client, 'pyth eng') == ['Python Engineer']
+    assert _titles(client, 'python evenings') == ['Python Tutor']
+
+
+def test_index_follows_updates_and_deletes(ctx):
+    _add_jobs({'title': 'Golang Engineer', 'description': 'APIs'})
+    job = Job.query.one()
+    job.title = 'Rust Engineer'
+    db.session.commit()
+    client = ctx.test_client()
+    assert _titles(client, 'golang') == []
+    assert _titles(client, 'rust') == ['Rust Engineer']
+    db.session.delete(job)
+    db.session.commit()
+    assert _titles(client, 'rust') == []
+
+
+def test_migrations_create_the_search_index(migrated_app):
+    names = {row[0] for row in db.session.execute(text("SELECT name FROM sqlite_master"))}
+    assert {'jobs_fts', 'jobs_fts_ai', 'jobs_fts_ad', 'jobs_fts_au'} <= names
+    assert search_index.search_available(db)
+
+    _add_jobs({'title': 'Kotlin Developer', 'description': 'Android apps'})
+    assert _titles(migrated_app.test_client(), 'kotlin') == ['Kotlin Developer']
+    # Keyword searches join the FTS table rather than scanning with LIKE
+    sql = str(search_index.apply_job_search(Job.query, db, Job, 'kotlin'))
+    assert 'jobs_fts MATCH' in sql and 'LIKE' not in sql
+
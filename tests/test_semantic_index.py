@@ -0,0 +1,138 @@
+import math
+import random
+
+import pytest
+from sqlalchemy import insert, select
+
+import semantic_index
+from semantic_index import embed_text, index_pending_jobs, search
+from models_fixed import db, Candidate, Job, JobEmbedding
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def test_embeddings_are_normalized_and_need_terms():
+    vector = embed_text('Python Developer', 'Build APIs with Flask')
+    assert len(vector) == semantic_index.EMBEDDING_DIM
+    assert math.isclose(math.sqrt(sum(v * v for v in vector)), 1.0, rel_tol=1e-9)
+    assert embed_text(None, '') is None
+    assert embed_text('the and of', 'a to we') is None
+
+
+def test_numpy_and_pure_python_embeddings_agree(monkeypatch):
+    with_numpy = embed_text('Data Engineer', 'Spark pipelines and SQL warehouses')
+    monkeypatch.setattr(semantic_index, 'np', None)
+    assert embed_text('Data Engineer', 'Spark pipelines and SQL warehouses') == pytest.approx(with_numpy)
+
+
+def test_related_texts_are_closer():
+    backend = embed_text('Senior Python Backend Engineer', 'Django REST APIs, PostgreSQL, Celery')
+    similar = embed_text('Python Backend Developer', 'Build REST APIs with Django and PostgreSQL')
+    unrelated = embed_text('Pastry Chef', 'Croissants, laminated dough and wedding cakes')
+    assert _cosine(backend, similar) > _cosine(backend, unrelated) + 0.3
+
+
+ROLES = ['Python', 'Java', 'Go', 'Rust', 'React', 'iOS', 'Android', 'Data', 'ML', 'DevOps', 'Security', 'QA']
+LEVELS = ['Junior', 'Senior', 'Staff', 'Lead', 'Principal']
+KINDS = ['Engineer', 'Developer', 'Architect', 'Analyst', 'Consultant']
+TOPICS = ['payments', 'logistics', 'healthcare', 'gaming', 'search', 'ads', 'robotics', 'climate', 'education']
+
+
+def _seed(n):
+    rng = random.Random(42)
+    rows = []
+    for i in range(1, n + 1):
+        role, topic = rng.choice(ROLES), rng.choice(TOPICS)
+        rows.append({'job_id': i, 'is_active': True,
+                     'title': f'{rng.choice(LEVELS)} {role} {rng.choice(KINDS)}',
+                     'description': f'Work on {topic} systems using {role} and {rng.choice(ROLES)} '
+                                    f'with a {rng.choice(TOPICS)} focus'})
+    db.session.execute(insert(Job.__table__), rows)
+    db.session.commit()
+    while index_pending_jobs(batch_size=1000):
+        pass
+    return rows
+
+
+@pytest.fixture
+def corpus(ctx):
+    return _seed(400)
+
+
+def _exact(vector, k):
+    rows = db.session.execute(select(JobEmbedding.job_id, JobEmbedding.vector)).all()
+    return [job_id for job_id, _ in semantic_index._rank(vector, rows, k)]
+
+
+def test_every_job_is_indexed_once(corpus):
+    assert JobEmbedding.query.count() == len(corpus)
+    assert index_pending_jobs() == 0
+
+
+def test_updated_and_outdated_jobs_are_reindexed(corpus, monkeypatch):
+    job = db.session.get(Job, 1)
+    job.title = 'Pastry Chef'
+    db.session.commit()
+    assert index_pending_jobs() == 1
+    assert semantic_index.job_vector(job) == pytest.approx(embed_text('Pastry Chef', job.description), abs=1e-6)
+    monkeypatch.setattr(semantic_index, 'MODEL_VERSION', semantic_index.MODEL_VERSION + 1)
+    assert index_pending_jobs(batch_size=1000) == len(corpus)
+
+
+def test_lsh_search_recalls_the_exact_neighbours(ctx):
+    _seed(3000)
+    rng = random.Random(7)
+    k, found, candidates = 10, 0, 0
+    for _ in range(20):
+        vector = embed_text(f'{rng.choice(LEVELS)} {rng.choice(ROLES)} {rng.choice(KINDS)}',
+                            f'{rng.choice(TOPICS)} systems')
+        approx = [job_id for job_id, _ in search(vector, k)]
+        found += len(set(approx) & set(_exact(vector, k)))
+        candidates += len(semantic_index._candidate_ids(vector))
+    assert found / (20 * k) >= 0.75
+    # ...while re-ranking only a small slice of the index
+    assert candidates / 20 < 0.1 * 3000
+
+
+def test_search_skips_inactive_and_excluded_jobs(corpus):
+    vector = semantic_index.job_vector(db.session.get(Job, 5))
+    top = [job_id for job_id, _ in search(vector, 5)]
+    assert top[0] == 5
+    db.session.get(Job, top[1]).is_active = False
+    db.session.commit()
+    after = [job_id for job_id, _ in search(vector, 5, exclude=[5])]
+    assert 5 not in after and top[1] not in after
+
+
+def test_similar_and_recommended_endpoints(corpus, client):
+    body = client.get('/api/jobs/similar?job_id=3&top_k=3').get_json()
+    assert len(body['jobs']) == 3 and all(j['job_id'] != 3 for j in body['jobs'])
+    scores = [j['similarity'] for j in body['jobs']]
+    assert scores == sorted(scores, reverse=True)
+    assert client.get('/api/jobs/similar?job_id=abc').status_code == 400
+    assert client.get('/api/jobs/similar?job_id=9999').status_code == 404
+
+    db.session.add(Candidate(candidate_id=1, headline='Senior Rust Engineer', summary='robotics systems'))
+    db.session.commit()
+    jobs = client.get('/api/candidates/1/recommended-jobs?top_k=5').get_json()['jobs']
+    assert len(jobs) == 5
+    assert any('Rust' in j['title'] or 'Rust' in (j['description'] or '') for j in jobs)
+
+
+def test_sparse_probe_in_a_large_index_keeps_its_neighbours(ctx, monkeypatch):
+    _seed(300)
+    # Too large to scan exactly, and asking for more jobs than the probe finds
+    monkeypatch.setattr(semantic_index, 'EXACT_SCAN_LIMIT', 10)
+    vector = semantic_index.job_vector(db.session.get(Job, 250))
+    found = semantic_index._candidate_ids(vector)
+    k = len(found) + 1
+    ranked = search(vector, k)
+    assert ranked[0][0] == 250
+    assert len(ranked) == k
+    # The probe's neighbours compete with the widened probe's, not with an arbitrary slice
+    cutoff = ranked[-1][1]
+    for job_id in found:
+        score = _cosine(vector, semantic_index.job_vector(db.session.get(Job, job_id)))
+        assert score < cutoff + 1e-6 or job_id in {j for j, _ in ranked}
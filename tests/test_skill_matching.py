@@ -0,0 +1,91 @@
+import warnings
+
+import pytest
+
+import skill_matching
+from skill_matching import (SparseSkillMatrix, match_candidates_for_job, match_jobs_for_candidate,
+                            score_requirements_against_skills, score_rows_against_requirements, top_k)
+from models_fixed import (db, Candidate, CandidateSkill, Job, JobReadinessScore, JobRequiredSkill,
+                          Skill, SkillMatchDetail)
+
+
+@pytest.fixture(params=['vectorized', 'dicts'])
+def scoring(request, monkeypatch):
+    """Run each test with NumPy/SciPy and with the plain-dict fallback"""
+    if request.param == 'dicts':
+        monkeypatch.setattr(skill_matching, 'np', None)
+        monkeypatch.setattr(skill_matching, 'sparse', None)
+    return request.param
+
+
+def test_fallback_really_skips_the_matrix(scoring):
+    matrix = SparseSkillMatrix([(1, 1, 80)])
+    assert (matrix.matrix is not None) == (scoring == 'vectorized')
+
+
+def test_candidates_scored_against_a_job(scoring):
+    candidates = SparseSkillMatrix([(1, 1, 100), (1, 2, 25), (2, 2, 50), (3, 1, None)], skill_ids=[1, 2])
+    scores = score_rows_against_requirements(candidates, {1: 80, 2: 50})
+    # Coverage is capped at 1 per skill; a missing proficiency counts as 50
+    assert scores == pytest.approx([75.0, 50.0, 31.25])
+
+
+def test_jobs_scored_against_a_candidate(scoring):
+    jobs = SparseSkillMatrix([(10, 1, 80), (10, 2, 50), (20, 3, 40)])
+    assert score_requirements_against_skills(jobs, {1: 40, 2: 100}) == pytest.approx([75.0, 0.0])
+
+
+def test_zero_requirements_count_as_covered(scoring):
+    jobs = SparseSkillMatrix([(10, 1, 0), (10, 2, 50), (20, 1, 0)])
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        # No proficiency at all still meets a requirement of 0
+        assert score_requirements_against_skills(jobs, {}) == pytest.approx([50.0, 100.0])
+        candidates = SparseSkillMatrix([(1, 1, 0), (1, 2, 50), (2, 2, 0)], skill_ids=[1, 2])
+        assert score_rows_against_requirements(candidates, {1: 0, 2: 50}) == pytest.approx([100.0, 50.0])
+
+
+def test_top_k_breaks_ties_by_id(scoring):
+    ids = [5, 3, 9, 1]
+    scores = [50.0, 80.0, 80.0, 10.0]
+    assert top_k(ids, scores, 2) == [(3, 80.0), (9, 80.0)]
+    assert top_k(ids, [50.0, 50.0, 50.0, 50.0], 2) == [(1, 50.0), (3, 50.0)]
+
+
+@pytest.fixture
+def board(ctx):
+    db.session.add_all([Skill(skill_id=i, name=name) for i, name in [(1, 'Python'), (2, 'SQL'), (3, 'Go')]])
+    db.session.add_all([Job(job_id=1, title='Backend', is_active=True),
+                        Job(job_id=2, title='Data', is_active=True),
+                        Job(job_id=3, title='Closed', is_active=False)])
+    db.session.add_all([Candidate(candidate_id=1), Candidate(candidate_id=2)])
+    db.session.add_all([
+        JobRequiredSkill(job_id=1, skill_id=1, required_proficiency=80),
+        JobRequiredSkill(job_id=1, skill_id=2, required_proficiency=0),
+        JobRequiredSkill(job_id=2, skill_id=2, required_proficiency=60),
+        JobRequiredSkill(job_id=3, skill_id=1, required_proficiency=10),
+        CandidateSkill(candidate_id=1, skill_id=1, proficiency=80),
+        CandidateSkill(candidate_id=1, skill_id=3, proficiency=90),
+        CandidateSkill(candidate_id=2, skill_id=2, proficiency=30),
+    ])
+    db.session.commit()
+
+
+def test_jobs_for_candidate_are_ranked_and_persisted(scoring, board):
+    matches = match_jobs_for_candidate(1)
+    assert [(m['job_id'], m['readiness_score']) for m in matches] == [(1, 100.0), (2, 0.0)]
+    statuses = {d['skill_id']: d['match_status'] for d in matches[0]['details']}
+    assert statuses == {1: 'Matched', 2: 'Matched', 3: 'Surplus'}
+    assert JobReadinessScore.query.count() == 2
+
+    # Recomputing replaces the pair's score and details
+    match_jobs_for_candidate(1)
+    assert JobReadinessScore.query.count() == 2
+    assert SkillMatchDetail.query.count() == 2 * 3
+
+
+def test_candidates_for_job(scoring, board):
+    matches = match_candidates_for_job(2, persist=False)
+    assert [(m['candidate_id'], m['readiness_score']) for m in matches] == [(2, 50.0)]
+    assert matches[0]['details'][0]['match_status'] == 'Gap'
+    assert JobReadinessScore.query.count() == 0
@@ -0,0 +1,120 @@
+from datetime import datetime
+
+import pytest
+
+from models_fixed import db, Application, ApplicationPipeline, Candidate, Job, PipelineStage
+import stage_transitions
+
+T0 = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def applications(app):
+    """Job 1: applications 1-3 screening, 4 applied; job 2: application 5 screening"""
+    with app.app_context():
+        db.session.add_all([PipelineStage(stage_id=1, name='Applied'), PipelineStage(stage_id=2, name='Screening'),
+                            PipelineStage(stage_id=3, name='Interview'), PipelineStage(stage_id=4, name='Rejected')])
+        db.session.add_all([Job(job_id=1, title='Backend', is_active=True), Job(job_id=2, title='Other', is_active=True)])
+        db.session.add_all([Candidate(candidate_id=i) for i in range(1, 6)])
+        db.session.add_all([Application(application_id=i, candidate_id=i, job_id=1, current_status='Screening')
+                            for i in range(1, 4)])
+        db.session.add(Application(application_id=4, candidate_id=4, job_id=1, current_status='Applied'))
+        db.session.add(Application(application_id=5, candidate_id=5, job_id=2, current_status='Screening'))
+        db.session.add(ApplicationPipeline(application_id=1, stage_id=3, moved_at=T0))
+        db.session.commit()
+
+
+def _outcomes(body):
+    return {r['application_id']: r['outcome'] for r in body['results']}
+
+
+def _statuses(app):
+    with app.app_context():
+        return {a.application_id: a.current_status for a in Application.query.all()}
+
+
+def _history(app, stage_id):
+    with app.app_context():
+        return {row.application_id: row.moved_at
+                for row in ApplicationPipeline.query.filter_by(stage_id=stage_id)}
+
+
+def test_moves_listed_applications_and_records_history(client, applications, app):
+    resp = client.post('/api/applications/transition', json={'application_ids': [2, 3, 4, 99], 'stage': 'interview'})
+    body = resp.get_json()
+    assert resp.status_code == 200 and body['success']
+    assert body['stage']['name'] == 'Interview'
+    assert body['moved'] == 3
+    assert _outcomes(body) == {2: 'moved', 3: 'moved', 4: 'moved', 99: 'not_found'}
+    assert [r['from_status'] for r in body['results']] == ['Screening', 'Screening', 'Applied', None]
+    statuses = _statuses(app)
+    assert statuses[2] == statuses[3] == statuses[4] == 'Interview'
+    assert statuses[1] == statuses[5] == 'Screening'
+    assert set(_history(app, 3)) == {1, 2, 3, 4}
+
+
+def test_reentering_a_stage_refreshes_moved_at(client, applications, app):
+    client.post('/api/applications/transition', json={'application_ids': [1], 'stage_id': 3})
+    assert _history(app, 3)[1] > T0
+    with app.app_context():
+        assert ApplicationPipeline.query.filter_by(application_id=1, stage_id=3).count() == 1
+
+
+def test_unchanged_and_from_status_guard(client, applications, app):
+    client.post('/api/applications/transition', json={'application_ids': [1], 'stage': 'Interview'})
+    body = client.post('/api/applications/transition', json={
+        'application_ids': [1, 2, 4], 'stage': 'Interview', 'from_status': 'screening'
+    }).get_json()
+    assert _outcomes(body) == {1: 'unchanged', 2: 'moved', 4: 'skipped'}
+    assert body['moved'] == 1
+    assert _statuses(app)[4] == 'Applied'
+
+
+def test_filter_selects_within_a_job(client, applications, app):
+    body = client.post('/api/applications/transition', json={
+        'filter': {'job_id': 1, 'current_status': 'SCREENING'}, 'stage': 'Rejected'
+    }).get_json()
+    assert _outcomes(body) == {1: 'moved', 2: 'moved', 3: 'moved'}
+    assert _statuses(app)[5] == 'Screening'
+
+
+def test_ids_outside_the_filter_are_not_found(client, applications):
+    body = client.post('/api/applications/transition', json={
+        'application_ids': [3, 5], 'filter': {'job_id': 2}, 'stage': 'Rejected'
+    }).get_json()
+    assert _outcomes(body) == {3: 'not_found', 5: 'moved'}
+
+
+@pytest.mark.parametrize('payload, status', [
+    ({'application_ids': [1]}, 400),
+    ({'application_ids': [1], 'stage': 'Hired'}, 404),
+    ({'application_ids': [1], 'stage_id': 'x'}, 400),
+    ({'application_ids': '1', 'stage_id': 3}, 400),
+    ({'filter': [1], 'stage_id': 3}, 400),
+    ({'stage_id': 3}, 400),
+    ({'filter': {'title': 'x'}, 'stage_id': 3}, 400),
+])
+def test_invalid_requests(client, applications, app, payload, status):
+    resp = client.post('/api/applications/transition', json=payload)
+    assert resp.status_code == status
+    assert resp.get_json()['success'] is False
+    assert _statuses(app)[1] == 'Screening'
+
+
+def test_transition_size_limit(ctx, applications, monkeypatch):
+    monkeypatch.setattr(stage_transitions, 'MAX_TRANSITION_SIZE', 2)
+    stage = stage_transitions.find_stage(name='Rejected')
+    with pytest.raises(ValueError, match='At most 2'):
+        stage_transitions.transition_applications(stage, application_ids=[1, 2, 3])
+    with pytest.raises(ValueError, match='more than 2'):
+        stage_transitions.transition_applications(stage, filters={'job_id': 1})
+    assert stage_transitions.transition_applications(stage, filters={'job_id': 2})['moved'] == 1
+
+
+def test_status_edit_records_stage_history(client, applications, app):
+    client.patch('/api/applications/4', json={'current_status': 'Screening'})
+    assert 4 in _history(app, 2)
+    client.patch('/api/applications/4', json={'current_status': 'On hold'})
+    assert _statuses(app)[4] == 'On hold'
+    with app.app_context():
+        assert ApplicationPipeline.query.filter_by(application_id=4).count() == 1
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from sqlalchemy import insert
+
+from models_fixed import db, Job
+import pagination
+
+
+@pytest.fixture
+def jobs(app):
+    with app.app_context():
+        db.session.execute(insert(Job.__table__), [
+            {'title': f'Engineer {i}', 'location': 'Berlin' if i % 2 else 'Paris', 'is_active': True, 'salary_min': 1000 * i}
+            for i in range(1, 251)
+        ])
+        db.session.commit()
+
+
+def _rows(response):
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_stream_returns_every_row_without_paging(client, jobs):
+    response = client.get('/api/jobs?stream=1')
+    rows = _rows(response)
+    assert [r['job_id'] for r in rows] == list(range(1, 251))
+    assert 'X-Next-Cursor' not in response.headers
+
+
+def test_accept_header_selects_the_stream(client, jobs):
+    response = client.get('/api/jobs?location=Paris', headers={'Accept': 'application/x-ndjson'})
+    assert len(_rows(response)) == 125
+    assert client.get('/api/jobs').mimetype == 'application/json'
+
+
+def test_stream_honours_fields_cursor_and_limit(client, jobs):
+    cursor = pagination.encode_cursor({'k': 200})
+    rows = _rows(client.get('/api/jobs', query_string={'stream': 1, 'fields': 'title', 'cursor': cursor, 'limit': 3}))
+    assert rows == [{'job_id': i, 'title': f'Engineer {i}'} for i in (201, 202, 203)]
+
+
+def test_rows_are_written_as_they_are_read(client, jobs):
+    response = client.get('/api/jobs?stream=1', buffered=False)
+    assert response.is_streamed
+    first = next(iter(response.response))
+    assert json.loads(first)['job_id'] == 1
+    response.close()
+
+
+def test_projected_values_are_json_encoded(client, jobs):
+    rows = _rows(client.get('/api/jobs?stream=1&fields=salary_min,created_at&limit=1'))
+    # Decimals and datetimes become JSON numbers and ISO strings
+    assert rows[0]['salary_min'] == 1000
+    assert isinstance(rows[0]['created_at'], str)
+
+
+def test_bad_parameters_fail_before_streaming(client, jobs):
+    response = client.get('/api/jobs?stream=1&fields=nope')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_stream_is_never_cached(client, jobs):
+    client.get('/api/jobs?stream=1')
+    assert 'X-Cache' not in client.get('/api/jobs?stream=1').headers